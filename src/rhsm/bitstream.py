@@ -113,3 +113,64 @@ class GhettoBitStream:
         copy: List[int] = data[:]
         copy.reverse()
         return sum(x << n * 8 for n, x in enumerate(copy))
+
+
+class BitReader:
+    """
+    Reads binary data as a stream of bits. Unlike GhettoBitStream, bits are
+    never expanded into characters; the reader only keeps a position in the
+    data and returns any number of following bits as one unsigned int. That
+    allows a decoder to look at several bits at once.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray]) -> None:
+        """
+        :param data:    binary data in a string
+        """
+        self._data = bytes(data)
+        self._size = len(self._data) * 8
+        self._position = 0
+
+    @property
+    def remaining(self) -> int:
+        """
+        :return:    number of bits that were not read yet
+        """
+        return self._size - self._position
+
+    def peek(self, count: int) -> int:
+        """
+        Return the next bits without consuming them. When the data ends
+        sooner, the missing bits are filled with zeros.
+
+        :param count:   number of bits to return
+        :return:        bits as big-endian unsigned int
+        """
+        byte_index, bit_offset = divmod(self._position, 8)
+        num_bytes = (bit_offset + count + 7) // 8
+        chunk = self._data[byte_index : byte_index + num_bytes]
+        value = int.from_bytes(chunk, "big") << (num_bytes - len(chunk)) * 8
+        return (value >> (num_bytes * 8 - bit_offset - count)) & ((1 << count) - 1)
+
+    def skip(self, count: int) -> None:
+        """
+        :param count:   number of bits to consume
+        """
+        self._position = min(self._position + count, self._size)
+
+    def read(self, count: int) -> int:
+        """
+        :param count:   number of bits to read
+        :return:        bits as big-endian unsigned int
+        """
+        if count > self.remaining:
+            raise IndexError("not enough bits left in the stream")
+        value = self.peek(count)
+        self._position += count
+        return value
+
+    def pop_byte(self) -> int:
+        """
+        :return:    next 8 bits in the stream, as an int
+        """
+        return self.read(8)
@@ -60,15 +60,31 @@ def create_from_file(path: str) -> "EntitlementCertificate":
     return _CertFactory().create_from_file(path)
 
 
-def create_from_pem(pem: str) -> "EntitlementCertificate":
+def create_from_pem(
+    pem: str, path: Optional[str] = None, parsed: Optional[dict] = None
+) -> "EntitlementCertificate":
     """
     Try to create certificate object from PEM string
     :param pem: String with PEM
+    :param path: Path to file the PEM was read from
+    :param parsed: Data returned by dump_parsed() for the same PEM
     :return: Instance of rhsm.certificate2.Certificate
     """
     from rhsm.certificate2 import _CertFactory  # prevent circular deps
 
-    return _CertFactory().create_from_pem(pem)
+    return _CertFactory().create_from_pem(pem, path, parsed)
+
+
+def dump_parsed(cert: "EntitlementCertificate") -> Optional[dict]:
+    """
+    Get data parsed from the certificate, which can be serialized to JSON
+    and later passed to create_from_pem() to skip the parsing
+    :param cert: Instance of rhsm.certificate2.Certificate
+    :return: Dictionary with parsed data, or None when there is nothing to save
+    """
+    from rhsm.certificate2 import _CertFactory  # prevent circular deps
+
+    return _CertFactory.dump_parsed(cert)
 
 
 def parse_tags(tag_str: str) -> List[str]:
@@ -19,7 +19,8 @@ import re
 import zlib
 
 import datetime
-from typing import Optional, List, Dict, Union, Tuple
+from dateutil.tz import tzutc
+from typing import Optional, List, Dict, Set, Union, Tuple
 
 from rhsm import _certificate
 
@@ -53,6 +54,45 @@ IDENTITY_CERT = 3
 
 CONTENT_ACCESS_CERT_TYPE = "OrgLevel"
 
+# Attributes of parsed objects stored by _CertFactory.dump_parsed(); they match
+# the keyword arguments of the constructors.
+PRODUCT_FIELDS = ("id", "name", "version", "architectures", "provided_tags", "brand_type", "brand_name")
+ORDER_FIELDS = (
+    "name",
+    "number",
+    "sku",
+    "subscription",
+    "quantity",
+    "virt_limit",
+    "socket_limit",
+    "contract",
+    "quantity_used",
+    "warning_period",
+    "account",
+    "provides_management",
+    "service_level",
+    "service_type",
+    "stacking_id",
+    "virt_only",
+    "ram_limit",
+    "core_limit",
+    "roles",
+    "usage",
+    "addons",
+)
+CONTENT_FIELDS = (
+    "content_type",
+    "name",
+    "label",
+    "vendor",
+    "url",
+    "gpg",
+    "enabled",
+    "metadata_expire",
+    "required_tags",
+    "arches",
+)
+
 
 class CertificateLoadingError(Exception):
     """
@@ -109,9 +149,13 @@ class _CertFactory:
         else:
             return self._read_x509(cert, path, pem)
 
-    def create_from_pem(self, pem: str, path: Optional[str] = None):
+    def create_from_pem(self, pem: str, path: Optional[str] = None, parsed: Optional[dict] = None):
         """
         Create appropriate certificate object from a PEM string.
+
+        :param parsed: data returned by dump_parsed() for the same PEM; when
+            given, the products, order, content and pool are created from it
+            instead of being parsed from the certificate again
         """
         if not pem:
             raise CertificateException("Empty certificate")
@@ -120,9 +164,11 @@ class _CertFactory:
         except _certificate.OpenSSLCertificateLoadingError as exc:
             raise CertificateLoadingError(exc.args[0], exc.args[1], pem=pem)
         else:
-            return self._read_x509(cert, path, pem)
+            return self._read_x509(cert, path, pem, parsed)
 
-    def _read_x509(self, x509: _certificate.X509, path: str, pem: str) -> "EntitlementCertificate":
+    def _read_x509(
+        self, x509: _certificate.X509, path: str, pem: str, parsed: Optional[dict] = None
+    ) -> "EntitlementCertificate":
         # Load the X509 extensions so we can determine what we're dealing with:
         try:
             extensions = _Extensions2(x509)
@@ -135,6 +181,8 @@ class _CertFactory:
                 cert_version_str = extensions[EXT_CERT_VERSION].decode("utf-8")
 
             version = Version(cert_version_str)
+            if parsed is not None and version.major in (1, 3):
+                return self._create_from_parsed(version, extensions, x509, path, pem, parsed)
             if version.major == 1:
                 return self._create_v1_cert(version, extensions, x509, path)
             if version.major == 3:
@@ -146,6 +194,79 @@ class _CertFactory:
             log.exception(e)
             raise CertificateException(str(e))
 
+    @staticmethod
+    def dump_parsed(cert: "Certificate") -> Optional[dict]:
+        """
+        Return the data parsed from the extensions or the payload of a product
+        or entitlement certificate as a dict that can be serialized to JSON,
+        or None for other certificates. The dict can be passed back to
+        create_from_pem() to skip the parsing.
+        """
+        if isinstance(cert, EntitlementCertificate):
+            parsed = {
+                "type": ENTITLEMENT_CERT,
+                "start": cert.start.isoformat(),
+                "end": cert.end.isoformat(),
+                "products": [_dump_fields(product, PRODUCT_FIELDS) for product in cert.products],
+                "order": _dump_fields(cert.order, ORDER_FIELDS) if cert.order is not None else None,
+                "pool": cert.pool.id if cert.pool is not None else None,
+            }
+            # content of v3 certificates is the biggest part of the payload; it
+            # is decoded from the PEM only when it is used
+            if cert.version.major != 3:
+                parsed["content"] = (
+                    [_dump_fields(content, CONTENT_FIELDS) for content in cert.content]
+                    if cert.content is not None
+                    else None
+                )
+            return parsed
+        if isinstance(cert, ProductCertificate):
+            return {
+                "type": PRODUCT_CERT,
+                "start": cert.start.isoformat(),
+                "end": cert.end.isoformat(),
+                "products": [_dump_fields(product, PRODUCT_FIELDS) for product in cert.products],
+            }
+        return None
+
+    def _create_from_parsed(
+        self,
+        version: "Version",
+        extensions: Extensions,
+        x509: _certificate.X509,
+        path: str,
+        pem: str,
+        parsed: dict,
+    ) -> "ProductCertificate":
+        """
+        Create a certificate using data returned by dump_parsed().
+        """
+        kwargs = dict(
+            x509=x509,
+            path=path,
+            version=version,
+            serial=x509.get_serial_number(),
+            # parsing of the dates from x509 is expensive, so they are cached too
+            start=datetime.datetime.fromisoformat(parsed["start"]).astimezone(tzutc()),
+            end=datetime.datetime.fromisoformat(parsed["end"]).astimezone(tzutc()),
+            subject=self._read_subject(x509),
+            issuer=self._read_issuer(x509),
+        )
+        if parsed["type"] == PRODUCT_CERT:
+            return ProductCertificate(products=_ParsedData(parsed).products(), **kwargs)
+
+        payload: Optional[_EntitlementPayload] = None
+        if "content" not in parsed:
+            entitlement_data: Optional[str] = self._read_entitlement_data(pem)
+            payload = _EntitlementPayload(self, entitlement_data) if entitlement_data else None
+        return EntitlementCertificate(
+            lazy_data=_ParsedData(parsed, payload),
+            extensions=extensions,
+            # only the v3 certificates keep their PEM, see _create_v3_cert()
+            pem=pem if version.major == 3 else None,
+            **kwargs,
+        )
+
     def _create_v1_cert(self, version, extensions, x509, path):
         cert_type = self._get_v1_cert_type(extensions)
 
@@ -322,30 +443,7 @@ class _CertFactory:
         self, version: int, extensions: Extensions, x509: _certificate.X509, path: str, pem: str
     ) -> "EntitlementCertificate":
         # At this time, we only support v3 entitlement certificates
-        entitlement_data: Optional[str]
-        try:
-            # this is only expected to be available on the client side
-            entitlement_data = pem.split("-----BEGIN ENTITLEMENT DATA-----")[1]
-            entitlement_data = entitlement_data.split("-----END ENTITLEMENT DATA-----")[0].strip()
-        except IndexError:
-            entitlement_data = None
-
-        order: Optional[Order]
-        content: Optional[List[Content]]
-        products: Optional[List[Product]]
-        pool: Optional[Pool]
-        if entitlement_data:
-            payload: dict = self._decompress_payload(base64.b64decode(entitlement_data))
-            order = self._parse_v3_order(payload)
-            content = self._parse_v3_content(payload)
-            products = self._parse_v3_products(payload)
-            pool = self._parse_v3_pool(payload)
-        else:
-            order = None
-            content = None
-            products = None
-            pool = None
-
+        entitlement_data: Optional[str] = self._read_entitlement_data(pem)
         cert = EntitlementCertificate(
             x509=x509,
             path=path,
@@ -355,15 +453,22 @@ class _CertFactory:
             start=get_datetime_from_x509(x509.get_not_before()),
             end=get_datetime_from_x509(x509.get_not_after()),
             subject=self._read_subject(x509),
-            order=order,
-            content=content,
-            products=products,
-            pool=pool,
+            # the payload is decoded only when its data are used for the first time
+            lazy_data=_EntitlementPayload(self, entitlement_data) if entitlement_data else None,
             pem=pem,
             issuer=self._read_issuer(x509),
         )
         return cert
 
+    @staticmethod
+    def _read_entitlement_data(pem: str) -> Optional[str]:
+        try:
+            # this is only expected to be available on the client side
+            entitlement_data = pem.split("-----BEGIN ENTITLEMENT DATA-----")[1]
+            return entitlement_data.split("-----END ENTITLEMENT DATA-----")[0].strip()
+        except IndexError:
+            return None
+
     def _parse_v3_order(self, payload: dict) -> "Order":
         sub: dict = payload["subscription"]
         order: dict = payload["order"]
@@ -460,6 +565,98 @@ class _CertFactory:
             raise CertificateException("Error decompressing/parsing certificate payload.")
 
 
+class _EntitlementPayload:
+    """
+    Data from the ENTITLEMENT DATA block of a v3 entitlement certificate,
+    decompressed and parsed only when some of them are requested.
+    """
+
+    def __init__(self, factory: _CertFactory, entitlement_data: str):
+        self._factory = factory
+        self._entitlement_data: Optional[str] = entitlement_data
+        self._payload: Optional[dict] = None
+
+    def _decode(self) -> dict:
+        if self._payload is None:
+            try:
+                data: bytes = base64.b64decode(self._entitlement_data)
+            except ValueError as e:
+                raise CertificateException("Error decoding certificate payload: %s" % e)
+            self._payload = self._factory._decompress_payload(data)
+            self._entitlement_data = None
+        return self._payload
+
+    def order(self) -> "Order":
+        return self._factory._parse_v3_order(self._decode())
+
+    def content(self) -> List["Content"]:
+        return self._factory._parse_v3_content(self._decode())
+
+    def products(self) -> List["Product"]:
+        return self._factory._parse_v3_products(self._decode())
+
+    def pool(self) -> Optional["Pool"]:
+        return self._factory._parse_v3_pool(self._decode())
+
+
+class _ParsedData:
+    """
+    Data of a certificate returned by _CertFactory.dump_parsed(); objects
+    are created only when they are requested.
+    """
+
+    def __init__(self, parsed: dict, payload: Optional[_EntitlementPayload] = None):
+        """
+        :param payload: payload of the certificate, used for content which
+            is not in the parsed data
+        :raise CertificateException: when the data do not have the expected
+            structure, so that they are not used at all
+        """
+        self._check(parsed.get("products"), PRODUCT_FIELDS, False)
+        self._check(parsed.get("content"), CONTENT_FIELDS, True)
+        order = parsed.get("order")
+        if order is not None:
+            self._check([order], ORDER_FIELDS, False)
+        self._parsed = parsed
+        self._payload = payload
+
+    @staticmethod
+    def _check(objects: Optional[list], fields: Tuple[str, ...], optional: bool) -> None:
+        if objects is None and optional:
+            return
+        if not isinstance(objects, list) or any(
+            not isinstance(values, list) or len(values) != len(fields) for values in objects
+        ):
+            raise CertificateException("Unexpected structure of parsed certificate data")
+
+    def order(self) -> Optional["Order"]:
+        order: Optional[list] = self._parsed["order"]
+        return Order(**_load_fields(order, ORDER_FIELDS)) if order is not None else None
+
+    def content(self) -> Optional[List["Content"]]:
+        if "content" not in self._parsed:
+            return self._payload.content() if self._payload is not None else None
+        content: Optional[List[list]] = self._parsed["content"]
+        if content is None:
+            return None
+        return [Content(**_load_fields(c, CONTENT_FIELDS)) for c in content]
+
+    def products(self) -> List["Product"]:
+        return [Product(**_load_fields(product, PRODUCT_FIELDS)) for product in self._parsed["products"]]
+
+    def pool(self) -> Optional["Pool"]:
+        return Pool(id=self._parsed["pool"]) if self._parsed["pool"] is not None else None
+
+
+def _dump_fields(obj: object, fields: Tuple[str, ...]) -> list:
+    # values are stored without names to keep the serialized data small
+    return [getattr(obj, field) for field in fields]
+
+
+def _load_fields(values: list, fields: Tuple[str, ...]) -> dict:
+    return dict(zip(fields, values))
+
+
 class Version:
     """Small wrapper for version string comparisons."""
 
@@ -617,14 +814,83 @@ class EntitlementCertificate(ProductCertificate):
         content: Optional[List["Content"]] = None,
         pool: Optional["Pool"] = None,
         extensions: Optional[Extensions] = None,
+        lazy_data: Optional[Union["_EntitlementPayload", "_ParsedData"]] = None,
         **kwargs,
     ):
+        """
+        :param lazy_data: source of order, content, products and pool, which
+            are then created on first access instead of the given ones
+        """
+        self._lazy_data = lazy_data
+        self._lazy_fields: Set[str] = set()
         ProductCertificate.__init__(self, **kwargs)
         self.order: Optional[Order] = order
         self.content: Optional[List[Content]] = content
         self.pool: Optional[Pool] = pool
         self.extensions: Optional[Extensions] = extensions
         self._path_tree_object = None
+        if lazy_data is not None:
+            self._lazy_fields = {"order", "content", "products", "pool"}
+
+    def _load_lazy_field(self, name: str) -> None:
+        """
+        Create the field from the lazy data, if it was not done yet.
+        """
+        if name not in self._lazy_fields:
+            return
+        try:
+            value = getattr(self._lazy_data, name)()
+        except CertificateException:
+            raise
+        except Exception as e:
+            log.exception(e)
+            raise CertificateException(str(e))
+        self._lazy_fields.discard(name)
+        if name == "products" and value is None:
+            value = []
+        setattr(self, "_" + name, value)
+        if not self._lazy_fields:
+            self._lazy_data = None
+
+    @property
+    def order(self) -> Optional["Order"]:
+        self._load_lazy_field("order")
+        return self._order
+
+    @order.setter
+    def order(self, value: Optional["Order"]) -> None:
+        self._lazy_fields.discard("order")
+        self._order = value
+
+    @property
+    def content(self) -> Optional[List["Content"]]:
+        self._load_lazy_field("content")
+        return self._content
+
+    @content.setter
+    def content(self, value: Optional[List["Content"]]) -> None:
+        self._lazy_fields.discard("content")
+        self._content = value
+
+    @property
+    def products(self) -> List["Product"]:
+        self._load_lazy_field("products")
+        return self._products
+
+    @products.setter
+    def products(self, value: List["Product"]) -> None:
+        self._lazy_fields.discard("products")
+        self._products = value
+
+    @property
+    def pool(self) -> Optional["Pool"]:
+        self._load_lazy_field("pool")
+        return self._pool
+
+    @pool.setter
+    def pool(self, value: Optional["Pool"]) -> None:
+        self._lazy_fields.discard("pool")
+        self._pool = value
 
     @property
     def entitlement_type(self) -> str:
@@ -15,6 +15,10 @@
 #
 
 import base64
+import codecs
+from collections import OrderedDict
+import concurrent.futures
+import contextlib
 from rhsm import certificate
 import datetime
 import dateutil.parser
@@ -23,12 +27,17 @@ import logging
 import os
 import socket
 import sys
+import tempfile
+import threading
 import time
 import traceback
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 import re
 import enum
+import functools
+import gzip
 
 from email.utils import format_datetime
 
@@ -58,9 +67,14 @@ except ImportError:
 
 config = get_config_parser()
 MULTI_ENV = "multi_environment"
+# Capability of the server accepting request bodies compressed using gzip
+GZIP_REQUEST_CAPABILITY = "gzip_request_body"
 
 REUSE_CONNECTION = True
 
+# Size of chunks read from the socket, when the body of response is decoded as a stream
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 def safe_int(value: Any, safe_value: Any = None) -> Union[int, None, Any]:
     try:
@@ -101,6 +115,96 @@ def get_time_drift(timestamp: str) -> datetime.timedelta:
     return drift
 
 
+class _JSONStream:
+    """
+    Incremental decoder of JSON document read in chunks of bytes. When the document is
+    an array, then its items are decoded one by one and only the current item has to be
+    kept in the memory together with the buffer of unprocessed text.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """
+        Append next chunk to the buffer and drop processed text from the buffer
+        :return: False, when there is nothing more to read
+        """
+        if self._eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            text = self._text_decoder.decode(b"", final=True)
+        else:
+            text = self._text_decoder.decode(chunk)
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return True
+
+    def _peek(self) -> Optional[str]:
+        """
+        Skip whitespaces and return next character. None is returned at the end of document.
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def _decode_value(self) -> Any:
+        # Decoder of json module does not skip leading whitespaces
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # The value is probably not complete yet
+                if not self._fill():
+                    raise
+                continue
+            # Number at the end of buffer could continue in the next chunk
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if (end == len(self._buffer) or self._buffer[end] in "0123456789+-.eE") and self._fill():
+                    continue
+            self._pos = end
+            return value
+
+    def items(self) -> Iterator[Any]:
+        """
+        Yield items of JSON array. When the document is not an array, then the whole
+        document is yielded. Nothing is yielded for empty document.
+        """
+        char = self._peek()
+        if char is None:
+            return
+        if char != "[":
+            while self._fill():
+                pass
+            yield self._decoder.decode(self._buffer[self._pos :])
+            return
+        self._pos += 1
+        if self._peek() == "]":
+            return
+        while True:
+            yield self._decode_value()
+            char = self._peek()
+            if char == ",":
+                self._pos += 1
+            elif char == "]":
+                return
+            else:
+                raise json.JSONDecodeError("Expecting ',' delimiter", self._buffer, self._pos)
+
+
 class NullHandler(logging.Handler):
     def emit(self, record: Any) -> None:
         pass
@@ -586,6 +690,359 @@ def _get_locale() -> Union[None, str]:
     return None
 
 
+def _close_https_connection(conn: httplib.HTTPSConnection) -> None:
+    """
+    Close connection to server. Try to do proper TLS shutdown handshake first.
+    :param conn: connection to be closed
+    :return: None
+    """
+    # Do proper TLS shutdown handshake (TLS tear down) first
+    if conn.sock is not None:
+        log.debug(f"Closing HTTPS connection {conn.sock}")
+        try:
+            conn.sock.unwrap()
+        except (ssl.SSLError, OSError) as err:
+            log.debug(f"Unable to close TLS connection properly: {err}")
+        else:
+            log.debug("TLS connection closed")
+    # Then it is possible to close TCP connection
+    conn.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of idle HTTPS connections shared by all instances of BaseRestLib
+    in one process. Connections are keyed by tuple (host, port, proxy, cert, key, ...),
+    because TLS session of connection is bound to client certificate. Connection is
+    checked out of the pool exclusively, when it is used for some request, and it is
+    returned back to the pool, when the request is finished. Thus, it is safe to use
+    the pool from multiple threads.
+
+    The pool respects keep-alive timeout and maximal number of requests per connection
+    sent by server in 'Keep-Alive' HTTP header. Expired connections are closed and
+    removed from the pool.
+    """
+
+    DEFAULT_MAX_SIZE: int = 8
+
+    def __init__(self, max_size: Optional[int] = None) -> None:
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+        # List of (key, connection) tuples. The most recently released connection is the last one.
+        self._idle: List[Tuple[tuple, httplib.HTTPSConnection]] = []
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    @staticmethod
+    def is_expired(conn: httplib.HTTPSConnection, now: Optional[float] = None) -> bool:
+        """
+        Check if it is still possible to use existing connection
+        :param conn: connection to be checked
+        :param now: current time; time.time() is used, when not specified
+        :return: True, when keep-alive timeout or maximal number of requests was reached
+        """
+        if now is None:
+            now = time.time()
+        if now - conn.last_request_time > conn.keep_alive_timeout:
+            log.debug(f"Connection timeout {conn.keep_alive_timeout} reached")
+            return True
+        if conn.max_requests_num is not None and conn.requests_num >= conn.max_requests_num:
+            log.debug(f"Maximal number of requests ({conn.max_requests_num}) reached")
+            return True
+        return False
+
+    def acquire(self, key: tuple) -> Optional[httplib.HTTPSConnection]:
+        """
+        Try to get idle connection for given key from the pool. Returned connection is
+        removed from the pool, and it should be returned using release() method.
+        :param key: key of connection
+        :return: connection or None, when there is no usable idle connection in the pool
+        """
+        self.reap()
+        with self._lock:
+            for index in range(len(self._idle) - 1, -1, -1):
+                if self._idle[index][0] == key:
+                    conn = self._idle.pop(index)[1]
+                    self.hits += 1
+                    return conn
+            self.misses += 1
+        return None
+
+    def release(self, key: tuple, conn: httplib.HTTPSConnection) -> None:
+        """
+        Return connection to the pool. When the pool is full, then the least recently
+        used connection is closed.
+        :param key: key of connection
+        :param conn: connection to be returned to the pool
+        :return: None
+        """
+        if conn.sock is None or self.is_expired(conn):
+            _close_https_connection(conn)
+            return
+        evicted = []
+        with self._lock:
+            self._idle.append((key, conn))
+            while len(self._idle) > self.max_size:
+                evicted.append(self._idle.pop(0)[1])
+        for old_conn in evicted:
+            log.debug("Connection pool is full. Closing the least recently used connection...")
+            _close_https_connection(old_conn)
+
+    def reap(self) -> None:
+        """
+        Close and remove all expired connections from the pool
+        :return: None
+        """
+        now = time.time()
+        with self._lock:
+            expired = [conn for key, conn in self._idle if self.is_expired(conn, now)]
+            self._idle = [(key, conn) for key, conn in self._idle if conn not in expired]
+        for conn in expired:
+            _close_https_connection(conn)
+
+    def discard(self, predicate: Optional[Callable[[tuple], bool]] = None) -> None:
+        """
+        Close and remove idle connections from the pool
+        :param predicate: function called with key of connection. Connection is closed, when
+            it returns True. All idle connections are closed, when predicate is not specified.
+        :return: None
+        """
+        with self._lock:
+            discarded = [conn for key, conn in self._idle if predicate is None or predicate(key)]
+            self._idle = [(key, conn) for key, conn in self._idle if conn not in discarded]
+        for conn in discarded:
+            _close_https_connection(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return statistics of the pool
+        :return: dictionary with number of hits, misses and idle connections
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "idle": len(self._idle)}
+
+
+class SSLContextCache:
+    """
+    Process-wide cache of SSL contexts and TLS sessions. Creating SSL context is expensive,
+    because all CA certificates from ca_dir have to be parsed. Thus, SSL context is created
+    only once for given key (CA certificates, client cert and key, insecure flag). TLS session
+    of the last connection to the server is stored too, and it is used for abbreviated TLS
+    handshake, when new connection to the same server is created.
+    """
+
+    DEFAULT_MAX_SIZE: int = 32
+
+    def __init__(self, max_size: Optional[int] = None) -> None:
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+        self._contexts: "OrderedDict[tuple, ssl.SSLContext]" = OrderedDict()
+        self._sessions: "OrderedDict[tuple, Tuple[ssl.SSLContext, ssl.SSLSession]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_context(self, key: tuple) -> Optional[ssl.SSLContext]:
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is not None:
+                self._contexts.move_to_end(key)
+            return context
+
+    def set_context(self, key: tuple, context: ssl.SSLContext) -> None:
+        with self._lock:
+            self._contexts[key] = context
+            self._contexts.move_to_end(key)
+            while len(self._contexts) > self.max_size:
+                self._contexts.popitem(last=False)
+
+    def get_session(self, key: tuple, context: ssl.SSLContext) -> Optional[ssl.SSLSession]:
+        """
+        Return TLS session stored for given connection key. The session can be
+        used only with the SSL context used for creating the session.
+        """
+        with self._lock:
+            item = self._sessions.get(key)
+        if item is None or item[0] is not context:
+            return None
+        return item[1]
+
+    def set_session(self, key: tuple, context: ssl.SSLContext, session: ssl.SSLSession) -> None:
+        with self._lock:
+            self._sessions[key] = (context, session)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contexts.clear()
+            self._sessions.clear()
+
+
+class _SessionResumingContext:
+    """
+    Thin wrapper around shared SSL context, which passes stored TLS session
+    to wrap_socket(). It is used as context of HTTPSConnection.
+    """
+
+    def __init__(self, context: ssl.SSLContext, session: Optional[ssl.SSLSession]) -> None:
+        self.context = context
+        self.session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.context, name)
+
+    def wrap_socket(self, sock: socket.socket, *args, **kwargs) -> ssl.SSLSocket:
+        if self.session is not None:
+            kwargs["session"] = self.session
+        return self.context.wrap_socket(sock, *args, **kwargs)
+
+
+class _FileStorage:
+    """
+    Minimal storage of files used by ConditionalRequest, when no other storage is
+    given. It has the same interface as subscription_manager.cache.CacheStorage and
+    files are written atomically too (temporary file, fsync, rename).
+    """
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(path)
+
+    @staticmethod
+    def read(path: str) -> str:
+        with open(path, "r") as f:
+            return f.read()
+
+    @staticmethod
+    def write(path: str, content: str) -> None:
+        directory = os.path.dirname(path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".%s." % os.path.basename(path))
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def delete(path: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+class ConditionalRequest:
+    """
+    Validators (ETag and Last-Modified) of the response stored in the cache file. The
+    validators are stored in a small JSON file next to the cache file together with the
+    path of the request. When the same GET request is sent once again, then the validators
+    are sent in If-None-Match and If-Modified-Since HTTP headers. When the server responds
+    with 304 Not Modified, then the content of the cache file is used as the content of
+    the response.
+
+    The content of the cache file has to be the same as the content of the response. New
+    validators are not written until commit() is called, because the cache file has to be
+    written first.
+
+    Both files are accessed using the storage of the cache (see CacheStorage in
+    subscription_manager.cache), so validators are written atomically and the content
+    of the cache file waiting for the end of a batch is used for 304 responses.
+    """
+
+    def __init__(self, cache_file: str, validators_file: str, storage: Any = None) -> None:
+        self.cache_file = cache_file
+        self.validators_file = validators_file
+        self.storage = storage if storage is not None else _FileStorage()
+        self._pending: Optional[Dict[str, str]] = None
+
+    def _read_validators(self) -> Dict[str, str]:
+        try:
+            validators = json.loads(self.storage.read(self.validators_file))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(validators, dict):
+            return {}
+        return validators
+
+    def headers(self, handler: str) -> Dict[str, str]:
+        """
+        Return HTTP headers with validators of the cached response of given request
+        :param handler: path of the request
+        :return: Dictionary with HTTP headers. It is empty, when no validators are stored.
+        """
+        validators = self._read_validators()
+        if validators.get("handler") != handler or not self.storage.exists(self.cache_file):
+            return {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def process_result(
+        self, handler: str, result: Dict[str, Any], response: httplib.HTTPResponse
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Process the result of the request sent with validators
+        :param handler: path of the request
+        :param result: dictionary (content, status and headers) of response
+        :param response: response from server
+        :return: The result of the request. When the server responded with 304 Not Modified,
+            then the content of the result is replaced with the content of the cache file. None
+            is returned, when the cache file cannot be read.
+        """
+        if result["status"] == 304:
+            try:
+                result["content"] = self.storage.read(self.cache_file)
+            except OSError as err:
+                log.debug(f"Unable to read cached response from {self.cache_file}: {err}")
+                return None
+            log.debug(f"Response not modified, using content of {self.cache_file}")
+            self._pending = None
+        elif result["status"] == 200:
+            self._pending = {
+                "handler": handler,
+                "etag": response.getheader("ETag"),
+                "last_modified": response.getheader("Last-Modified"),
+            }
+        return result
+
+    def commit(self) -> None:
+        """
+        Write validators of the latest response. It should be called, when the content
+        of the response was written to the cache file.
+        """
+        pending = self._pending
+        self._pending = None
+        if pending is None:
+            return
+        if pending["etag"] is None and pending["last_modified"] is None:
+            self.clear()
+            return
+        try:
+            self.storage.write(self.validators_file, json.dumps(pending))
+        except OSError as err:
+            log.debug(f"Unable to write validators to {self.validators_file}: {err}")
+
+    def clear(self) -> None:
+        """
+        Remove stored validators
+        """
+        self._pending = None
+        try:
+            self.storage.delete(self.validators_file)
+        except OSError as err:
+            log.debug(f"Unable to remove {self.validators_file}: {err}")
+
+
 class BaseRestLib:
     """
     A low-level wrapper around httplib
@@ -593,7 +1050,10 @@ class BaseRestLib:
     responses
     """
 
-    __conn = None
+    # Pool of idle connections shared by all instances
+    connection_pool: ConnectionPool = ConnectionPool()
+    # Cache of SSL contexts and TLS sessions shared by all instances
+    ssl_context_cache: SSLContextCache = SSLContextCache()
 
     ALPHA: float = 0.9
 
@@ -602,6 +1062,10 @@ class BaseRestLib:
     # tomcat 60 seconds)
     KEEP_ALIVE_TIMEOUT: int = 50
 
+    # Request bodies smaller than this size (in bytes) are not compressed, even when
+    # the compression is requested
+    COMPRESS_MIN_SIZE: int = 1024
+
     def __init__(
         self,
         host: str,
@@ -635,6 +1099,7 @@ class BaseRestLib:
         self.headers = {
             "Content-type": "application/json",
             "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
             "x-subscription-manager-version": subman_version,
         }
 
@@ -659,6 +1124,9 @@ class BaseRestLib:
         # We set this to None, because we don't know the truth unless we get
         # first response from the server using cert/key connection
         self.is_consumer_cert_key_valid = None
+        # Connection checked out of the pool is stored per thread, because one instance
+        # of this class can be used by multiple threads (e.g. in rhsm.service)
+        self._thread_state = threading.local()
 
         # Setup basic authentication if specified:
         if username and password:
@@ -666,25 +1134,90 @@ class BaseRestLib:
         elif token:
             self.headers["Authorization"] = "Bearer " + token
 
-    def close_connection(self) -> None:
+    @property
+    def __conn(self) -> Optional[httplib.HTTPSConnection]:
+        """
+        Connection used by current thread for the current request
+        """
+        return getattr(self._thread_state, "conn", None)
+
+    @__conn.setter
+    def __conn(self, conn: Optional[httplib.HTTPSConnection]) -> None:
+        self._thread_state.conn = conn
+
+    def _get_pool_key(self, cert_file: Optional[str] = None, key_file: Optional[str] = None) -> tuple:
+        """
+        Return key used for storing connection in the pool of connections. The first
+        items of the tuple identify server (and proxy server); the last item is the key
+        of SSL context. It includes mtimes of cert and key of the client, so connections
+        created with old cert-key pair are not reused, when the cert or key is rewritten.
         """
-        Try to close connection to server
+        return (
+            self.host,
+            safe_int(self.ssl_port),
+            self.proxy_hostname,
+            safe_int(self.proxy_port),
+            self.proxy_user,
+            self.ca_dir,
+            self._get_ssl_context_key(cert_file, key_file),
+        )
+
+    def _release_connection(self) -> None:
+        """
+        Return connection used by current thread back to the pool of connections
+        :return: None
+        """
+        conn = self.__conn
+        self.__conn = None
+        if conn is not None:
+            self._return_connection(conn)
+
+    def _return_connection(self, conn: httplib.HTTPSConnection) -> None:
+        """
+        Return connection to the pool of connections or close it, when connections
+        should not be reused
+        :param conn: connection with completely read response
+        :return: None
+        """
+        self._store_tls_session(conn)
+        if REUSE_CONNECTION is True:
+            self.connection_pool.release(conn.pool_key, conn)
+        else:
+            _close_https_connection(conn)
+
+    def _discard_connection(self) -> None:
+        """
+        Close connection used by current thread and do not return it to the pool
         :return: None
         """
         if self.__conn is not None:
-            # Do proper TLS shutdown handshake (TLS tear down) first
-            if self.__conn.sock is not None:
-                log.debug(f"Closing HTTPS connection {self.__conn.sock}")
-                try:
-                    self.__conn.sock.unwrap()
-                except ssl.SSLError as err:
-                    log.debug(f"Unable to close TLS connection properly: {err}")
-                else:
-                    log.debug("TLS connection closed")
-            # Then it is possible to close TCP connection
-            self.__conn.close()
+            _close_https_connection(self.__conn)
         self.__conn = None
 
+    def close_connection(self) -> None:
+        """
+        Try to close connection to server. All idle connections to the server
+        in the pool of connections are closed too.
+        :return: None
+        """
+        self._discard_connection()
+        server = self._get_pool_key()[:-1]
+        self.connection_pool.discard(lambda key: key[:-1] == server)
+
+    @contextlib.contextmanager
+    def conditional_get(self, conditional: ConditionalRequest) -> Iterable[ConditionalRequest]:
+        """
+        Context manager sending GET requests of current thread as conditional requests
+        using validators stored by given ConditionalRequest
+        :param conditional: object with validators of cached response
+        """
+        previous = getattr(self._thread_state, "conditional", None)
+        self._thread_state.conditional = conditional
+        try:
+            yield conditional
+        finally:
+            self._thread_state.conditional = previous
+
     def _get_cert_key_list(self) -> List[Tuple[str, str]]:
         """
         Create list of cert-key pairs to be used with the connection
@@ -731,33 +1264,65 @@ class BaseRestLib:
         else:
             log.warning("Unable to load any CA certificate from: %s" % self.ca_dir)
 
-    def _create_connection(self, cert_file: str = None, key_file: str = None) -> httplib.HTTPSConnection:
+    def _get_ca_dir_fingerprint(self) -> tuple:
         """
-        This method tries to return existing connection, when connection exists and limit of connection
-        has not been reached (timeout, max number of requests). When no connection exists, then this
-        method creates new TCP and TLS connection.
+        Return fingerprint of CA certificates in ca_dir. It is a cheap way how to detect
+        that some CA certificate was added, removed or modified without parsing them.
+        :return: tuple of (file name, mtime, size) tuples
         """
+        if self.ca_dir is None or not os.path.isdir(self.ca_dir):
+            return ()
+        fingerprint = []
+        try:
+            for cert_file in sorted(os.listdir(self.ca_dir)):
+                if cert_file.endswith(".pem"):
+                    stat = os.stat(os.path.join(self.ca_dir, cert_file))
+                    fingerprint.append((cert_file, stat.st_mtime_ns, stat.st_size))
+        except OSError as e:
+            raise ConnectionSetupException(e.strerror)
+        return tuple(fingerprint)
 
-        if self.__conn is not None:
-            # Check if it is still possible to use existing connection
-            now = time.time()
-            if now - self.__conn.last_request_time > self.__conn.keep_alive_timeout:
-                log.debug(f"Connection timeout {self.__conn.keep_alive_timeout}. Closing connection...")
-                self.close_connection()
-            elif (
-                self.__conn.max_requests_num is not None
-                and self.__conn.requests_num > self.__conn.max_requests_num
-            ):
-                log.debug(
-                    f"Maximal number of requests ({self.__conn.max_requests_num}) reached. "
-                    "Closing connection..."
-                )
-                self.close_connection()
-            else:
-                log.debug("Reusing connection: %s", self.__conn.sock)
-                return self.__conn
+    @staticmethod
+    def _get_file_mtime(file_path: Optional[str]) -> Optional[int]:
+        if not file_path:
+            return None
+        try:
+            return os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
 
-        log.debug("Creating new connection")
+    def _get_ssl_context_key(self, cert_file: Optional[str] = None, key_file: Optional[str] = None) -> tuple:
+        """
+        Return key used for storing SSL context in the cache of SSL contexts
+        """
+        if self.insecure:
+            ca_fingerprint = None
+        else:
+            ca_fingerprint = (self.ca_dir, self._get_ca_dir_fingerprint())
+        return (
+            bool(self.insecure),
+            ca_fingerprint,
+            cert_file,
+            self._get_file_mtime(cert_file),
+            key_file,
+            self._get_file_mtime(key_file),
+        )
+
+    def _get_ssl_context(
+        self, cert_file: Optional[str] = None, key_file: Optional[str] = None
+    ) -> ssl.SSLContext:
+        """
+        Try to get SSL context from the cache of SSL contexts. When there is no SSL context
+        for current CA certificates and cert-key pair, then new SSL context is created.
+        :param cert_file: path of client certificate
+        :param key_file: path of client key
+        :return: SSL context
+        """
+        context_key = self._get_ssl_context_key(cert_file, key_file)
+        context = self.ssl_context_cache.get_context(context_key)
+        if context is not None:
+            log.debug("Using cached SSL context")
+            return context
 
         # Select the highest TLS version supported by both the client and the server.
         context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
@@ -773,6 +1338,54 @@ class BaseRestLib:
         if cert_file and os.path.exists(cert_file):
             context.load_cert_chain(cert_file, keyfile=key_file)
 
+        self.ssl_context_cache.set_context(context_key, context)
+        return context
+
+    def _store_tls_session(self, conn: httplib.HTTPSConnection) -> None:
+        """
+        Store TLS session of the connection, when the connection is still opened. The session
+        can be used for abbreviated TLS handshake, when new connection to the server is created.
+        """
+        sock = conn.sock
+        if sock is None or not isinstance(sock, ssl.SSLSocket):
+            return
+        try:
+            session = sock.session
+        except (ssl.SSLError, ValueError, OSError):
+            return
+        if session is not None:
+            context = getattr(conn._context, "context", conn._context)
+            self.ssl_context_cache.set_session(conn.pool_key, context, session)
+
+    def _create_connection(self, cert_file: str = None, key_file: str = None) -> httplib.HTTPSConnection:
+        """
+        This method tries to return existing connection, when connection exists and limit of connection
+        has not been reached (timeout, max number of requests). Idle connection with the same cert and key
+        is taken from the pool of connections. When no connection exists, then this method creates new TCP
+        and TLS connection.
+        """
+        pool_key = self._get_pool_key(cert_file, key_file)
+
+        if self.__conn is not None:
+            if self.__conn.pool_key == pool_key and not self.connection_pool.is_expired(self.__conn):
+                log.debug("Reusing connection: %s", self.__conn.sock)
+                return self.__conn
+            # Connection with different cert-key pair cannot be used; return it to the pool
+            self._release_connection()
+
+        if REUSE_CONNECTION is True:
+            conn = self.connection_pool.acquire(pool_key)
+            if conn is not None:
+                log.debug("Reusing connection from pool: %s", conn.sock)
+                self.__conn = conn
+                return conn
+
+        log.debug("Creating new connection")
+
+        ssl_context = self._get_ssl_context(cert_file, key_file)
+        session = self.ssl_context_cache.get_session(pool_key, ssl_context)
+        context = _SessionResumingContext(ssl_context, session)
+
         if self.proxy_hostname and self.proxy_port:
             log.debug(
                 "Using proxy: %s:%s" % (normalized_host(self.proxy_hostname), safe_int(self.proxy_port))
@@ -802,6 +1415,8 @@ class BaseRestLib:
         conn.requests_num = 0
         # Maximal number of requests. None means no limits, when server does not
         conn.max_requests_num = None
+        conn.last_request_time = time.time()
+        conn.pool_key = pool_key
 
         # Do TCP and TLS handshake here before we make any request
         try:
@@ -814,11 +1429,14 @@ class BaseRestLib:
                 # wrap this to carry also the details on the destination host
                 raise ConnectionOSErrorException(self.host, self.ssl_port, self.apihandler, e)
             raise
-        log.debug(f"Created connection: {conn.sock}")
+        if session is not None and isinstance(conn.sock, ssl.SSLSocket) and conn.sock.session_reused:
+            log.debug(f"Created connection using resumed TLS session: {conn.sock}")
+        else:
+            log.debug(f"Created connection: {conn.sock}")
 
-        # Store connection object only in the case, when it is not forbidden
-        if REUSE_CONNECTION is True:
-            self.__conn = conn
+        # Connection is returned to the pool of connections (or closed, when reusing of
+        # connections is forbidden), when the request is finished
+        self.__conn = conn
 
         return conn
 
@@ -1025,6 +1643,7 @@ class BaseRestLib:
         body: str,
         cert_key_pairs: List[Tuple[str, str]],
         description: Optional[str] = None,
+        stream: bool = False,
     ) -> Tuple[Union[Dict[str, Any], None], Union[httplib.HTTPResponse, None]]:
         """
         Try to do HTTP request
@@ -1034,6 +1653,7 @@ class BaseRestLib:
         :param body: body of request if any
         :param cert_key_pairs: list of tuples. Tuple contain cert and key
         :param description: description of request
+        :param stream: when True, then the body of successful response is not read
         :return: tuple of two items. First is dictionary (content, status and header) of response.
             Second item is response from server.
         """
@@ -1048,13 +1668,18 @@ class BaseRestLib:
 
                     ts_start = time.time()
                     conn.last_request_time = ts_start
+                    conn.requests_num += 1
                     conn.request(request_type, handler, body=body, headers=final_headers)
                     ts_end = time.time()
                     response = conn.getresponse()
                     self._update_smoothed_response_time(ts_end - ts_start)
 
+                    if stream and response.status == 200:
+                        content = ""
+                    else:
+                        content = self._read_response_body(response).decode("utf-8")
                     result = {
-                        "content": response.read().decode("utf-8"),
+                        "content": content,
                         "status": response.status,
                         "headers": dict(response.getheaders()),
                     }
@@ -1067,6 +1692,7 @@ class BaseRestLib:
                             % (result, normalized_host(self.host))
                         )
                 except ssl.SSLError:
+                    self._discard_connection()
                     if self.cert_file and not self.cert_dir:
                         id_cert = certificate.create_from_file(self.cert_file)
                         if not id_cert.is_valid():
@@ -1075,10 +1701,12 @@ class BaseRestLib:
                     if not self.cert_dir:
                         raise
                 except socket.gaierror as err:
+                    self._discard_connection()
                     if self.proxy_hostname and self.proxy_port:
                         raise ProxyException(hostname=self.proxy_hostname, port=self.proxy_port, exc=err)
                     raise
                 except (socket.error, OSError) as err:
+                    self._discard_connection()
                     # If we get a ConnectionError here and we are using a proxy,
                     # then the issue was the connection to the proxy, not to the
                     # destination host.
@@ -1104,6 +1732,8 @@ class BaseRestLib:
         headers: dict = None,
         cert_key_pairs: Optional[List[Tuple[str, str]]] = None,
         description: Optional[str] = None,
+        stream: bool = False,
+        compress: bool = False,
     ) -> Dict[str, Any]:
         """
         Make HTTP request to candlepin server
@@ -1113,10 +1743,18 @@ class BaseRestLib:
         :param headers: dictionary with HTTP headers
         :param cert_key_pairs: list of tuples. Tuple contain cert and key
         :param description: description of request
+        :param stream: when True, then the body of successful response is not read at once,
+            but the result contains "stream" iterator yielding decoded items of JSON array
+        :param compress: when True, then body of request is compressed using gzip, when it
+            is not smaller than COMPRESS_MIN_SIZE. Server has to support it.
         :return: Dictionary (content, status and headers) of response.
         """
         handler = self.apihandler + method
 
+        conditional: Optional[ConditionalRequest] = None
+        if request_type == "GET" and not stream:
+            conditional = getattr(self._thread_state, "conditional", None)
+
         # We try to import it here to get fresh value, because rhsm.service can receive
         # several D-BUS API calls with different locale argument (every request have to have
         # different locale)
@@ -1137,7 +1775,7 @@ class BaseRestLib:
         else:
             body = None
 
-        if self.__conn is not None:
+        if REUSE_CONNECTION is True:
             self.headers["Connection"] = "keep-alive"
 
         log.debug("Making request: %s %s" % (request_type, handler))
@@ -1150,19 +1788,28 @@ class BaseRestLib:
             final_headers["Content-Length"] = "0"
         if headers:
             final_headers.update(headers)
+        if compress and body is not None and len(body) >= self.COMPRESS_MIN_SIZE:
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            log.debug(f"Compressing body of request ({len(body)} bytes) using gzip")
+            body = gzip.compress(body)
+            final_headers["Content-Encoding"] = "gzip"
+        if conditional is not None:
+            for name, value in conditional.headers(handler).items():
+                final_headers.setdefault(name, value)
 
         # Try to do request, when it wasn't possible, because server closed connection,
         # then close existing connection and try it once again
         try:
             result, response = self._make_request(
-                request_type, handler, final_headers, body, cert_key_pairs, description
+                request_type, handler, final_headers, body, cert_key_pairs, description, stream
             )
         except httplib.RemoteDisconnected:
             log.debug("Connection closed by server")
-            self.close_connection()
+            self._discard_connection()
             log.debug("Trying request once again")
             result, response = self._make_request(
-                request_type, handler, final_headers, body, cert_key_pairs, description
+                request_type, handler, final_headers, body, cert_key_pairs, description, stream
             )
 
         self._print_debug_info_about_response(result)
@@ -1181,7 +1828,7 @@ class BaseRestLib:
             log.debug("Server wants to keep connection")
         elif connection_http_header == "close":
             log.debug("Server wants to close connection. Closing HTTP connection")
-            self.close_connection()
+            self._discard_connection()
         elif connection_http_header == "":
             log.debug("HTTP header 'Connection' not included in response")
         else:
@@ -1196,9 +1843,20 @@ class BaseRestLib:
                 self.__conn.keep_alive_timeout = keep_alive_timeout
                 log.debug(f"Connection timeout: {keep_alive_timeout} is used from 'Keep-Alive' HTTP header")
             if max_requests_num is not None:
-                self.__conn.max_request_num = max_requests_num
+                # The value is number of requests, which can be still sent using this connection
+                self.__conn.max_requests_num = self.__conn.requests_num + max_requests_num
                 log.debug(f"Max number of requests: {max_requests_num} is used from 'Keep-Alive' HTTP header")
 
+        if stream and result["status"] == 200:
+            # The body of the response will be read later; the connection cannot be used
+            # by other requests until the whole body is read
+            conn = self.__conn
+            self.__conn = None
+            result["stream"] = self._stream_response(response, conn)
+        else:
+            # The response has been read completely; the connection can be used by other requests
+            self._release_connection()
+
         # Look for a time drift and log if the system is significantly different from server clock
         response_sent_at: Optional[str] = response.getheader("date")
         if response_sent_at is not None:
@@ -1216,6 +1874,14 @@ class BaseRestLib:
                     f"Could not check if local clock is off from server's time '{response_sent_at}'"
                 )
 
+        if conditional is not None:
+            conditional_result = conditional.process_result(handler, result, response)
+            if conditional_result is None:
+                log.debug("Cached response not available, trying request once again without validators")
+                conditional.clear()
+                return self._request(request_type, method, params, headers, cert_key_pairs, description)
+            result = conditional_result
+
         # FIXME: we should probably do this in a wrapper method
         # so we can use the request method for normal http
 
@@ -1341,6 +2007,91 @@ class BaseRestLib:
         if "error_description" in body:
             return body["error_description"]
 
+    def _stream_response(
+        self, response: httplib.HTTPResponse, conn: Optional[httplib.HTTPSConnection]
+    ) -> Iterator[Any]:
+        """
+        Yield items of JSON array read from the response in chunks. The connection is
+        returned to the pool, when the whole body of the response was read. When the
+        iteration is not finished, then the connection is closed.
+        :param response: response with unread body
+        :param conn: connection used for the request or None, when it should not be reused
+        """
+        completed = False
+        try:
+            yield from _JSONStream(self._iter_response_body(response)).items()
+            # Read possible whitespaces after the array
+            response.read()
+            completed = True
+        finally:
+            if conn is None:
+                response.close()
+            elif completed:
+                self._return_connection(conn)
+            else:
+                _close_https_connection(conn)
+
+    @staticmethod
+    def _iter_response_body(response: httplib.HTTPResponse) -> Iterator[bytes]:
+        """
+        Yield chunks of the body of the response. When the body is compressed
+        (Content-Encoding is gzip or deflate), then the chunks are decompressed on the fly.
+        :param response: response with unread body
+        """
+        chunks = iter(functools.partial(response.read, STREAM_CHUNK_SIZE), b"")
+        encoding = (response.getheader("Content-Encoding") or "").strip().lower()
+        if encoding in ("gzip", "x-gzip"):
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            data = b""
+        elif encoding == "deflate":
+            # Some servers send raw deflate stream without zlib header
+            first_chunk = next(chunks, b"")
+            try:
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS)
+                data = decompressor.decompress(first_chunk)
+            except zlib.error:
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                data = decompressor.decompress(first_chunk)
+        else:
+            yield from chunks
+            return
+        if data:
+            yield data
+        for chunk in chunks:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+        data = decompressor.flush()
+        if data:
+            yield data
+
+    @classmethod
+    def _read_response_body(cls, response: httplib.HTTPResponse) -> bytes:
+        """
+        Read whole body of the response. Compressed body is decompressed.
+        :param response: response with unread body
+        """
+        if response.getheader("Content-Encoding") is None:
+            return response.read()
+        return b"".join(cls._iter_response_body(response))
+
+    @classmethod
+    def _iterate_content_from_response(cls, request_result: Dict[str, Any]) -> Iterator[Any]:
+        """
+        Return iterator over items of the JSON array in the result of streamed request.
+        :param request_result: Response result from an http request.
+        :return: Iterator yielding items of the array. When the content is not an array,
+            then the whole content is yielded. Nothing is yielded for 204 response.
+        """
+        if "stream" in request_result:
+            return request_result["stream"]
+        content = cls._extract_content_from_response(request_result)
+        if content is None:
+            return iter([])
+        if isinstance(content, list):
+            return iter(content)
+        return iter([content])
+
     @staticmethod
     def _extract_content_from_response(request_result: Dict[str, Any]) -> Any:
         """
@@ -1365,17 +2116,35 @@ class BaseRestLib:
         headers: dict = None,
         cert_key_pairs: List[Tuple[str, str]] = None,
         description: Optional[str] = None,
+        stream: bool = False,
     ) -> Any:
+        """
+        Send GET request. When stream is True, then an iterator is returned instead of
+        decoded content. It yields items of JSON array in the response as soon as they are
+        read from the socket, so the whole body does not have to be kept in the memory.
+        """
         result: Dict[str, Any] = self._request(
-            "GET", method, headers=headers, cert_key_pairs=cert_key_pairs, description=description
+            "GET",
+            method,
+            headers=headers,
+            cert_key_pairs=cert_key_pairs,
+            description=description,
+            stream=stream,
         )
+        if stream:
+            return self._iterate_content_from_response(result)
         return self._extract_content_from_response(result)
 
     def request_post(
-        self, method: str, params: Any = None, headers: dict = None, description: Optional[str] = None
+        self,
+        method: str,
+        params: Any = None,
+        headers: dict = None,
+        description: Optional[str] = None,
+        compress: bool = False,
     ) -> Any:
         result: Dict[str, Any] = self._request(
-            "POST", method, params, headers=headers, description=description
+            "POST", method, params, headers=headers, description=description, compress=compress
         )
         return self._extract_content_from_response(result)
 
@@ -1384,10 +2153,28 @@ class BaseRestLib:
         return self._extract_content_from_response(result)
 
     def request_put(
-        self, method: str, params: Any = None, headers: dict = None, description: Optional[str] = None
+        self,
+        method: str,
+        params: Any = None,
+        headers: dict = None,
+        description: Optional[str] = None,
+        compress: bool = False,
+    ) -> Any:
+        result: Dict[str, Any] = self._request(
+            "PUT", method, params, headers=headers, description=description, compress=compress
+        )
+        return self._extract_content_from_response(result)
+
+    def request_patch(
+        self,
+        method: str,
+        params: Any = None,
+        headers: dict = None,
+        description: Optional[str] = None,
+        compress: bool = False,
     ) -> Any:
         result: Dict[str, Any] = self._request(
-            "PUT", method, params, headers=headers, description=description
+            "PATCH", method, params, headers=headers, description=description, compress=compress
         )
         return self._extract_content_from_response(result)
 
@@ -1413,6 +2200,9 @@ class UEPConnection(BaseConnection):
     Entitlement Platform.
     """
 
+    # Maximal number of threads used by gather() method
+    GATHER_MAX_WORKERS: int = 4
+
     def __init__(self, **kwargs) -> None:
         """
         Multiple ways to authenticate:
@@ -1500,6 +2290,62 @@ class UEPConnection(BaseConnection):
             self.capabilities = self._load_manager_capabilities()
         return capability in self.capabilities
 
+    def _can_compress_request(self) -> bool:
+        """
+        Check if the server accepts request bodies compressed using gzip
+        """
+        return self.has_capability(GZIP_REQUEST_CAPABILITY)
+
+    def gather_async(
+        self, calls: Dict[Any, Callable[[], Any]], max_workers: Optional[int] = None
+    ) -> Dict[Any, concurrent.futures.Future]:
+        """
+        Start independent calls concurrently in a pool of threads. Each thread uses its own
+        connection from the pool of connections. This method does not wait for results.
+        :param calls: dictionary of callables without arguments, e.g. {"owner": lambda: uep.getOwner(uuid)}
+        :param max_workers: maximal number of threads; GATHER_MAX_WORKERS is used, when not specified
+        :return: dictionary with the same keys and future objects of calls as values
+        """
+        if not calls:
+            return {}
+        max_workers = min(len(calls), max_workers or self.GATHER_MAX_WORKERS)
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="UEPConnectionGather"
+        )
+        try:
+            futures = {key: executor.submit(call) for key, call in calls.items()}
+        finally:
+            # Threads are terminated, when all calls are finished
+            executor.shutdown(wait=False)
+        return futures
+
+    def gather(
+        self, calls: Dict[Any, Callable[[], Any]], max_workers: Optional[int] = None
+    ) -> Dict[Any, Any]:
+        """
+        Run independent calls concurrently and wait for all of them. The wall-clock time
+        is close to the time of the slowest call, not the sum of all calls.
+        Example:
+
+            results = uep.gather(
+                {
+                    "compliance": lambda: uep.getCompliance(uuid),
+                    "owner": lambda: uep.getOwner(uuid),
+                }
+            )
+
+        :param calls: dictionary of callables without arguments
+        :param max_workers: maximal number of threads; GATHER_MAX_WORKERS is used, when not specified
+        :return: dictionary with the same keys. Values are results of calls or exceptions raised by calls.
+        """
+        results = {}
+        for key, future in self.gather_async(calls, max_workers).items():
+            try:
+                results[key] = future.result()
+            except Exception as err:
+                results[key] = err
+        return results
+
     def ping(self, *args, **kwargs) -> Any:
         return self.conn.request_get("/status/", description=_("Checking connection status"))
 
@@ -1741,9 +2587,30 @@ class UEPConnection(BaseConnection):
             params["serviceLevel"] = service_level
 
         method = "/consumers/%s" % self.sanitize(uuid)
-        ret = self.conn.request_put(method, params, description=_("Updating consumer information"))
+        # Facts can be large; compress them, when the server supports it
+        compress = facts is not None and self._can_compress_request()
+        ret = self.conn.request_put(
+            method, params, description=_("Updating consumer information"), compress=compress
+        )
         return ret
 
+    def updateConsumerFactsDelta(self, consumer_uuid: str, facts: dict, removed: List[str]) -> dict:
+        """
+        Update only added and changed facts of consumer and remove facts, which
+        do not exist anymore. The server has to have "facts_delta" capability.
+        :param consumer_uuid: UUID of consumer
+        :param facts: Dictionary with new values of added and changed facts
+        :param removed: List of names of removed facts
+        :return: Dict containing response from HTTP server
+        """
+        method = "/consumers/%s/facts" % self.sanitize(consumer_uuid)
+        return self.conn.request_patch(
+            method,
+            {"facts": facts, "removed": removed},
+            description=_("Updating consumer information"),
+            compress=self._can_compress_request(),
+        )
+
     def getGuestIds(self, uuid: str) -> dict:
         method = "/consumers/%s/guestids" % self.sanitize(uuid)
         return self.conn.request_get(method, description=_("Fetching guest information"))
@@ -1784,7 +2651,12 @@ class UEPConnection(BaseConnection):
         package headers we're interested in. See profile.py.
         """
         method = "/consumers/%s/packages" % self.sanitize(consumer_uuid)
-        return self.conn.request_put(method, pkg_dicts, description=_("Updating profile information"))
+        return self.conn.request_put(
+            method,
+            pkg_dicts,
+            description=_("Updating profile information"),
+            compress=self._can_compress_request(),
+        )
 
     def updateCombinedProfile(self, consumer_uuid: str, profile: List[Dict]) -> dict:
         """
@@ -1795,7 +2667,30 @@ class UEPConnection(BaseConnection):
         :return: Dict containing response from HTTP server
         """
         method = "/consumers/%s/profiles" % self.sanitize(consumer_uuid)
-        return self.conn.request_put(method, profile, description=_("Updating profile information"))
+        return self.conn.request_put(
+            method,
+            profile,
+            description=_("Updating profile information"),
+            compress=self._can_compress_request(),
+        )
+
+    def updateCombinedProfileDelta(self, consumer_uuid: str, delta: List[Dict]) -> dict:
+        """
+        Updates only changed parts of the costumers' combined profile. The server
+        has to have "profile_delta" capability.
+        :param consumer_uuid: UUID of consumer
+        :param delta: List of changed parts of combined profile. The list of RPMs is sent as
+            lists of added and removed packages: {"content_type": "rpm", "added": [], "removed": []}.
+            Other changed parts are sent completely: {"content_type": "modulemd", "profile": []}
+        :return: Dict containing response from HTTP server
+        """
+        method = "/consumers/%s/profiles" % self.sanitize(consumer_uuid)
+        return self.conn.request_patch(
+            method,
+            delta,
+            description=_("Updating profile information"),
+            compress=self._can_compress_request(),
+        )
 
     def getConsumer(self, uuid: str) -> dict:
         """
@@ -1863,7 +2758,8 @@ class UEPConnection(BaseConnection):
         consumer_uuid: str,
         serials: Optional[list] = None,
         jwt: Optional[str] = None,
-    ) -> List[dict]:
+        stream: bool = False,
+    ) -> Union[List[dict], Iterator[dict]]:
         """
         Fetch all entitlement certificates for this consumer. Specify a list of serial numbers to
         filter if desired
@@ -1871,6 +2767,7 @@ class UEPConnection(BaseConnection):
         :param consumer_uuid: consumer UUID
         :param serials: list of entitlement serial numbers
         :param jwt: JWT identifying an anonymous system
+        :param stream: If this argument is true, then iterator yielding certificates is returned
         """
         method = "/consumers/%s/certificates" % (self.sanitize(consumer_uuid))
         if serials:
@@ -1880,7 +2777,9 @@ class UEPConnection(BaseConnection):
         if jwt:
             headers["Authorization"] = f"Bearer {jwt}"
 
-        return self.conn.request_get(method, headers=headers, description=_("Fetching certificates"))
+        return self.conn.request_get(
+            method, headers=headers, description=_("Fetching certificates"), stream=stream
+        )
 
     def getCertificateSerials(self, consumerId: str) -> List[dict]:
         """
@@ -1919,12 +2818,15 @@ class UEPConnection(BaseConnection):
         after_date: datetime.datetime = None,
         page: int = 0,
         items_per_page: int = 0,
-    ) -> List[dict]:
+        stream: bool = False,
+    ) -> Union[List[dict], Iterator[dict]]:
         """
         List pools for a given consumer or owner.
 
         Ideally, try to always pass the owner key argument. The old method is deprecated
         and may eventually be removed.
+
+        When stream is True, then iterator yielding pools one by one is returned.
         """
 
         if owner:
@@ -1955,7 +2857,7 @@ class UEPConnection(BaseConnection):
         if items_per_page != 0:
             method = "%s&per_page=%s" % (method, self.sanitize(items_per_page))
 
-        results = self.conn.request_get(method, description=_("Fetching pools"))
+        results = self.conn.request_get(method, description=_("Fetching pools"), stream=stream)
         return results
 
     def getRelease(self, consumerId: str) -> dict:
@@ -1982,11 +2884,14 @@ class UEPConnection(BaseConnection):
         method = "/consumers/%s/available_releases" % self.sanitize(consumerId)
         return self.conn.request_get(method, description=_("Fetching available releases"))
 
-    def getEntitlementList(self, consumerId: str, request_certs: bool = False) -> List[dict]:
+    def getEntitlementList(
+        self, consumerId: str, request_certs: bool = False, stream: bool = False
+    ) -> Union[List[dict], Iterator[dict]]:
         """
         Try to get list of consumed entitlement certificates
         :param consumerId: consumer UUID
         :param request_certs: If this argument is true, then response will include entitlement certs too
+        :param stream: If this argument is true, then iterator yielding entitlements is returned
         :return: List of dictionaries containing information about entitlements
         """
         method = "/consumers/%s/entitlements" % self.sanitize(consumerId)
@@ -1995,7 +2900,9 @@ class UEPConnection(BaseConnection):
             filters = "?exclude=certificates.key&exclude=certificates.cert"
         else:
             filters = ""
-        results = self.conn.request_get(method + filters, description=_("Fetching entitlements"))
+        results = self.conn.request_get(
+            method + filters, description=_("Fetching entitlements"), stream=stream
+        )
         return results
 
     def getServiceLevelList(self, owner_key: str) -> List[str]:
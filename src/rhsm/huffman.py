@@ -13,7 +13,9 @@
 
 import heapq
 import itertools
-from typing import Optional, List, Union, Tuple
+from typing import Any, Optional, List, Union, Tuple
+
+from rhsm.bitstream import BitReader
 
 
 class HuffmanNode:
@@ -106,19 +108,21 @@ class HuffmanNode:
         # the one most recently added gets chosen
         counter = itertools.count()
         # We use the heapq module to make a min priority queue
-        queue: List[Tuple["HuffmanNode", int]] = [(node, next(counter)) for node in nodes]
+        # entries are ordered by plain ints, so the queue does not need to call
+        # the comparison methods of nodes
+        queue: List[Tuple[int, int, "HuffmanNode"]] = [(node.weight, next(counter), node) for node in nodes]
         heapq.heapify(queue)
         while True:
             left: "HuffmanNode"
             right: "HuffmanNode"
-            count: int
-            left, count = heapq.heappop(queue)
+            left = heapq.heappop(queue)[2]
             try:
-                right, count = heapq.heappop(queue)
+                right = heapq.heappop(queue)[2]
             except IndexError:
                 # no more nodes to compare, so a is the root node of the tree
                 return left
-            heapq.heappush(queue, (cls.combine(left, right), next(counter)))
+            node = cls.combine(left, right)
+            heapq.heappush(queue, (node.weight, next(counter), node))
 
     def __lt__(self, other: "HuffmanNode") -> bool:
         return self.weight < other.weight
@@ -147,3 +151,93 @@ class HuffmanNode:
 
     def __repr__(self) -> str:
         return 'HuffmanNode(%d, "%s")' % (self.weight, self.value)
+
+
+class HuffmanDecoder:
+    """
+    Decodes symbols of a Huffman tree from a BitReader using lookup tables
+    instead of walking the tree one bit at a time. The first table is indexed
+    by the next TABLE_BITS bits of the stream; its entries either hold a symbol
+    together with the length of its code, or point to another table for codes
+    that are longer than that.
+    """
+
+    TABLE_BITS = 8
+
+    def __init__(self, root: HuffmanNode) -> None:
+        """
+        :param root:    root node of a complete Huffman tree, as returned
+                        by HuffmanNode.build_tree()
+        """
+        self._root = root
+        self._table = None if root.is_leaf else self._build_table(self._leaf_codes(root))
+
+    @staticmethod
+    def _leaf_codes(root: HuffmanNode) -> List[Tuple[int, int, Any]]:
+        """
+        :param root:    root node of a Huffman tree
+        :return:        list of (code, code length, value) for every leaf,
+                        where code is an unsigned int
+        """
+        codes = []
+        stack = [(root, 0, 0)]
+        while stack:
+            node, code, length = stack.pop()
+            if node.is_leaf:
+                codes.append((code, length, node.value))
+            else:
+                stack.append((node.right, (code << 1) | 1, length + 1))
+                stack.append((node.left, code << 1, length + 1))
+        return codes
+
+    @classmethod
+    def _build_table(cls, codes: List[Tuple[int, int, Any]]) -> Tuple[int, list]:
+        """
+        :param codes:   list of (code, code length, value) of a prefix-free code
+        :return:        tuple (number of bits used as index, list of entries),
+                        where every entry is (value, code length, sub-table)
+        """
+        bits = min(cls.TABLE_BITS, max(length for _code, length, _value in codes))
+        entries: list = [None] * (1 << bits)
+        longer = {}
+        for code, length, value in codes:
+            if length <= bits:
+                # every index starting with this code decodes to the same value
+                start = code << (bits - length)
+                entry = (value, length, None)
+                for index in range(start, start + (1 << (bits - length))):
+                    entries[index] = entry
+            else:
+                rest = length - bits
+                prefix = code >> rest
+                longer.setdefault(prefix, []).append((code & ((1 << rest) - 1), rest, value))
+        for prefix, sub_codes in longer.items():
+            entries[prefix] = (None, bits, cls._build_table(sub_codes))
+        return bits, entries
+
+    def decode(self, reader: BitReader) -> Any:
+        """
+        Read one code from the reader and return the value of the matching
+        leaf.
+
+        :param reader:  bit reader with a Huffman code as the next value
+        :return:        value of the leaf, or None when the stream ends
+                        before a complete code was read
+        """
+        if self._table is None:
+            # The only leaf of the tree has a one-bit code
+            if reader.remaining == 0:
+                return None
+            reader.skip(1)
+            return self._root.value
+        table = self._table
+        while True:
+            bits, entries = table
+            value, length, sub_table = entries[reader.peek(bits)]
+            if length > reader.remaining:
+                reader.skip(length)
+                return None
+            reader.skip(length)
+            if sub_table is None:
+                return value
+            table = sub_table
@@ -13,10 +13,10 @@
 
 import itertools
 import zlib
-from typing import Tuple, List, Any
+from typing import Dict, List, Optional, Tuple
 
-from rhsm.bitstream import GhettoBitStream
-from rhsm.huffman import HuffmanNode
+from rhsm.bitstream import BitReader
+from rhsm.huffman import HuffmanDecoder, HuffmanNode
 
 # this is the "sentinel" value used for the path node that indicates the end
 # of a path
@@ -53,13 +53,24 @@ class PathTree:
         :type  data:    binary string
         """
         word_leaves, unused_bits = self._unpack_data(data)
-        HuffmanNode.build_tree(word_leaves)
-        word_dict = dict((node.code, node.value) for node in word_leaves)
-        bitstream = GhettoBitStream(unused_bits)
+        word_decoder = HuffmanDecoder(HuffmanNode.build_tree(word_leaves))
+        bitstream = BitReader(unused_bits)
         path_leaves = self._generate_path_leaves(bitstream)
-        HuffmanNode.build_tree(path_leaves)
-        path_dict = dict((node.code, node) for node in path_leaves)
-        self.path_tree = self._generate_path_tree(path_dict, path_leaves, word_dict, bitstream)
+        path_decoder = HuffmanDecoder(HuffmanNode.build_tree(path_leaves))
+        self.path_tree = self._generate_path_tree(path_decoder, path_leaves, word_decoder, bitstream)
+
+    @property
+    def path_tree(self) -> dict:
+        """
+        Root node of the path tree
+        """
+        return self._path_tree
+
+    @path_tree.setter
+    def path_tree(self, tree: dict) -> None:
+        self._path_tree = tree
+        # compiled lazily by the first match
+        self._matcher = None
 
     def match_path(self, path: str) -> bool:
         """
@@ -71,9 +82,26 @@ class PathTree:
         :param path:    absolute path to match against the tree
         :return:        True iff there is a match, else False
         """
+        return self.match_path_prefix(path)[0]
+
+    def match_path_prefix(self, path: str) -> Tuple[bool, Optional[str]]:
+        """
+        Same as match_path, but also tells which part of the path was matched
+        by the tree, e.g. "/foo/path" when "/foo/path/bar/a" is matched against
+        an entitled "/foo/$releasever".
+        :param path:    absolute path to match against the tree
+        :return:        tuple: (True iff there is a match, matched prefix of
+                        the path or None when there is no match)
+        """
         if not path.startswith("/"):
             raise ValueError('path must start with "/"')
-        return self._traverse_tree(self.path_tree, path.strip("/").split("/"))
+        if self._matcher is None:
+            self._matcher = _PathMatcher(self._path_tree)
+        words = path.strip("/").split("/")
+        length = self._matcher.match(words)
+        if length < 0:
+            return False, None
+        return True, "/" + "/".join(words[:length])
 
     def __str__(self) -> str:
         paths = []
@@ -102,40 +130,6 @@ class PathTree:
                 else:
                     self.build_path_list(acc, tree=v, curr_path="%s/%s" % (curr_path, k))
 
-    @classmethod
-    def _traverse_tree(cls, tree: dict, words: list) -> bool:
-        """
-        Helper method for match_path that does recursive matching
-        :param tree:    A dict representing a node in the greater path tree
-        :param words:   list of words to match, the result of spliting a path
-                        by the "/" separator. Words must be sorted with the
-                        next word to match being at words[0]
-        :return:        True iff there is a match, else False
-        """
-        if PATH_END in tree:
-            # we hit the end of a path in the tree, so the match was successful
-            return True
-        if words:
-            words_to_try = []
-            # Look fo an exact match
-            if words[0] in tree:
-                words_to_try.append(words[0])
-            if words[0] == LISTING and len(words) == 1:
-                return True
-
-            # we allow any word to match against entitlement variables
-            # such as "$releasever".
-            for word in list(tree.keys()):
-                if word.startswith("$"):
-                    words_to_try.append(word)
-
-            for word in words_to_try:
-                # keep trying for each child
-                for child in tree[word]:
-                    if cls._traverse_tree(child, words[1:]):
-                        return True
-        return False
-
     @staticmethod
     def _unpack_data(data: bytes) -> Tuple[list, bytes]:
         """
@@ -161,7 +155,7 @@ class PathTree:
         return nodes, decompress.unused_data
 
     @staticmethod
-    def _get_node_count(bitstream: GhettoBitStream) -> int:
+    def _get_node_count(bitstream: BitReader) -> int:
         """
         Determine the total number of nodes in the uncompressed tree. The
         algorithm for doing so is described in the v3 entitlement cert
@@ -183,12 +177,10 @@ class PathTree:
         # to define the number of nodes
         else:
             num_bytes = first_byte - 128
-            count_bytes = [bitstream.pop_byte() for x in range(num_bytes)]
-            node_count = bitstream.combine_bytes(count_bytes)
-            return node_count
+            return bitstream.read(num_bytes * 8)
 
     @classmethod
-    def _generate_path_leaves(cls, bitstream: GhettoBitStream) -> List[HuffmanNode]:
+    def _generate_path_leaves(cls, bitstream: BitReader) -> List[HuffmanNode]:
         """
         Given the remaining bits after decompressing the word list, this
         generates HuffmanNode objects to represent each node (besides root)
@@ -208,38 +200,24 @@ class PathTree:
             nodes.append(node)
         return nodes
 
-    @staticmethod
-    def _get_leaf_from_dict(code_dict: dict, bitstream: GhettoBitStream) -> Any:
-        """
-        Given a bit stream and dictionary where keys are huffman codes, return
-        the value from that dictionary that corresponds to the next huffman
-        code in the stream. This is a substitute for actually traversing the
-        tree, and this likely performs better in large data sets
-        :param code_dict:   any dictionary where keys are huffman codes
-        :param bitstream:   bit stream with a huffman code as the next value
-        :return:            value from the dict
-        """
-        code = ""
-        for bit in bitstream:
-            code += bit
-            if code in code_dict:
-                return code_dict[code]
-
     @classmethod
     def _generate_path_tree(
-        cls, path_dict: dict, path_leaves: List[HuffmanNode], word_dict: dict, bitstream: GhettoBitStream
+        cls,
+        path_decoder: HuffmanDecoder,
+        path_leaves: List[HuffmanNode],
+        word_decoder: HuffmanDecoder,
+        bitstream: BitReader,
     ) -> dict:
         """
         Once huffman trees have been generated for the words and for the path
         nodes, this method uses them and the bit stream to create the path tree
         that can be traversed to match potentially authorized paths
-        :param path_dict:   dictionary where keys are huffman codes and values
-                            are path nodes
+        :param path_decoder: decoder of huffman codes of path nodes
         :param path_leaves: leaf nodes from the huffman tree of path nodes. the
                             values will be constructed into a new tree that can
                             be traversed to match actual paths
-        :param word_dict:   dict where keys are huffman codes and values are
-                            words from the zlib-compressed word list
+        :param word_decoder: decoder of huffman codes of words from the
+                            zlib-compressed word list
         :param bitstream:   bit stream where the rest of the bits describe
                             how to use words as references between nodes in
                             the path tree. This format is described in detail
@@ -250,12 +228,14 @@ class PathTree:
         values.insert(0, root)
         for value in values:
             while True:
-                word = cls._get_leaf_from_dict(word_dict, bitstream)
+                word = word_decoder.decode(bitstream)
                 # check for end of node
                 if not word:
                     break
-                path_node = cls._get_leaf_from_dict(path_dict, bitstream)
-                value.setdefault(word, []).append(path_node.value)
+                path_node = path_decoder.decode(bitstream)
+                if path_node is None:
+                    break
+                value.setdefault(word, []).append(path_node)
         # add the sentinel value that marks this explicitly as the end of a path
         # there should usually only be one of these nodes
         for value in values:
@@ -263,3 +243,75 @@ class PathTree:
                 value[PATH_END] = None
 
         return root
+
+
+class _PathMatcher:
+    """
+    Flattened form of a path tree used for matching. Every node of the tree
+    gets an index into three lists: whether a path ends in the node, children
+    of the node by word, and children of all the "$variable" words of the node,
+    which match any word. Nodes shared by several parents are compiled only once.
+    """
+
+    def __init__(self, tree: dict) -> None:
+        """
+        :param tree:    root node of a path tree, as built by PathTree
+        """
+        self.ends: List[bool] = []
+        self.children: List[Dict[str, Tuple[int, ...]]] = []
+        self.wildcards: List[Tuple[int, ...]] = []
+        indexes: Dict[int, int] = {}
+        nodes: List[dict] = []
+
+        def index_of(node: dict) -> int:
+            if id(node) not in indexes:
+                indexes[id(node)] = len(nodes)
+                nodes.append(node)
+            return indexes[id(node)]
+
+        index_of(tree)
+        # nodes grows while we iterate, until every reachable node is compiled
+        for node in nodes:
+            children = {}
+            wildcards = []
+            for word, child_nodes in node.items():
+                if word == PATH_END:
+                    continue
+                child_indexes = tuple(index_of(child) for child in child_nodes)
+                children[word] = child_indexes
+                if word.startswith("$"):
+                    wildcards.extend(child_indexes)
+            self.ends.append(PATH_END in node)
+            self.children.append(children)
+            self.wildcards.append(tuple(wildcards))
+
+    def match(self, words: List[str]) -> int:
+        """
+        Match the words of a path against the tree, trying children in the
+        same order as a recursive traversal would: the exact word first, then
+        the "$variable" words.
+        :param words:   list of words of the path split by the "/" separator
+        :return:        number of words matched before a path in the tree
+                        ended, or -1 if there is no match
+        """
+        ends = self.ends
+        children = self.children
+        wildcards = self.wildcards
+        count = len(words)
+        stack = [(0, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if ends[node]:
+                return depth
+            if depth == count:
+                continue
+            word = words[depth]
+            if word == LISTING and depth + 1 == count:
+                return count
+            depth += 1
+            # the stack is LIFO, so push the children in reverse order
+            for child in reversed(wildcards[node]):
+                stack.append((child, depth))
+            for child in reversed(children[node].get(word, ())):
+                stack.append((child, depth))
+        return -1
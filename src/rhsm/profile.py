@@ -10,12 +10,14 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 #
 import _io
+import glob
+import hashlib
 import logging
 
 import importlib.util
 import rpm
 import os
-from typing import List, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from rhsm import ourjson as json
 from rhsm.utils import suppress_output
@@ -50,6 +52,17 @@ if use_zypper:
 else:
     REPOSITORY_PATH = "/etc/yum.repos.d/redhat.repo"
 
+# Files changed, when modules are enabled/disabled, when repositories are enabled/disabled
+# or when metadata of repositories are refreshed. All of them can change modulemd profile.
+MODULES_STATE_GLOBS: List[str] = [
+    "/etc/dnf/modules.d/*",
+    "/etc/dnf/modules.defaults.d/*",
+    "/etc/yum.repos.d/*.repo",
+    "/var/cache/dnf/*/repodata/repomd.xml",
+]
+
+DPKG_STATUS_PATH = "/var/lib/dpkg/status"
+
 log = logging.getLogger(__name__)
 
 
@@ -227,9 +240,12 @@ class EnabledReposProfile:
 
 class Package:
     """
-    Represents a package installed on the system.
+    Represents a package installed on the system. Packages are hashable and they
+    can be stored in sets; profiles of thousands of packages are compared using sets.
     """
 
+    __slots__ = ("name", "version", "release", "arch", "epoch", "vendor")
+
     def __init__(
         self, name: str, version: str, release: str, arch: str, epoch: int = 0, vendor: str = None
     ) -> None:
@@ -251,6 +267,28 @@ class Package:
             "vendor": self._normalize_string(self.vendor),  # bz1519512 handle vendors that aren't utf-8
         }
 
+    @classmethod
+    def from_dict(cls, pkg_dict: dict) -> "Package":
+        """Create package from the dict representation returned by to_dict()."""
+        return cls(
+            name=pkg_dict["name"],
+            version=pkg_dict["version"],
+            release=pkg_dict["release"],
+            arch=pkg_dict["arch"],
+            epoch=pkg_dict["epoch"],
+            vendor=pkg_dict["vendor"],
+        )
+
+    def _key(self) -> tuple:
+        return (
+            self.name,
+            self.version,
+            self.release,
+            self.arch,
+            self.epoch,
+            self._normalize_string(self.vendor),
+        )
+
     def __eq__(self, other: "Package") -> bool:
         """
         Compare one profile to another to determine if anything has changed.
@@ -258,17 +296,10 @@ class Package:
         if not isinstance(self, type(other)):
             return False
 
-        if (
-            self.name == other.name
-            and self.version == other.version
-            and self.release == other.release
-            and self.arch == other.arch
-            and self.epoch == other.epoch
-            and self._normalize_string(self.vendor) == self._normalize_string(other.vendor)
-        ):
-            return True
+        return self._key() == other._key()
 
-        return False
+    def __hash__(self) -> int:
+        return hash(self._key())
 
     def __str__(self) -> str:
         return "<Package: %s %s %s>" % (self.name, self.version, self.release)
@@ -281,6 +312,77 @@ class Package:
         return value
 
 
+class PackageDiff:
+    """
+    Difference between two lists of packages. Packages with the same name and
+    architecture, which were replaced by exactly one other version of the package,
+    are reported as changed (updated or downgraded) and not as added and removed.
+    """
+
+    def __init__(
+        self,
+        added: List[Package],
+        removed: List[Package],
+        changed: List[Tuple[Package, Package]],
+    ) -> None:
+        self.added: List[Package] = added
+        self.removed: List[Package] = removed
+        # List of tuples (old package, new package)
+        self.changed: List[Tuple[Package, Package]] = changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self) -> str:
+        return "<PackageDiff: %d added, %d removed, %d changed>" % (
+            len(self.added),
+            len(self.removed),
+            len(self.changed),
+        )
+
+
+def _package_sort_key(package: Package) -> tuple:
+    return tuple("" if value is None else str(value) for value in package._key())
+
+
+def diff_packages(old_packages: Iterable[Package], new_packages: Iterable[Package]) -> PackageDiff:
+    """
+    Compute difference between two lists of packages using sets of packages. The
+    order of packages in lists does not matter.
+    :param old_packages: e.g. packages from cached profile
+    :param new_packages: e.g. currently installed packages
+    :return: Difference with sorted lists of added, removed and changed packages
+    """
+    old_set = set(old_packages)
+    new_set = set(new_packages)
+    added = new_set - old_set
+    removed = old_set - new_set
+
+    # Pair the only removed and the only added package with the same name and arch
+    removed_by_id: Dict[tuple, Optional[Package]] = {}
+    for package in removed:
+        package_id = (package.name, package.arch)
+        removed_by_id[package_id] = None if package_id in removed_by_id else package
+    added_by_id: Dict[tuple, Optional[Package]] = {}
+    for package in added:
+        package_id = (package.name, package.arch)
+        added_by_id[package_id] = None if package_id in added_by_id else package
+
+    changed: List[Tuple[Package, Package]] = []
+    for package_id, new_package in added_by_id.items():
+        old_package = removed_by_id.get(package_id)
+        if new_package is not None and old_package is not None:
+            changed.append((old_package, new_package))
+            added.discard(new_package)
+            removed.discard(old_package)
+
+    return PackageDiff(
+        added=sorted(added, key=_package_sort_key),
+        removed=sorted(removed, key=_package_sort_key),
+        changed=sorted(changed, key=lambda pair: _package_sort_key(pair[1])),
+    )
+
+
 class RPMProfile:
     def __init__(self, from_file: _io.TextIOWrapper = None) -> None:
         """
@@ -294,16 +396,7 @@ class RPMProfile:
             json_buffer = from_file.read()
             pkg_dicts = json.loads(json_buffer)
             for pkg_dict in pkg_dicts:
-                self.packages.append(
-                    Package(
-                        name=pkg_dict["name"],
-                        version=pkg_dict["version"],
-                        release=pkg_dict["release"],
-                        arch=pkg_dict["arch"],
-                        epoch=pkg_dict["epoch"],
-                        vendor=pkg_dict["vendor"],
-                    )
-                )
+                self.packages.append(Package.from_dict(pkg_dict))
         else:
             log.debug("Loading current RPM profile.")
             ts = rpm.TransactionSet()
@@ -364,11 +457,7 @@ class RPMProfile:
         if len(self.packages) != len(other.packages):
             return False
 
-        for pkg in self.packages:
-            if pkg not in other.packages:
-                return False
-
-        return True
+        return not diff_packages(other.packages, self.packages)
 
 
 class DebProfile(object):
@@ -420,3 +509,48 @@ if dnf is not None or yum is not None:
 
 if apt is not None:
     PROFILE_MAP["deb"] = DebProfile
+
+
+def _get_rpmdb_path() -> str:
+    try:
+        return rpm.expandMacro("%{_dbpath}")
+    except Exception:
+        return "/var/lib/rpm"
+
+
+def get_profile_fingerprint() -> str:
+    """
+    Return fingerprint of the sources of the profile. It is computed only from the size and
+    modification time of the files of the package database, of the module state files and
+    of the repository metadata, and from the content of the repository file. No package
+    database is opened and dnf is not initialized, so it is much cheaper than collecting
+    the profile. When the fingerprint has not changed, then the profile has not changed either.
+    :return: String with hexadecimal digest
+    """
+    paths: List[str] = []
+    if "rpm" in PROFILE_MAP:
+        rpmdb_path = _get_rpmdb_path()
+        try:
+            paths.extend(os.path.join(rpmdb_path, name) for name in sorted(os.listdir(rpmdb_path)))
+        except OSError:
+            paths.append(rpmdb_path)
+    if "modulemd" in PROFILE_MAP:
+        for pattern in MODULES_STATE_GLOBS:
+            paths.extend(sorted(glob.glob(pattern)))
+    if "deb" in PROFILE_MAP:
+        paths.append(DPKG_STATUS_PATH)
+
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            digest.update(f"{path}\0-\n".encode("utf-8", "replace"))
+        else:
+            digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode("utf-8", "replace"))
+    try:
+        with open(REPOSITORY_PATH, "rb") as repo_file:
+            digest.update(repo_file.read())
+    except OSError:
+        pass
+    return digest.hexdigest()
@@ -182,6 +182,7 @@ class ConfigDBusObject(base_object.BaseObject):
     )
     @util.dbus_handle_sender
     @util.dbus_handle_exceptions
+    @util.dbus_clears_cached_results
     def Set(self, property_name, new_value, locale, sender=None):
         """
         Method used for setting only one value. When more than one value is going to be set, then it is
@@ -206,6 +207,7 @@ class ConfigDBusObject(base_object.BaseObject):
     )
     @util.dbus_handle_sender
     @util.dbus_handle_exceptions
+    @util.dbus_clears_cached_results
     def SetAll(self, configuration, locale, sender=None):
         """
         Method for setting multiple configuration options. Of course all of them could be set.
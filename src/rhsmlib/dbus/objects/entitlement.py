@@ -31,6 +31,7 @@ log = logging.getLogger(__name__)
 
 
 class EntitlementDBusImplementation(base_object.BaseImplementation):
+    @util.dbus_cached_result()
     def get_status(self, on_date: str) -> dict:
         """Get status of entitlements."""
         on_date: Union[str, datetime.datetime] = None if on_date == "" else self._parse_date(on_date)
@@ -45,6 +46,7 @@ class EntitlementDBusImplementation(base_object.BaseImplementation):
 
         return status
 
+    @util.dbus_cached_result()
     def get_pools(self, options: dict, proxy_options: dict) -> dict:
         """Get pools that are installed, available and consumed by this system."""
         on_date: str = options.setdefault("on_date", "")
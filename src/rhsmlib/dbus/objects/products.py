@@ -32,6 +32,7 @@ log = logging.getLogger(__name__)
 
 
 class ProductsDBusImplementation(base_object.BaseImplementation):
+    @util.dbus_cached_result()
     def list_installed_products(self, filter_string: str, proxy_options: dict) -> List[tuple]:
         uep: UEPConnection = self.build_uep(proxy_options, proxy_only=True)
         installed_products = InstalledProducts(uep)
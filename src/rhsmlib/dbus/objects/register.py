@@ -480,6 +480,7 @@ class DomainSocketRegisterDBusObject(base_object.BaseObject):
         out_signature="s",
     )
     @util.dbus_handle_exceptions
+    @util.dbus_clears_cached_results
     def Register(self, org, username, password, options, connection_options, locale):
         """
         This method registers the system using basic auth
@@ -510,6 +511,7 @@ class DomainSocketRegisterDBusObject(base_object.BaseObject):
         out_signature="s",
     )
     @util.dbus_handle_exceptions
+    @util.dbus_clears_cached_results
     def RegisterWithActivationKeys(self, org, activation_keys, options, connection_options, locale):
         """
         This method registers the system using organization and activation keys
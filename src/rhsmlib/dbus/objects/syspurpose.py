@@ -211,6 +211,7 @@ class SyspurposeDBusObject(base_object.BaseObject):
     )
     @util.dbus_handle_sender
     @util.dbus_handle_exceptions
+    @util.dbus_clears_cached_results
     def SetSyspurpose(self, syspurpose_values, locale, sender):
         """
         Set syspurpose values
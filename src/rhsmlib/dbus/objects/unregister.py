@@ -74,6 +74,7 @@ class UnregisterDBusObject(base_object.BaseObject):
     )
     @util.dbus_handle_sender
     @util.dbus_handle_exceptions
+    @util.dbus_clears_cached_results
     def Unregister(self, proxy_options, locale, sender=None):
         """
         Definition and implementation of D-Bus method
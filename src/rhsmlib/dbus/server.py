@@ -28,6 +28,7 @@ from functools import partial
 
 from rhsmlib.services import config
 from rhsmlib.dbus.dbus_utils import pid_of_sender
+from rhsmlib.dbus.util import result_cache
 from rhsm.config import get_config_parser
 from rhsmlib.file_monitor import create_filesystem_watcher, DirectoryWatch
 from rhsmlib.file_monitor import (
@@ -81,11 +82,10 @@ class Server:
         of a class and a dictionary of arguments to send that class's constructor.
         """
 
-        # Do not allow reusing connection, because server uses multiple threads. If reusing connection
-        # was used, then two threads could try to use the connection in the almost same time.
-        # It means that one thread could send request and the second one could send second request
-        # before the first thread received response. This could lead to raising exception CannotSendRequest.
-        connection.REUSE_CONNECTION = False
+        # Reusing of connections is allowed, because server uses multiple threads, but connections
+        # are checked out of the pool of connections exclusively by one thread. Thus, two threads
+        # cannot send request using the same connection in the almost same time.
+        connection.REUSE_CONNECTION = True
 
         init_logger(parser)
 
@@ -128,11 +128,12 @@ class Server:
             self.objects.append(clazz_instance)
             self.object_map[str(clazz.__name__)] = clazz_instance
 
-        consumer_dir_list = []
-        entitlement_dir_list = []
-        config_dir_list = []
-        products_dir_list = []
-        syspurpose_dir_list = []
+        # Cached results of D-Bus methods have to be dropped before signals are emitted
+        consumer_dir_list = [result_cache.clear]
+        entitlement_dir_list = [result_cache.clear]
+        config_dir_list = [result_cache.clear]
+        products_dir_list = [result_cache.clear]
+        syspurpose_dir_list = [result_cache.clear]
         if "EntitlementDBusObject" in self.object_map:
             entitlement_dir_list.append(self.object_map["EntitlementDBusObject"].reload)
             consumer_dir_list.append(self.object_map["EntitlementDBusObject"].reload)
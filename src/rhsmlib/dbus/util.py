@@ -11,8 +11,13 @@
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
 
+import functools
 import logging
 import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
 import decorator
 import dbus.service
 import json
@@ -20,16 +25,118 @@ import re
 
 from rhsmlib.dbus import exceptions
 from rhsmlib.client_info import DBusSender
+from subscription_manager import i18n
 
 log = logging.getLogger(__name__)
 
 __all__ = [
+    "dbus_cached_result",
+    "dbus_clears_cached_results",
     "dbus_handle_exceptions",
     "dbus_handle_sender",
     "dbus_service_method",
     "dbus_service_signal",
+    "result_cache",
 ]
 
+# Default time (in seconds), when results of D-Bus methods are reused
+RESULT_CACHE_TTL = 10.0
+
+
+class ResultCache:
+    """
+    In-memory cache of results of D-Bus methods shared by all D-Bus objects. Results
+    expire after their TTL, and the whole cache is cleared, when a file or directory
+    watched by rhsm.service is changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        # Incremented by clear(); results computed before clearing are not stored
+        self.generation: int = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Return tuple (found, result). Expired results are not found.
+        """
+        with self._lock:
+            item = self._results.get(key)
+            if item is None:
+                return False, None
+            if item[0] <= time.monotonic():
+                del self._results[key]
+                return False, None
+            return True, item[1]
+
+    def set(self, key: Hashable, result: Any, ttl: float, generation: int) -> None:
+        """
+        Store the result, when the cache was not cleared since the given generation
+        """
+        with self._lock:
+            if generation == self.generation:
+                self._results[key] = (time.monotonic() + ttl, result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._results.clear()
+
+
+result_cache = ResultCache()
+
+
+def dbus_cached_result(ttl: float = RESULT_CACHE_TTL) -> Callable:
+    """
+    Decorator of methods of D-Bus implementations reusing their results. Results are
+    identified by the method, its arguments and the language of the current thread.
+    Exceptions are not cached. Cached results are shared, so they must not be modified.
+
+    The cache is cleared by D-Bus methods changing the state of the system (see
+    dbus_clears_cached_results()), so their changes are visible immediately. Changes done
+    by other processes (e.g. subscription-manager CLI or rhsmcertd) are noticed by
+    DirectoryWatch callbacks, which are debounced by 0.2 - 2 seconds. Within this window
+    (and never longer than ttl) a client can get results from before such change.
+    :param ttl: time in seconds, when the result is reused
+    """
+
+    def wrapper(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def cached(self, *args, **kwargs):
+            key = (
+                func.__qualname__,
+                json.dumps([args, kwargs], sort_keys=True, default=str),
+                getattr(i18n.LOCALE, "language", None),
+            )
+            found, result = result_cache.get(key)
+            if found:
+                log.debug("Using cached result of %s" % func.__qualname__)
+                return result
+            generation: int = result_cache.generation
+            result = func(self, *args, **kwargs)
+            result_cache.set(key, result, ttl, generation)
+            return result
+
+        return cached
+
+    return wrapper
+
+
+@decorator.decorator
+def dbus_clears_cached_results(func, *args, **kwargs):
+    """
+    Decorator of D-Bus methods changing the state of the system. The cache of results
+    is cleared even when the method fails, because it could change the state partially.
+    :param func: method with implementation of own logic of D-Bus method
+    :param args: arguments of D-Bus method
+    :param kwargs: keyed arguments of D-Bus method
+    :return: result of D-Bus method
+    """
+    try:
+        return func(*args, **kwargs)
+    finally:
+        result_cache.clear()
+
 
 @decorator.decorator
 def dbus_handle_sender(func, *args, **kwargs):
@@ -9,9 +9,17 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 #
-from typing import Dict, List, Union
+import concurrent.futures
+import contextvars
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
 
 from rhsmlib.facts import collector
+from rhsmlib.facts import command
 from rhsmlib.facts import custom
 from rhsmlib.facts import host_collector
 from rhsmlib.facts import hwprobe
@@ -21,9 +29,35 @@ from rhsmlib.facts import cloud_facts
 from rhsmlib.facts import pkg_arches
 from rhsmlib.facts import network
 
+log = logging.getLogger(__name__)
+
 
 class AllFactsCollector(collector.FactsCollector):
-    def __init__(self):
+    """
+    Collector running all other collectors. Collectors are run concurrently in a pool
+    of threads. A collector is started, when all collectors it depends on are finished,
+    and it gets their facts as collected_hw_info. Facts of collectors are merged in
+    the order of self.collectors, so later collectors can override facts of earlier ones.
+    """
+
+    # Time in seconds, when one collector has to finish its work. Facts of collector
+    # that does not finish in this time are not included in results and get_all() does
+    # not wait for it. Commands run by the collector using CommandExecutor are killed at
+    # this time. Other blocking work of the collector (e.g. network requests) is not
+    # interrupted; it continues in a daemon thread, which does not block exit of process.
+    COLLECTOR_TIMEOUT = 60.0
+
+    # Time in seconds, when cached facts are used at most. Some sources (e.g. DNS records)
+    # cannot be included in fingerprints, so all facts are collected again from time to time.
+    # The cache is meant for periodic checks; explicit updates pass an empty cache to run all collectors.
+    CACHE_MAX_AGE = 24 * 60 * 60
+
+    def __init__(self, cache: Optional[Dict[str, Dict]] = None):
+        """
+        :param cache: dictionary with cached facts of collectors; it is updated in place
+            with newly collected facts, so the caller can store it for next run
+        """
+        self.cache: Optional[Dict[str, Dict]] = cache
         self.collectors: List[type(collector.FactsCollector)] = [
             collector.StaticFactsCollector,
             host_collector.HostCollector,
@@ -35,10 +69,167 @@ class AllFactsCollector(collector.FactsCollector):
             cloud_facts.CloudFactsCollector,
             pkg_arches.SupportedArchesCollector,
         ]
+        # Collectors using facts gathered by other collectors. Custom facts are included,
+        # because they can override facts used for detection.
+        self.dependencies: Dict[type(collector.FactsCollector), List[type(collector.FactsCollector)]] = {
+            # dmi.* and virt.* facts are used for detection of cloud provider
+            cloud_facts.CloudFactsCollector: [
+                host_collector.HostCollector,
+                custom.CustomFactsCollector,
+            ],
+            # distribution.* facts are used for detection of supported architectures
+            pkg_arches.SupportedArchesCollector: [
+                hwprobe.HardwareCollector,
+                custom.CustomFactsCollector,
+            ],
+        }
+        self.timeouts: Dict[type(collector.FactsCollector), float] = {}
+
+    def _get_dependencies(
+        self, fact_collector_cls: type(collector.FactsCollector)
+    ) -> List[type(collector.FactsCollector)]:
+        """
+        Return list of collectors, which have to be finished before given collector is started
+        """
+        return [
+            dependency
+            for dependency in self.dependencies.get(fact_collector_cls, [])
+            if dependency in self.collectors
+        ]
+
+    @staticmethod
+    def _get_fingerprint(fact_collector: collector.FactsCollector, collected_hw_info: Dict) -> Optional[str]:
+        """
+        Return digest of fingerprint of collector and facts it gets from other collectors
+        or None, when facts of the collector cannot be cached
+        """
+        try:
+            fingerprint = fact_collector.get_fingerprint()
+        except Exception as err:
+            log.debug(f"Unable to get fingerprint of {type(fact_collector).__name__}: {err}")
+            return None
+        if fingerprint is None:
+            return None
+        data: str = json.dumps([fingerprint, collected_hw_info], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _collect(
+        self, fact_collector_cls: type(collector.FactsCollector), collected_hw_info: Dict
+    ) -> Tuple[Dict[str, Union[str, int, bool, None]], Optional[Dict]]:
+        """
+        Return tuple (facts, cache entry). The cache entry is None, when facts cannot be
+        cached. The cache is not modified here, because the collector can run in its thread
+        after it timed out; the entry is stored by _run_collectors() only for collectors
+        that finished in time.
+        """
+        fact_collector: collector.FactsCollector = fact_collector_cls(collected_hw_info=collected_hw_info)
+        if self.cache is None:
+            return fact_collector.get_all(), None
+
+        name: str = fact_collector_cls.__name__
+        fingerprint: Optional[str] = self._get_fingerprint(fact_collector, collected_hw_info)
+        cached: Dict = self.cache.get(name) or {}
+        if (
+            fingerprint is not None
+            and cached.get("fingerprint") == fingerprint
+            and 0 <= time.time() - cached.get("timestamp", 0) < self.CACHE_MAX_AGE
+        ):
+            log.debug(f"Sources of {name} did not change, using cached facts")
+            return dict(cached["facts"]), cached
+
+        facts: Dict[str, Union[str, int, bool, None]] = fact_collector.get_all()
+        if fingerprint is None:
+            return facts, None
+        return facts, {"fingerprint": fingerprint, "timestamp": time.time(), "facts": facts}
 
     def get_all(self) -> Dict[str, Union[str, int, bool, None]]:
+        # All collectors share results of commands run during this collection of facts
+        with command.command_scope():
+            return self._run_collectors()
+
+    def _start_collector(
+        self, fact_collector_cls: type(collector.FactsCollector), collected_hw_info: Dict, deadline: float
+    ) -> concurrent.futures.Future:
+        """
+        Run collector in a new daemon thread. Every collector gets its own thread, so the
+        timeout is not spent in a queue, and the thread of collector that timed out does
+        not block exit of process (threads of ThreadPoolExecutor are joined at exit).
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                with command.deadline_scope(deadline):
+                    future.set_result(self._collect(fact_collector_cls, collected_hw_info))
+            except BaseException as err:
+                future.set_exception(err)
+
+        # Copy of context shares the executor of commands with the thread
+        context: contextvars.Context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run, args=(run,), name=f"FactsCollector-{fact_collector_cls.__name__}", daemon=True
+        )
+        thread.start()
+        return future
+
+    def _run_collectors(self) -> Dict[str, Union[str, int, bool, None]]:
+        finished: Dict[type(collector.FactsCollector), Dict] = {}
+        waiting: List[type(collector.FactsCollector)] = list(self.collectors)
+        running: Dict[concurrent.futures.Future, type(collector.FactsCollector)] = {}
+        deadlines: Dict[concurrent.futures.Future, float] = {}
+
+        try:
+            while waiting or running:
+                for fact_collector_cls in list(waiting):
+                    dependencies = self._get_dependencies(fact_collector_cls)
+                    if not all(dependency in finished for dependency in dependencies):
+                        continue
+                    waiting.remove(fact_collector_cls)
+                    collected_hw_info: Dict[str, Union[str, int, bool, None]] = {}
+                    for dependency in dependencies:
+                        collected_hw_info.update(finished[dependency])
+                    timeout: float = self.timeouts.get(fact_collector_cls, self.COLLECTOR_TIMEOUT)
+                    deadline: float = time.monotonic() + timeout
+                    future = self._start_collector(fact_collector_cls, collected_hw_info, deadline)
+                    running[future] = fact_collector_cls
+                    deadlines[future] = deadline
+
+                if not running:
+                    raise ValueError(f"Circular dependencies of fact collectors: {waiting}")
+
+                timeout = max(min(deadlines.values()) - time.monotonic(), 0.0)
+                done, _ = concurrent.futures.wait(
+                    running, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    fact_collector_cls = running.pop(future)
+                    del deadlines[future]
+                    facts, cache_entry = future.result()
+                    finished[fact_collector_cls] = facts
+                    if self.cache is not None:
+                        if cache_entry is not None:
+                            self.cache[fact_collector_cls.__name__] = cache_entry
+                        else:
+                            self.cache.pop(fact_collector_cls.__name__, None)
+
+                now: float = time.monotonic()
+                for future, deadline in list(deadlines.items()):
+                    if deadline <= now:
+                        fact_collector_cls = running.pop(future)
+                        del deadlines[future]
+                        log.warning(
+                            f"Collecting of facts by {fact_collector_cls.__name__} timed out, "
+                            f"facts of this collector are not included"
+                        )
+                        finished[fact_collector_cls] = {}
+        finally:
+            # Do not wait for collectors that timed out; pending collectors are not started
+            for future in running:
+                future.cancel()
+
         results: Dict[str, Union[str, int, bool, None]] = {}
         for fact_collector_cls in self.collectors:
-            fact_collector: collector.FactsCollector = fact_collector_cls(collected_hw_info=results)
-            results.update(fact_collector.get_all())
+            results.update(finished[fact_collector_cls])
         return results
@@ -65,6 +65,13 @@ class CloudFactsCollector(collector.FactsCollector):
                     cloud_provider_dispatcher[self.cloud_provider.CLOUD_PROVIDER_ID]
                 ]
 
+    def get_fingerprint(self) -> Any:
+        # Metadata of cloud instance used for facts do not change without reboot
+        boot_id: str = collector.read_fingerprint_file(collector.BOOT_ID_FILE)
+        if boot_id is None:
+            return None
+        return {"boot_id": boot_id}
+
     def get_aws_facts(self) -> Dict[str, Union[str, None]]:
         """
         Try to get AWS facts (only instance ID ATM) of machine running on AWS public cloud
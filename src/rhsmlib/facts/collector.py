@@ -14,12 +14,16 @@
 import logging
 import os
 import platform
-from typing import Callable, Dict, List, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from rhsmlib.facts import collection
+from rhsmlib.facts import command
 
 log = logging.getLogger(__name__)
 
+# Random UUID generated by kernel, which is different for every boot
+BOOT_ID_FILE = "/proc/sys/kernel/random/boot_id"
+
 
 def get_arch(prefix: str = None) -> str:
     """Get the systems architecture.
@@ -55,6 +59,49 @@ def get_arch(prefix: str = None) -> str:
         raise
 
 
+def read_fingerprint_file(path: str) -> Optional[str]:
+    """
+    Return content of a small file used as part of a fingerprint, or None, when
+    the file cannot be read.
+    """
+    try:
+        with open(path, "r") as fd:
+            return fd.read()
+    except (IOError, UnicodeDecodeError):
+        return None
+
+
+def stat_fingerprint_paths(paths: Iterable[str]) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Return list of tuples (path, mtime in nanoseconds, size) of given paths. The mtime
+    and size are None, when the path does not exist.
+    """
+    result: List[Tuple[str, Optional[int], Optional[int]]] = []
+    for path in paths:
+        try:
+            stat_result: os.stat_result = os.stat(path)
+        except OSError:
+            result.append((path, None, None))
+        else:
+            result.append((path, stat_result.st_mtime_ns, stat_result.st_size))
+    return result
+
+
+def listdir_fingerprint_paths(paths: Iterable[str]) -> List[Tuple[str, Optional[List[str]]]]:
+    """
+    Return list of tuples (path, sorted names of entries) of given directories. It is
+    meant for directories, whose mtime is not changed, when their entries are changed
+    (e.g. directories of sysfs). The names are None, when the directory cannot be listed.
+    """
+    result: List[Tuple[str, Optional[List[str]]]] = []
+    for path in paths:
+        try:
+            result.append((path, sorted(os.listdir(path))))
+        except OSError:
+            result.append((path, None))
+    return result
+
+
 # An empty FactsCollector should just return an empty dict on get_all()
 
 
@@ -93,18 +140,37 @@ class FactsCollector:
         facts_collection = collection.FactsCollection(facts_dict=facts_dict)
         return facts_collection
 
+    @property
+    def executor(self) -> command.CommandExecutor:
+        """
+        Executor of commands shared by all collectors of current collection of facts
+        """
+        return command.get_executor()
+
+    def get_fingerprint(self) -> Any:
+        """
+        Return JSON serializable fingerprint of sources used by this collector. When
+        the fingerprint is the same as the fingerprint of previously collected facts,
+        then the previously collected facts can be used instead of calling get_all().
+        The fingerprint has to be much cheaper to get than facts themselves. None is
+        returned, when facts of the collector cannot be cached.
+        """
+        return None
+
     def get_all(self) -> Dict[str, Union[str, int, bool, None]]:
         # try each hardware method, and try/except around, since
         # these tend to be fragile
         all_hw_info: Dict[str, Union[str, int, bool, None]] = {}
-        for hardware_method in self.hardware_methods:
-            info_dict: Dict[str, Union[str, int, bool, None]] = {}
-            try:
-                info_dict = hardware_method()
-            except Exception as e:
-                log.warning("Hardware detection [%s] failed: %s" % (hardware_method.__name__, e))
-
-            all_hw_info.update(info_dict)
+        # methods share results of commands, e.g. output of 'ip' command
+        with command.command_scope():
+            for hardware_method in self.hardware_methods:
+                info_dict: Dict[str, Union[str, int, bool, None]] = {}
+                try:
+                    info_dict = hardware_method()
+                except Exception as e:
+                    log.warning("Hardware detection [%s] failed: %s" % (hardware_method.__name__, e))
+
+                all_hw_info.update(info_dict)
 
         return all_hw_info
 
@@ -0,0 +1,240 @@
+# Copyright (c) 2026 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+"""
+Executor of commands used by fact collectors. Results of commands are memoized
+during one collection of facts, so the same command is not run several times,
+when more collectors (or more methods of one collector) need its output.
+"""
+
+import concurrent.futures
+import contextlib
+import contextvars
+import logging
+import os
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+# Command can be given as a path of executable or as a list of arguments
+Command = Union[str, Sequence[str]]
+
+_current_executor: contextvars.ContextVar = contextvars.ContextVar("command_executor", default=None)
+# Time (time.monotonic()), when commands started in current context have to be finished
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar("command_deadline", default=None)
+
+
+class CommandExecutor:
+    """
+    Run-scoped executor of commands. Results (including raised exceptions) are memoized
+    by arguments and environment of the command. Only subprocess.TimeoutExpired is not
+    memoized, because it depends on the deadline of the caller. When the same command
+    is requested by more threads at once, then it is run only once and other threads
+    wait for it.
+    """
+
+    # Maximal number of commands started in the background at once
+    MAX_WORKERS = 4
+
+    # Results of probes, e.g. whether a command supports some option. These results are
+    # kept for the whole life of the process and they are invalidated, when the executable
+    # is changed.
+    probe_cache: Dict[Tuple, bool] = {}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: Dict[Tuple, concurrent.futures.Future] = {}
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    @staticmethod
+    def _key(method: str, args: Command, env: Optional[Dict[str, str]]) -> Tuple:
+        args_key: Tuple[str, ...] = (args,) if isinstance(args, str) else tuple(args)
+        env_key: Optional[Tuple] = tuple(sorted(env.items())) if env is not None else None
+        return method, args_key, env_key
+
+    def _memoize(self, key: Tuple, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future: Optional[concurrent.futures.Future] = self._futures.get(key)
+            owner: bool = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                future.set_running_or_notify_cancel()
+                self._futures[key] = future
+        if owner:
+            try:
+                future.set_result(func())
+            except subprocess.TimeoutExpired as err:
+                # The deadline belongs to the caller; the next caller runs the command again
+                self._forget(key, future)
+                future.set_exception(err)
+            except Exception as err:
+                future.set_exception(err)
+            except BaseException as err:
+                # Do not let other threads wait forever, e.g. on KeyboardInterrupt
+                self._forget(key, future)
+                future.set_exception(err)
+                raise
+        else:
+            log.debug(f"Using memoized result of command: {key[1]}")
+        return future.result()
+
+    def _forget(self, key: Tuple, future: concurrent.futures.Future) -> None:
+        """
+        Remove the memoized future, so the command is run again by the next caller
+        """
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+    @staticmethod
+    def _get_timeout() -> Optional[float]:
+        """
+        Return time remaining to the deadline of current context or None, when there
+        is no deadline
+        """
+        deadline: Optional[float] = _current_deadline.get()
+        if deadline is None:
+            return None
+        return max(deadline - time.monotonic(), 0.0)
+
+    def check_output(self, args: Command, env: Optional[Dict[str, str]] = None) -> bytes:
+        """
+        Memoized version of subprocess.check_output(args, env=env). The command is
+        killed, when it does not finish before the deadline of current context.
+        :raises subprocess.TimeoutExpired: when the deadline is reached
+        """
+        return self._memoize(
+            self._key("check_output", args, env),
+            lambda: subprocess.check_output(args, env=env, timeout=self._get_timeout()),
+        )
+
+    def run(self, args: Command, env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+        """
+        Memoized version of subprocess.run(args, env=env) capturing stdout and stderr. The
+        command is killed, when it does not finish before the deadline of current context.
+        :raises subprocess.TimeoutExpired: when the deadline is reached
+        """
+        return self._memoize(
+            self._key("run", args, env),
+            lambda: subprocess.run(
+                args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, timeout=self._get_timeout()
+            ),
+        )
+
+    def start(self, args: Command, env: Optional[Dict[str, str]] = None) -> None:
+        """
+        Start check_output() of the command in the background. Later call of check_output()
+        with the same arguments waits for this command instead of running it again.
+        """
+        with self._lock:
+            if self._key("check_output", args, env) in self._futures:
+                return
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.MAX_WORKERS, thread_name_prefix="CommandExecutor"
+                )
+            pool = self._pool
+
+        # The command started in the background has the same deadline as the caller
+        deadline: Optional[float] = _current_deadline.get()
+
+        def prefetch() -> None:
+            try:
+                with deadline_scope(deadline):
+                    self.check_output(args, env)
+            except Exception:
+                # The exception is raised again to the caller of check_output()
+                pass
+
+        pool.submit(prefetch)
+
+    def supports_option(self, executable: str, option: str, env: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Check whether the executable mentions the option in the output of --help. The result
+        is cached until the executable is changed, so the probe is run only once.
+        :raises subprocess.CalledProcessError: when the executable fails to print help
+        """
+        try:
+            stat_result: os.stat_result = os.stat(executable)
+            probe_key: Optional[Tuple] = (
+                executable,
+                option,
+                stat_result.st_ino,
+                stat_result.st_mtime_ns,
+                stat_result.st_size,
+            )
+        except OSError:
+            probe_key = None
+
+        if probe_key is not None and probe_key in self.probe_cache:
+            return self.probe_cache[probe_key]
+
+        output: bytes = self.check_output([executable, "--help"], env=env)
+        supported: bool = option.encode("utf-8") in output
+        if probe_key is not None:
+            self.probe_cache[probe_key] = supported
+        return supported
+
+    def shutdown(self) -> None:
+        """
+        Release threads used for commands started in the background
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+def get_executor() -> CommandExecutor:
+    """
+    Return executor of current collection of facts. When no collection is in progress,
+    then new executor is returned and its results are not shared with anybody.
+    """
+    return _current_executor.get() or CommandExecutor()
+
+
+@contextlib.contextmanager
+def command_scope() -> Iterator[CommandExecutor]:
+    """
+    Context manager sharing one executor of commands in the block. When this block is
+    nested in another block, then the executor of the outer block is used. Threads have
+    to be started using contextvars.copy_context().run to use the executor.
+    """
+    executor: Optional[CommandExecutor] = _current_executor.get()
+    if executor is not None:
+        yield executor
+        return
+
+    executor = CommandExecutor()
+    token: contextvars.Token = _current_executor.set(executor)
+    try:
+        yield executor
+    finally:
+        _current_executor.reset(token)
+        executor.shutdown()
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """
+    Context manager setting the time (time.monotonic()), when commands run in the block
+    have to be finished. Commands are killed, when they run after the deadline.
+    """
+    token: contextvars.Token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
@@ -14,11 +14,12 @@
 import os
 import glob
 import logging
-from typing import Any, Dict, Generator, Iterator, Union
+from typing import Any, Dict, Generator, Iterator, List, Union
 
 import rhsm.config
 
 from rhsm import ourjson
+from rhsmlib.facts import collector
 from rhsmlib.facts.collector import FactsCollector
 
 log = logging.getLogger(__name__)
@@ -119,6 +120,13 @@ class CustomFactsCollector(FactsCollector):
             self.path_and_globs = [(os.path.join(rhsm.config.DEFAULT_CONFIG_DIR, "facts"), "*.facts")]
         self.facts_directories = CustomFactsDirectories(self.path_and_globs)
 
+    def get_fingerprint(self) -> Any:
+        paths: List[str] = []
+        for path, glob_pattern in self.path_and_globs:
+            paths.append(path)
+            paths.extend(sorted(glob.glob(os.path.join(path, glob_pattern))))
+        return collector.stat_fingerprint_paths(paths)
+
     def get_all(self) -> Dict[str, Union[str, int, bool, None]]:
         facts_dict: Dict[str, Union[str, int, bool, None]] = {}
         for facts_dir in self.facts_directories:
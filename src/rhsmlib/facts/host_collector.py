@@ -14,12 +14,13 @@
 
 import locale
 import logging
-from typing import Dict, Union
+from typing import Any, Dict, Union
 
 from rhsmlib.facts import cleanup
 from rhsmlib.facts import virt
 from rhsmlib.facts import firmware_info
 from rhsmlib.facts import collector
+from rhsmlib.facts import command
 
 log = logging.getLogger(__name__)
 
@@ -43,7 +44,24 @@ class HostCollector(collector.FactsCollector):
 
     Facts collected include DMI info and virt status and virt.uuid."""
 
+    def get_fingerprint(self) -> Any:
+        # DMI info and virt status do not change without reboot
+        boot_id: str = collector.read_fingerprint_file(collector.BOOT_ID_FILE)
+        if boot_id is None:
+            return None
+        try:
+            default_locale = locale.getlocale(category=locale.LC_MESSAGES)
+        except ValueError:
+            default_locale = None
+        return {"prefix": self.prefix, "boot_id": boot_id, "locale": default_locale}
+
     def get_all(self) -> Dict[str, Union[str, int, bool, None]]:
+        # virt-what is run in the background, while firmware facts are collected
+        with command.command_scope() as executor:
+            executor.start(virt.VirtWhatCollector.VIRT_WHAT_CMD)
+            return self._get_all()
+
+    def _get_all(self) -> Dict[str, Union[str, int, bool, None]]:
         host_facts = {}
 
         firmware_collector = firmware_info.FirmwareCollector(
@@ -26,8 +26,9 @@ import sys
 import datetime
 from rhsmlib.facts import cpuinfo
 from rhsmlib.facts import collector
+from rhsmlib.facts import lscpu
 
-from typing import Callable, Dict, Optional, List, TextIO, Tuple, Union
+from typing import Any, Callable, Dict, Optional, List, TextIO, Tuple, Union
 
 log = logging.getLogger(__name__)
 
@@ -110,6 +111,22 @@ class HardwareCollector(collector.FactsCollector):
             self.get_ls_cpu_info,
         ]
 
+    def get_fingerprint(self) -> Any:
+        # CPU topology can change without reboot only by onlining/offlining CPUs
+        # and memory facts are read from /proc/meminfo, which is cheap to read
+        boot_id: str = collector.read_fingerprint_file(collector.BOOT_ID_FILE)
+        if boot_id is None:
+            return None
+        meminfo: str = collector.read_fingerprint_file("/proc/meminfo") or ""
+        return {
+            "prefix": self.prefix,
+            "boot_id": boot_id,
+            "uname": list(os.uname()),
+            "cpu_online": collector.read_fingerprint_file(self.prefix + "/sys/devices/system/cpu/online"),
+            "memory": [line for line in meminfo.splitlines() if line.startswith(("MemTotal:", "SwapTotal:"))],
+            "release": collector.stat_fingerprint_paths(["/etc/os-release", "/etc/redhat-release"]),
+        }
+
     def get_uname_info(self) -> Dict[str, str]:
         uname_data: os.uname_result = os.uname()
         uname_keys: Tuple[str, ...] = (
@@ -578,9 +595,10 @@ class HardwareCollector(collector.FactsCollector):
 
     def get_ls_cpu_info(self) -> Dict:
         # if we have `lscpu`, let's use it for facts as well, under
-        # the `lscpu` name space
+        # the `lscpu` name space; otherwise read the same facts from /sys
+        # and /proc (e.g. in containers and minimal images)
         if not os.access(self.LSCPU_CMD, os.R_OK):
-            return {}
+            return lscpu.NativeLscpu(self.arch, prefix=self.prefix).get_info()
 
         # copy of parent process environment
         lscpu_env: Dict[str, str] = dict(os.environ)
@@ -594,16 +612,12 @@ class HardwareCollector(collector.FactsCollector):
         return self._parse_lscpu_human_readable_output(lscpu_env)
 
     def _check_lscpu_json(self, lscpu_env: Dict[str, str]) -> bool:
-        lscpu_cmd: List[str] = [self.LSCPU_CMD, "--help"]
-
         try:
-            output: bytes = subprocess.check_output(lscpu_cmd, env=lscpu_env)
+            return self.executor.supports_option(self.LSCPU_CMD, "--json", env=lscpu_env)
         except subprocess.CalledProcessError as e:
             log.warning("Failed to run 'lscpu --help': %s", e)
             return False
 
-        return b"--json" in output
-
     def _parse_lscpu_human_readable_output(self, lscpu_env: Dict[str, str]) -> Dict[str, str]:
         lscpu_info: Dict[str, str] = {}
         lscpu_cmd: List[str] = [self.LSCPU_CMD]
@@ -615,7 +629,7 @@ class HardwareCollector(collector.FactsCollector):
         lscpu_cmd_string: str = " ".join(lscpu_cmd)
 
         try:
-            lscpu_out_raw: bytes = subprocess.check_output(lscpu_cmd, env=lscpu_env)
+            lscpu_out_raw: bytes = self.executor.check_output(lscpu_cmd, env=lscpu_env)
             lscpu_out: str = lscpu_out_raw.decode("utf-8")
         except subprocess.CalledProcessError as e:
             log.exception(e)
@@ -648,7 +662,7 @@ class HardwareCollector(collector.FactsCollector):
             lscpu_cmd += ["-s", self.prefix]
 
         try:
-            output: bytes = subprocess.check_output(lscpu_cmd, env=lscpu_env)
+            output: bytes = self.executor.check_output(lscpu_cmd, env=lscpu_env)
         except subprocess.CalledProcessError as e:
             log.warning("Failed to run 'lscpu --json': %s", e)
             return {}
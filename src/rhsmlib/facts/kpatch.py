@@ -15,7 +15,7 @@
 import logging
 import os
 import shutil
-from typing import Dict, List
+from typing import Any, Dict, List
 
 from rhsmlib.facts import collector
 
@@ -36,6 +36,14 @@ class KPatchCollector(collector.FactsCollector):
         "/sys/kernel/kpatch",
     ]
 
+    def get_fingerprint(self) -> Any:
+        paths: List[str] = [self.DIR_WITH_INSTALLED_KPATCH_MODULES] + self.DIRS_WITH_LOADED_MODULE
+        return {
+            "installed": self._is_kpatch_installed(),
+            # Loading of live kernel patch does not change mtime of directories in /sys
+            "directories": collector.listdir_fingerprint_paths(paths),
+        }
+
     def get_all(self) -> Dict[str, str]:
         return self.get_kpatch_info()
 
@@ -0,0 +1,262 @@
+# Read CPU information from /sys and /proc like lscpu does
+#
+# Copyright (c) 2026 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+"""
+In-process replacement of the lscpu command. It provides the lscpu.* facts that
+lscpu (util-linux 2.38) derives from /sys/devices/system and /proc/cpuinfo. Facts
+that lscpu gets using CPUID instruction (e.g. hypervisor vendor) are not provided.
+"""
+
+import glob
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+from rhsmlib.facts import cpuinfo
+
+log = logging.getLogger(__name__)
+
+
+def parse_cpu_list(cpu_list: str) -> Set[int]:
+    """
+    Parse list of CPUs in the format used by kernel, e.g. "0-3,8,10-11"
+    """
+    cpus: Set[int] = set()
+    for item in cpu_list.strip().split(","):
+        if not item:
+            continue
+        if "-" in item:
+            start, end = item.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(item))
+    return cpus
+
+
+def format_cpu_list(cpus: Set[int]) -> str:
+    """
+    Format set of CPUs to the format used by lscpu, e.g. "0-3,8,10,11"; unlike kernel,
+    lscpu uses ranges only for three or more consecutive CPUs
+    """
+    items: List[str] = []
+    sorted_cpus: List[int] = sorted(cpus)
+    index: int = 0
+    while index < len(sorted_cpus):
+        end: int = index
+        while end + 1 < len(sorted_cpus) and sorted_cpus[end + 1] == sorted_cpus[end] + 1:
+            end += 1
+        if index == end:
+            items.append(str(sorted_cpus[index]))
+        elif index + 1 == end:
+            items.append(f"{sorted_cpus[index]},{sorted_cpus[end]}")
+        else:
+            items.append(f"{sorted_cpus[index]}-{sorted_cpus[end]}")
+        index = end + 1
+    return ",".join(items)
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse size of cache from sysfs (e.g. "48K") to bytes
+    """
+    match: Optional[re.Match] = re.match(r"^\s*(\d+)\s*([KMG]?)", size)
+    if match is None:
+        raise ValueError(f"Invalid size: {size}")
+    exponent: int = " KMG".index(match.group(2) or " ")
+    return int(match.group(1)) * 1024**exponent
+
+
+def format_size(size: int) -> str:
+    """
+    Format size in bytes to human readable string the same way as util-linux does,
+    e.g. "48 KiB" or "1.3 MiB"
+    """
+    suffixes: str = "BKMGTPE"
+    exponent: int = 0
+    while exponent + 1 < len(suffixes) and size >= 1024 ** (exponent + 1):
+        exponent += 1
+    whole: int = size // 1024**exponent
+    fraction: int = 0
+    if exponent > 0:
+        fraction = size % 1024**exponent
+        fraction = (fraction // 1024 ** (exponent - 1) + 50) // 100
+        if fraction == 10:
+            whole += 1
+            fraction = 0
+    suffix: str = "B" if exponent == 0 else f"{suffixes[exponent]}iB"
+    if fraction:
+        return f"{whole}.{fraction} {suffix}"
+    return f"{whole} {suffix}"
+
+
+class NativeLscpu:
+    """
+    Read lscpu facts without running lscpu
+    """
+
+    CPU_DIR: str = "sys/devices/system/cpu"
+    NODE_DIR: str = "sys/devices/system/node"
+
+    def __init__(self, arch: str, prefix: str = None):
+        self.arch: str = arch
+        self.prefix: str = prefix or "/"
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.prefix, *parts)
+
+    def _read(self, *parts: str) -> Optional[str]:
+        try:
+            with open(self._path(*parts), "r") as fd:
+                return fd.read().strip()
+        except (IOError, UnicodeDecodeError):
+            return None
+
+    def _read_cpu_list(self, *parts: str) -> Set[int]:
+        content: Optional[str] = self._read(*parts)
+        if not content:
+            return set()
+        return parse_cpu_list(content)
+
+    def _get_first_processor(self) -> Dict[str, str]:
+        """
+        Return fields of the first processor in /proc/cpuinfo
+        """
+        if self.arch != "x86_64":
+            return {}
+        try:
+            cpu_info = cpuinfo.SystemCpuInfoFactory.from_uname_machine(self.arch, prefix=self.prefix)
+        except (IOError, NotImplementedError) as err:
+            log.debug(f"Unable to read /proc/cpuinfo: {err}")
+            return {}
+        if not cpu_info.cpu_info.processors:
+            return {}
+        return cpu_info.cpu_info.processors[0]
+
+    def _get_topology(self, online: Set[int]) -> Dict[str, str]:
+        threads_per_core: int = 0
+        cores: Dict[str, Set[str]] = {}
+        for cpu in sorted(online):
+            topology: Tuple[str, ...] = (self.CPU_DIR, f"cpu{cpu}", "topology")
+            siblings: Set[int] = self._read_cpu_list(*topology, "thread_siblings_list")
+            package_id: Optional[str] = self._read(*topology, "physical_package_id")
+            core_id: Optional[str] = self._read(*topology, "core_id")
+            if package_id is None or core_id is None:
+                continue
+            threads_per_core = max(threads_per_core, len(siblings & online))
+            cores.setdefault(package_id, set()).add(core_id)
+        if not cores:
+            return {}
+        return {
+            "thread(s)_per_core": str(threads_per_core),
+            "core(s)_per_socket": str(max(len(package_cores) for package_cores in cores.values())),
+            "socket(s)": str(len(cores)),
+        }
+
+    def _get_caches(self, online: Set[int]) -> Dict[str, str]:
+        # name of cache -> (size of one instance, CPUs sharing instances)
+        caches: Dict[str, Tuple[int, Set[str]]] = {}
+        for cpu in sorted(online):
+            for index_dir in sorted(glob.glob(self._path(self.CPU_DIR, f"cpu{cpu}", "cache", "index*"))):
+                level: Optional[str] = self._read(index_dir, "level")
+                cache_type: Optional[str] = self._read(index_dir, "type")
+                size: Optional[str] = self._read(index_dir, "size")
+                shared: Optional[str] = self._read(index_dir, "shared_cpu_list")
+                if not level or not cache_type or not size or shared is None:
+                    continue
+                suffix: str = {"Data": "d", "Instruction": "i"}.get(cache_type, "")
+                name: str = f"l{level}{suffix}_cache"
+                try:
+                    instance_size: int = parse_size(size)
+                except ValueError:
+                    continue
+                caches.setdefault(name, (instance_size, set()))[1].add(shared)
+
+        info: Dict[str, str] = {}
+        for name, (instance_size, instances) in caches.items():
+            count: int = len(instances)
+            info[name] = "%s (%d instance%s)" % (
+                format_size(instance_size * count),
+                count,
+                "" if count == 1 else "s",
+            )
+        return info
+
+    def _get_numa_nodes(self) -> Dict[str, str]:
+        info: Dict[str, str] = {}
+        node_dirs: List[str] = glob.glob(self._path(self.NODE_DIR, "node[0-9]*"))
+        if not node_dirs:
+            return info
+        info["numa_node(s)"] = str(len(node_dirs))
+        for node_dir in sorted(node_dirs, key=lambda path: int(os.path.basename(path)[4:])):
+            cpus: Set[int] = self._read_cpu_list(node_dir, "cpulist")
+            info[f"numa_{os.path.basename(node_dir)}_cpu(s)"] = format_cpu_list(cpus)
+        return info
+
+    def _get_vulnerabilities(self) -> Dict[str, str]:
+        info: Dict[str, str] = {}
+        for path in sorted(glob.glob(self._path(self.CPU_DIR, "vulnerabilities", "*"))):
+            value: Optional[str] = self._read(path)
+            if value is None:
+                continue
+            # "Mitigation: Full; IBPB: conditional" is shown as "Mitigation; Full; IBPB conditional"
+            if value.startswith("Mitigation") and len(value) > len("Mitigation"):
+                value = "Mitigation;" + value[len("Mitigation") + 1 :].replace(":", "")
+            info[f"vulnerability_{os.path.basename(path)}"] = value
+        return info
+
+    def get_info(self) -> Dict[str, str]:
+        """
+        Return dictionary with lscpu.* facts
+        """
+        info: Dict[str, str] = {"architecture": self.arch}
+
+        processor: Dict[str, str] = self._get_first_processor()
+        if self.arch == "x86_64" and processor:
+            flags: List[str] = processor.get("flags", "").split()
+            info["cpu_op-mode(s)"] = "32-bit, 64-bit" if "lm" in flags else "32-bit"
+            if "address_sizes" in processor:
+                info["address_sizes"] = processor["address_sizes"]
+
+        info["byte_order"] = "Little Endian" if sys.byteorder == "little" else "Big Endian"
+
+        present: Set[int] = self._read_cpu_list(self.CPU_DIR, "present")
+        online: Set[int] = self._read_cpu_list(self.CPU_DIR, "online")
+        if present:
+            info["cpu(s)"] = str(len(present))
+        if online:
+            info["on-line_cpu(s)_list"] = format_cpu_list(online)
+        if present - online:
+            info["off-line_cpu(s)_list"] = format_cpu_list(present - online)
+
+        for field, key in (
+            ("vendor_id", "vendor_id"),
+            ("model_name", "model_name"),
+            ("cpu_family", "cpu_family"),
+            ("model", "model"),
+            ("stepping", "stepping"),
+            ("bogomips", "bogomips"),
+            ("flags", "flags"),
+        ):
+            if processor.get(field):
+                info[key] = processor[field]
+
+        info.update(self._get_topology(online))
+        info.update(self._get_caches(online))
+        info.update(self._get_numa_nodes())
+        info.update(self._get_vulnerabilities())
+
+        return {f"lscpu.{key}": value.strip() for key, value in info.items()}
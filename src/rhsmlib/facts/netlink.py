@@ -0,0 +1,243 @@
+# Read network interfaces and addresses using netlink
+#
+# Copyright (c) 2026 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+"""
+In-process replacement of the 'ip --json address' command. Links and addresses are
+dumped from kernel using rtnetlink socket and they are converted to the same structure
+as 'ip' command prints (only the keys used by network facts are provided).
+"""
+
+import logging
+import os
+import socket
+import struct
+from typing import Dict, List, Tuple
+
+log = logging.getLogger(__name__)
+
+NETLINK_ROUTE = 0
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_PERM_ADDRESS = 54
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_BROADCAST = 4
+
+# struct nlmsghdr: length, type, flags, sequence number, port id
+NLMSG_HEADER = struct.Struct("=IHHII")
+# struct ifinfomsg: family, type, index, flags, change
+IFINFOMSG = struct.Struct("=BxHiII")
+# struct ifaddrmsg: family, prefix length, flags, scope, index
+IFADDRMSG = struct.Struct("=BBBBI")
+# struct rtattr: length, type
+RTATTR = struct.Struct("=HH")
+# struct nlmsgerr starts with negative errno
+NLMSGERR = struct.Struct("=i")
+
+# Flags of interfaces in the order printed by 'ip' command
+INTERFACE_FLAGS: List[Tuple[int, str]] = [
+    (0x8, "LOOPBACK"),
+    (0x2, "BROADCAST"),
+    (0x10, "POINTOPOINT"),
+    (0x1000, "MULTICAST"),
+    (0x80, "NOARP"),
+    (0x200, "ALLMULTI"),
+    (0x100, "PROMISC"),
+    (0x400, "MASTER"),
+    (0x800, "SLAVE"),
+    (0x4, "DEBUG"),
+    (0x8000, "DYNAMIC"),
+    (0x4000, "AUTOMEDIA"),
+    (0x2000, "PORTSEL"),
+    (0x20, "NOTRAILERS"),
+    (0x1, "UP"),
+    (0x10000, "LOWER_UP"),
+    (0x20000, "DORMANT"),
+    (0x40000, "ECHO"),
+]
+IFF_UP = 0x1
+IFF_RUNNING = 0x40
+
+ADDRESS_SCOPES: Dict[int, str] = {0: "global", 200: "site", 253: "link", 254: "host", 255: "nowhere"}
+ADDRESS_FAMILIES: Dict[int, str] = {socket.AF_INET: "inet", socket.AF_INET6: "inet6"}
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def iter_messages(data: bytes) -> List[Tuple[int, bytes]]:
+    """
+    Split data received from netlink socket to list of (message type, payload)
+    :raises OSError: when kernel reported error
+    """
+    messages: List[Tuple[int, bytes]] = []
+    offset: int = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, message_type, _flags, _seq, _pid = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size or offset + length > len(data):
+            raise ValueError("Truncated netlink message")
+        payload: bytes = data[offset + NLMSG_HEADER.size : offset + length]
+        if message_type == NLMSG_ERROR:
+            (error,) = NLMSGERR.unpack_from(payload)
+            if error != 0:
+                raise OSError(-error, os.strerror(-error))
+        else:
+            messages.append((message_type, payload))
+        offset += _align(length)
+    return messages
+
+
+def parse_attributes(data: bytes) -> Dict[int, bytes]:
+    """
+    Parse routing attributes to dictionary {type: value}
+    """
+    attributes: Dict[int, bytes] = {}
+    offset: int = 0
+    while offset + RTATTR.size <= len(data):
+        length, attribute_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attributes[attribute_type] = data[offset + RTATTR.size : offset + length]
+        offset += _align(length)
+    return attributes
+
+
+def format_link_address(address: bytes) -> str:
+    return ":".join(f"{byte:02x}" for byte in address)
+
+
+def parse_links(data: bytes) -> Dict[int, dict]:
+    """
+    Parse RTM_NEWLINK messages to dictionary {index of interface: interface}
+    """
+    links: Dict[int, dict] = {}
+    for message_type, payload in iter_messages(data):
+        if message_type != RTM_NEWLINK:
+            continue
+        _family, _type, index, flags, _change = IFINFOMSG.unpack_from(payload)
+        attributes: Dict[int, bytes] = parse_attributes(payload[IFINFOMSG.size :])
+
+        flag_names: List[str] = [name for flag, name in INTERFACE_FLAGS if flags & flag]
+        if flags & IFF_UP and not flags & IFF_RUNNING:
+            flag_names.insert(0, "NO-CARRIER")
+
+        link: dict = {
+            "ifindex": index,
+            "ifname": attributes.get(IFLA_IFNAME, b"").rstrip(b"\0").decode("utf-8", "replace"),
+            "flags": flag_names,
+        }
+        if IFLA_ADDRESS in attributes:
+            link["address"] = format_link_address(attributes[IFLA_ADDRESS])
+        perm_address: bytes = attributes.get(IFLA_PERM_ADDRESS)
+        if perm_address and perm_address != attributes.get(IFLA_ADDRESS):
+            link["permaddr"] = format_link_address(perm_address)
+        link["addr_info"] = []
+        links[index] = link
+    return links
+
+
+def parse_addresses(data: bytes) -> List[Tuple[int, dict]]:
+    """
+    Parse RTM_NEWADDR messages to list of (index of interface, address)
+    """
+    addresses: List[Tuple[int, dict]] = []
+    for message_type, payload in iter_messages(data):
+        if message_type != RTM_NEWADDR:
+            continue
+        family, prefixlen, _flags, scope, index = IFADDRMSG.unpack_from(payload)
+        if family not in ADDRESS_FAMILIES:
+            continue
+        attributes: Dict[int, bytes] = parse_attributes(payload[IFADDRMSG.size :])
+        local: bytes = attributes.get(IFA_LOCAL, attributes.get(IFA_ADDRESS))
+        if local is None:
+            continue
+        address: dict = {
+            "family": ADDRESS_FAMILIES[family],
+            "local": socket.inet_ntop(family, local),
+            "prefixlen": prefixlen,
+        }
+        if IFA_BROADCAST in attributes:
+            address["broadcast"] = socket.inet_ntop(family, attributes[IFA_BROADCAST])
+        address["scope"] = ADDRESS_SCOPES.get(scope, str(scope))
+        addresses.append((index, address))
+    return addresses
+
+
+def build_address_data(links: Dict[int, dict], addresses: List[Tuple[int, dict]]) -> List[dict]:
+    """
+    Combine links and addresses to the structure printed by 'ip --json address'
+    """
+    for index, address in addresses:
+        if index in links:
+            links[index]["addr_info"].append(address)
+    return list(links.values())
+
+
+def dump(message_type: int, request: bytes) -> bytes:
+    """
+    Send dump request to rtnetlink and return all received messages
+    """
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE) as sock:
+        sock.bind((0, 0))
+        header: bytes = NLMSG_HEADER.pack(
+            NLMSG_HEADER.size + len(request), message_type, NLM_F_REQUEST | NLM_F_DUMP, 1, 0
+        )
+        sock.sendall(header + request)
+
+        chunks: List[bytes] = []
+        while True:
+            chunk: bytes = sock.recv(65536)
+            if not chunk:
+                raise ValueError("Netlink socket closed before end of dump")
+            chunks.append(chunk)
+            # NLMSG_DONE terminates multipart dump and NLMSG_ERROR reports failed request
+            if any(message_type in (NLMSG_DONE, NLMSG_ERROR) for message_type in _message_types(chunk)):
+                return b"".join(chunks)
+
+
+def _message_types(chunk: bytes) -> List[int]:
+    types: List[int] = []
+    offset: int = 0
+    while offset + NLMSG_HEADER.size <= len(chunk):
+        length, message_type, _flags, _seq, _pid = NLMSG_HEADER.unpack_from(chunk, offset)
+        if length < NLMSG_HEADER.size:
+            break
+        types.append(message_type)
+        offset += _align(length)
+    return types
+
+
+def query_addresses() -> List[dict]:
+    """
+    Return list of interfaces with addresses in the same structure as printed
+    by 'ip --json address'
+    :raises OSError: when netlink is not available
+    """
+    link_data: bytes = dump(RTM_GETLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+    address_data: bytes = dump(RTM_GETADDR, IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+    return build_address_data(parse_links(link_data), parse_addresses(address_data))
@@ -13,10 +13,12 @@
 import json
 import logging
 import socket
+import struct
 import subprocess
-from typing import Callable, Dict, List, Literal, Union
+from typing import Any, Callable, Dict, List, Literal, Union
 
 from rhsmlib.facts import collector
+from rhsmlib.facts import netlink
 
 log = logging.getLogger(__name__)
 
@@ -36,9 +38,34 @@ class NetworkCollector(collector.FactsCollector):
             self.get_interfaces,
         ]
 
+    def get_fingerprint(self) -> Any:
+        # Interfaces and their addresses are dumped using netlink (the routing table
+        # is not included); files in /etc influence resolving of FQDN
+        try:
+            interfaces: List[dict] = netlink.query_addresses()
+        except (OSError, ValueError, struct.error) as exc:
+            log.debug(f"Could not query netlink for fingerprint of network facts: {exc}")
+            return None
+        return {
+            "hostname": socket.gethostname(),
+            "interfaces": interfaces,
+            "resolver": collector.stat_fingerprint_paths(
+                ["/etc/hosts", "/etc/resolv.conf", "/etc/nsswitch.conf"]
+            ),
+        }
+
     def _query_ip_command(self) -> List[dict]:
-        """Call system's 'ip' command and return its value as a dictionary."""
-        output = subprocess.run(["ip", "--json", "address"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        """Get interfaces and their addresses as printed by 'ip --json address'.
+
+        Kernel is queried using netlink. System's 'ip' command is called only
+        when netlink is not available.
+        """
+        try:
+            return netlink.query_addresses()
+        except (OSError, ValueError, struct.error) as exc:
+            log.debug(f"Could not query netlink for network facts, using 'ip' command: {exc}")
+
+        output: subprocess.CompletedProcess = self.executor.run(["ip", "--json", "address"])
         if output.stderr != b"":
             log.error(f"Could not query 'ip' for network facts: {output.stderr}")
             return []
@@ -12,8 +12,7 @@
 # in this software or its documentation.
 #
 import logging
-import subprocess
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Union
 
 from rhsmlib.facts import collector
 
@@ -38,6 +37,10 @@ class SupportedArchesCollector(collector.FactsCollector):
             arch=arch, prefix=prefix, testing=testing, collected_hw_info=collected_hw_info
         )
 
+    def get_fingerprint(self) -> Any:
+        # dpkg stores foreign architectures in this file
+        return collector.stat_fingerprint_paths(["/var/lib/dpkg/arch"])
+
     def get_arches_on_debian(self) -> Dict[str, str]:
         """
         Try to return content of all supported packages architectures
@@ -47,14 +50,14 @@ class SupportedArchesCollector(collector.FactsCollector):
         arches: List[str] = []
 
         try:
-            arch: str = subprocess.check_output(["dpkg", "--print-architecture"]).decode("UTF-8")
+            arch: str = self.executor.check_output(["dpkg", "--print-architecture"]).decode("UTF-8")
             if arch != "":
                 arches.append(arch.rstrip("\n"))
         except Exception as e:
             log.error("Error getting dpkg main architecture: %s", e)
 
         try:
-            arch: str = subprocess.check_output(["dpkg", "--print-foreign-architectures"]).decode("UTF-8")
+            arch: str = self.executor.check_output(["dpkg", "--print-foreign-architectures"]).decode("UTF-8")
             if arch != "":
                 arches.append(arch.rstrip("\n"))
         except Exception as e:
@@ -15,7 +15,6 @@
 #
 import logging
 import string
-import subprocess
 import os
 from typing import Dict, List, TextIO, Optional, Union
 
@@ -25,6 +24,8 @@ log = logging.getLogger(__name__)
 
 
 class VirtWhatCollector(collector.FactsCollector):
+    VIRT_WHAT_CMD: str = "/usr/sbin/virt-what"
+
     def get_all(self) -> Dict[str, Union[str, bool]]:
         return self.get_virt_info()
 
@@ -33,7 +34,7 @@ class VirtWhatCollector(collector.FactsCollector):
         virt_dict: Dict[str, Union[str, bool]] = {}
 
         try:
-            host_type_raw: bytes = subprocess.check_output("/usr/sbin/virt-what")
+            host_type_raw: bytes = self.executor.check_output(self.VIRT_WHAT_CMD)
             host_type: str = host_type_raw.decode("utf-8")
             # BZ1018807 xen can report xen and xen-hvm.
             # Force a single line
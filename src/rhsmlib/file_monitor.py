@@ -11,14 +11,21 @@
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
 import threading
-from typing import Dict
+from typing import Dict, Iterator, List, NamedTuple, Optional
 
 from rhsm.config import get_config_parser
 from rhsmlib.services import config
 import configparser
+import ctypes
+import ctypes.util
+import errno
+import functools
+import glob
 import logging
 import os.path
 import fnmatch
+import select
+import struct
 import time
 import warnings
 
@@ -184,21 +191,44 @@ class InotifyFilesystemWatcher(FilesystemWatcher):
         default process function for pyinotify notifier
         :param event: pyinotify Event object, has path and mask of flags representing file modification
         """
+        for dir_watch in self.matching_dir_watches(event):
+            # Call all callbacks associated with dir_watch
+            dir_watch.notify()
+
+    def matching_dir_watches(self, event) -> List["DirectoryWatch"]:
+        """
+        Return enabled dir watches interested in the event
+        :param event: object with path, pathname and mask of the i-notify event
+        """
         log.debug(
             "Thread %s: Some event occurred: %s (%s)"
             % (threading.current_thread().name, event.path, event.pathname)
         )
 
+        dir_watches = []
         for dir_watch in self.dir_watches.values():
-            # When watcher is temporary disabled, ten
+            if dir_watch.temporary_disabled is True:
+                dir_watch.update_temporary_disabled_watcher()
+            # When watcher is temporary disabled, then the event is ignored
             if dir_watch.temporary_disabled is True:
                 log.debug("Directory watcher: %s temporary disabled. Ignoring event." % dir_watch.path)
                 continue
             # The event has to happen on file/directory we are interested in and the type of event
             # has to match the set of events we are interested in too
             if dir_watch.paths_match(event.path, event.pathname) and dir_watch.is_file_modified(event.mask):
-                # Call all callbacks associated with dir_watch
-                dir_watch.notify()
+                dir_watches.append(dir_watch)
+        return dir_watches
+
+    @staticmethod
+    def watched_path(dir_watch: "DirectoryWatch") -> str:
+        """
+        Return path of directory, which has to be watched by i-notify
+        """
+        if dir_watch.is_file:
+            # watch for any changes in the directory, but only be notified of the specific path
+            return os.path.abspath(os.path.dirname(dir_watch.path))
+        # is already directory
+        return dir_watch.path
 
     def add_watches(self):
         """
@@ -206,23 +236,12 @@ class InotifyFilesystemWatcher(FilesystemWatcher):
         """
         for dir_watch in self.dir_watches.values():
             log.debug("Adding i-notifier watcher for: %s with mask: %s" % (dir_watch.path, dir_watch.mask))
-            if dir_watch.is_file:
-                # watch for any changes in the directory, but only be notified of the specific path
-                dir_name = os.path.abspath(os.path.dirname(dir_watch.path))
-                self.watch_manager.add_watch(
-                    path=dir_name,
-                    mask=dir_watch.mask,
-                    proc_fun=self.handle_event,
-                    do_glob=dir_watch.is_glob,
-                )
-            else:
-                # is already directory
-                self.watch_manager.add_watch(
-                    path=dir_watch.path,
-                    mask=dir_watch.mask,
-                    proc_fun=self.handle_event,
-                    do_glob=dir_watch.is_glob,
-                )
+            self.watch_manager.add_watch(
+                path=self.watched_path(dir_watch),
+                mask=dir_watch.mask,
+                proc_fun=self.handle_event,
+                do_glob=dir_watch.is_glob,
+            )
 
     def remove_watches(self):
         """
@@ -233,6 +252,202 @@ class InotifyFilesystemWatcher(FilesystemWatcher):
             self.watch_manager.rm_watch(dir_watch.path, rec=True)
 
 
+class InotifyEvent(NamedTuple):
+    """
+    I-notify event read by NativeInotifyFilesystemWatcher
+    """
+
+    # Watched directory
+    path: str
+    # Path of file in watched directory or the directory itself
+    pathname: str
+    mask: int
+
+
+@functools.lru_cache(maxsize=None)
+def _load_libc_inotify() -> Optional[ctypes.CDLL]:
+    """
+    Load C library providing i-notify system calls
+    :return: C library or None, when i-notify is not supported
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_init1.restype = ctypes.c_int
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_add_watch.restype = ctypes.c_int
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        libc.inotify_rm_watch.restype = ctypes.c_int
+    except (OSError, AttributeError) as err:
+        log.debug("I-notify is not available in C library: %s" % err)
+        return None
+    return libc
+
+
+class NativeInotifyFilesystemWatcher(InotifyFilesystemWatcher):
+    """
+    Watches a set of directories and notifies when there are changes
+
+    Inotify implementation using system calls of C library, which does not require pyinotify.
+    The loop sleeps until some event occurs or until the watcher is stopped, so idle process
+    is not woken up periodically. Events are collected during DEBOUNCE_TIMEOUT after the last
+    event and every changed dir watch is notified only once for the whole burst of events.
+    ** Use create_filesystem_watcher to create instance of filesystem watcher
+    """
+
+    # Time in seconds, when following events are coalesced with previous ones
+    DEBOUNCE_TIMEOUT = 0.2
+    # Maximal delay of notification in seconds, when events keep coming
+    DEBOUNCE_MAX_DELAY = 2.0
+
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = os.O_CLOEXEC
+    IN_Q_OVERFLOW = 0x00004000
+    # Header of struct inotify_event: wd, mask, cookie and length of name
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, dir_watches):
+        super().__init__(dir_watches)
+        self._fd: Optional[int] = None
+        # Watch descriptors and watched directories
+        self._watches: Dict[int, str] = {}
+        # Pipe used for waking up the loop, when the watcher is stopped
+        self._wakeup: Optional[tuple] = None
+
+    def stop(self) -> None:
+        super().stop()
+        wakeup = self._wakeup
+        if wakeup is not None:
+            try:
+                os.write(wakeup[1], b"x")
+            except OSError:
+                pass
+
+    def loop(self, callback=None):
+        """
+        Sets up i-notify watches and waits for events, until the watcher is stopped
+        :param callback: callback method to be called at the end of each iteration of the loop;
+            when it is set, then it is called at least every TIMEOUT milliseconds
+        """
+        libc = _load_libc_inotify()
+        fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC) if libc is not None else -1
+        if fd < 0:
+            log.error("Unable to initialize i-notify: %s; polling is used" % os.strerror(ctypes.get_errno()))
+            return FilesystemWatcher.loop(self, callback)
+        self._fd = fd
+        self._wakeup = os.pipe()
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        poller.register(self._wakeup[0], select.POLLIN)
+        try:
+            self.add_watches()
+            self._run(poller, callback)
+        finally:
+            self.remove_watches()
+            wakeup, self._wakeup = self._wakeup, None
+            for pipe_fd in wakeup:
+                os.close(pipe_fd)
+            os.close(fd)
+            self._fd = None
+
+    def _run(self, poller: select.poll, callback=None) -> None:
+        # Changed dir watches waiting for notification; dictionary keeps the order of events
+        pending: Dict[int, DirectoryWatch] = {}
+        first_event: Optional[float] = None
+        deadline: Optional[float] = None
+        while not end_loop_cb(self, user_callback=callback):
+            timeout: Optional[float] = None
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic()) * 1000.0
+            if callback is not None:
+                timeout = self.TIMEOUT if timeout is None else min(timeout, self.TIMEOUT)
+            try:
+                ready = poller.poll(timeout)
+            except InterruptedError:
+                continue
+            for ready_fd, _ in ready:
+                if ready_fd == self._fd:
+                    for event in self.read_events():
+                        for dir_watch in self.matching_dir_watches(event):
+                            pending[id(dir_watch)] = dir_watch
+                    if pending:
+                        now = time.monotonic()
+                        first_event = first_event or now
+                        deadline = min(now + self.DEBOUNCE_TIMEOUT, first_event + self.DEBOUNCE_MAX_DELAY)
+                else:
+                    os.read(ready_fd, 64)
+            if deadline is not None and time.monotonic() >= deadline:
+                notified, pending = list(pending.values()), {}
+                first_event = deadline = None
+                for dir_watch in notified:
+                    dir_watch.notify()
+
+    def read_events(self) -> Iterator[InotifyEvent]:
+        """
+        Read all available events from i-notify file descriptor
+        """
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            except OSError as err:
+                if err.errno == errno.EINTR:
+                    continue
+                raise
+            if not data:
+                return
+            yield from self.parse_events(data)
+
+    def parse_events(self, data: bytes) -> Iterator[InotifyEvent]:
+        """
+        Parse buffer with struct inotify_event items
+        """
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset : offset + name_len].rstrip(b"\0")
+            offset += name_len
+            if mask & self.IN_Q_OVERFLOW:
+                # Some events were lost, so all dir watches are considered changed
+                log.warning("Queue of i-notify events overflowed")
+                for dir_watch in self.dir_watches.values():
+                    yield InotifyEvent(dir_watch.path, dir_watch.path, dir_watch.mask)
+                continue
+            path = self._watches.get(wd)
+            if path is None:
+                continue
+            pathname = os.path.join(path, os.fsdecode(name)) if name else path
+            yield InotifyEvent(path, pathname, mask)
+
+    def add_watches(self):
+        """
+        Add i-notify watches of all directories
+        """
+        libc = _load_libc_inotify()
+        for dir_watch in self.dir_watches.values():
+            log.debug("Adding i-notifier watcher for: %s with mask: %s" % (dir_watch.path, dir_watch.mask))
+            path = self.watched_path(dir_watch)
+            paths = glob.glob(path) if dir_watch.is_glob else [path]
+            for path in paths:
+                wd = libc.inotify_add_watch(self._fd, os.fsencode(path), dir_watch.mask)
+                if wd < 0:
+                    log.debug("Unable to watch %s: %s" % (path, os.strerror(ctypes.get_errno())))
+                    continue
+                self._watches[wd] = path
+
+    def remove_watches(self):
+        """
+        Remove all i-notify watches
+        """
+        libc = _load_libc_inotify()
+        for wd, path in self._watches.items():
+            log.debug(f"Removing i-notifier watcher for: {path}")
+            libc.inotify_rm_watch(self._fd, wd)
+        self._watches = {}
+
+
 class DirectoryWatch:
     """
     Directory to be watched
@@ -350,7 +565,7 @@ def end_loop_cb(fsw, user_callback=None):
 def create_filesystem_watcher(dir_watches):
     """
     determines if inotify is available and configured in rhsm.conf
-    If yes, uses pyinotify. Else, uses polling methods.
+    If yes, uses i-notify system calls or pyinotify. Else, uses polling methods.
     Uses inotify by default
     :param dir_watches: dictionary of directories to watch to create
     correct filesystem watcher object
@@ -361,8 +576,10 @@ def create_filesystem_watcher(dir_watches):
         thread = threading.Thread(target=filesystem_watcher.loop)
         thread.start()
     """
-    available = is_inotify_available()
     configured = is_inotify_config()
+    if configured and is_native_inotify_available():
+        return NativeInotifyFilesystemWatcher(dir_watches)
+    available = is_inotify_available()
     if not (available and configured):
         return FilesystemWatcher(dir_watches)
     else:
@@ -377,6 +594,14 @@ def is_inotify_available():
     return pyinotify is not None
 
 
+def is_native_inotify_available():
+    """
+    Checks if i-notify system calls are available in C library
+    :return:
+    """
+    return _load_libc_inotify() is not None
+
+
 def is_inotify_config():
     """
     Check if inotify is enabled or disabled in rhsm.conf.
@@ -19,10 +19,17 @@
 import logging
 from typing import List, TYPE_CHECKING
 
+import rhsm.config
+
 from subscription_manager import base_action_client
+from subscription_manager import injection as inj
+from subscription_manager.cache import prefetch_status
+from subscription_manager.utils import get_supported_resources
 
 if TYPE_CHECKING:
+    from subscription_manager.cache import StatusCache
     from subscription_manager.certlib import BaseActionInvoker
+    from subscription_manager.identity import Identity
 
 from subscription_manager.entcertlib import EntCertActionInvoker
 from subscription_manager.identitycertlib import IdentityCertActionInvoker
@@ -60,6 +67,30 @@ class ActionClient(base_action_client.BaseActionClient):
 
         return lib_set
 
+    def _prefetch_status(self) -> None:
+        """
+        Content overrides and release are independent of entitlement certificates. Start
+        loading them from the server, while entitlement certificates are updated.
+        """
+        identity: Identity = inj.require(inj.IDENTITY)
+        if not identity.is_valid():
+            return
+
+        caches: List[StatusCache] = []
+        try:
+            if "content_overrides" in get_supported_resources(uep=None, identity=identity):
+                caches.append(inj.require(inj.OVERRIDE_STATUS_CACHE))
+        except Exception as exc:
+            log.debug(f"Unable to get supported resources: {type(exc).__name__}: {exc}")
+            return
+        # Release is loaded from the server only in the case, when it is not cached
+        release_status_cache: StatusCache = inj.require(inj.RELEASE_STATUS_CACHE)
+        if not rhsm.config.in_container() and not release_status_cache.exists():
+            caches.append(release_status_cache)
+
+        uep = inj.require(inj.CP_PROVIDER).get_consumer_auth_cp()
+        prefetch_status(uep, identity.uuid, caches)
+
 
 # it may make more sense to have *Lib.cleanup actions?
 # *Lib things are weird, since some are idempotent, but
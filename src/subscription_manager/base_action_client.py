@@ -18,6 +18,7 @@ from typing import List, Optional, TYPE_CHECKING
 from rhsm.connection import GoneException, ExpiredIdentityCertException
 
 from subscription_manager import injection as inj
+from subscription_manager.cache import CacheManager
 
 if TYPE_CHECKING:
     from subscription_manager.certlib import BaseActionInvoker, ActionReport
@@ -44,14 +45,24 @@ class BaseActionClient:
     def update(self) -> None:
         """
         Update entitlement certificates and corresponding DNF repositories.
+        Cache files written by action invokers are committed together at the end.
         """
         # TODO: move to using a lock context manager
         try:
             self.lock.acquire()
-            self.update_reports = self._run_updates()
+            with CacheManager.storage.batch():
+                self._prefetch_status()
+                self.update_reports = self._run_updates()
         finally:
             self.lock.release()
 
+    def _prefetch_status(self) -> None:
+        """
+        Start loading statuses, which will be needed by action invokers, from the server
+        concurrently. Subclasses can override this method.
+        """
+        pass
+
     def _run_update(self, lib: "BaseActionInvoker") -> "ActionReport":
         update_report: Optional[ActionReport] = None
 
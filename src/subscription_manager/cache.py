@@ -18,15 +18,22 @@ this with the current state, and perform an update on the server if
 necessary.
 """
 import base64
+import contextlib
 import datetime
+import functools
+import io
 import logging
 import os
 import socket
+import sqlite3
+import tempfile
 import threading
 import time
-from typing import Dict, TextIO, Literal, Optional, List, Any, Set, TYPE_CHECKING
+from typing import Callable, Dict, Iterator, TextIO, Literal, Optional, List, Any, Set, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from concurrent.futures import Future
+
     from rhsm.certificate2 import EntitlementCertificate, Product
     from rhsm.connection import UEPConnection
     from subscription_manager.certdirectory import ProductDirectory, EntitlementDirectory
@@ -37,7 +44,14 @@ from rhsm.https import ssl
 
 from rhsm.config import get_config_parser
 import rhsm.connection as connection
-from rhsm.profile import get_profile, PROFILE_MAP
+from rhsm.profile import (
+    diff_packages,
+    get_profile,
+    get_profile_fingerprint,
+    Package,
+    PackageDiff,
+    PROFILE_MAP,
+)
 import subscription_manager.injection as inj
 from subscription_manager.jsonwrapper import PoolWrapper
 from rhsm import ourjson as json
@@ -52,10 +66,378 @@ from subscription_manager.i18n import ugettext as _
 log = logging.getLogger(__name__)
 
 PACKAGES_RESOURCE = "packages"
+# Capability of the server accepting only changed parts of combined profile
+PROFILE_DELTA_CAPABILITY = "profile_delta"
+
+# Directory of caches, which can be stored in one database
+DEFAULT_CACHE_DIR = "/var/lib/rhsm/cache"
 
 conf = config.Config(get_config_parser())
 
 
+class CacheStorage:
+    """
+    Storage of cache files. Every file is written atomically: the content is written
+    to a temporary file in the same directory, which is flushed to the disk and renamed
+    to the cache file. Thus the cache file contains either old or new content, but it
+    is never truncated, when the process is killed or the system crashes.
+
+    When a batch is open, then writes and deletions are kept in memory and all of them
+    are done at the end of the batch. Directories are synchronized only once per batch.
+    Content of files waiting for the end of the batch is returned by read().
+
+    Every write or deletion increments the generation number of the file. Readers can
+    compare the generation with the one of previously parsed content and skip parsing
+    of unchanged file.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._batch_depth: int = 0
+        # Content of files waiting for the end of the batch; None means deletion
+        self._pending: Dict[str, Optional[str]] = {}
+        # Callbacks called, when pending files are written
+        self._callbacks: List[Callable[[], None]] = []
+        self._generations: Dict[str, int] = {}
+
+    @property
+    def batching(self) -> bool:
+        return self._batch_depth > 0
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Context manager postponing writes of cache files until the end of the outermost batch
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.commit()
+
+    def is_file_backed(self, path: str) -> bool:
+        """
+        Return True, when the cache is stored in the file of given path
+        """
+        return True
+
+    def generation(self, path: str) -> Optional[Tuple]:
+        """
+        Return the generation of the file. It is changed, when the file is written or deleted
+        by this storage, and also when the file is replaced or modified by another process.
+        :param path: path of the cache file
+        :return: comparable generation or None, when the file does not exist
+        """
+        with self._lock:
+            counter: int = self._generations.get(path, 0)
+            if path in self._pending:
+                return None if self._pending[path] is None else (counter,)
+        generation: Optional[Tuple] = self._stored_generation(path)
+        if generation is None:
+            return None
+        return (counter,) + generation
+
+    def exists(self, path: str) -> bool:
+        with self._lock:
+            if path in self._pending:
+                return self._pending[path] is not None
+        return self._stored_exists(path)
+
+    def read(self, path: str) -> str:
+        """
+        Return the content of the cache file
+        :raises OSError: when the file cannot be read
+        """
+        with self._lock:
+            if path in self._pending:
+                content: Optional[str] = self._pending[path]
+                if content is None:
+                    raise FileNotFoundError(path)
+                return content
+        return self._stored_read(path)
+
+    def write(self, path: str, content: str, on_commit: Optional[Callable[[], None]] = None) -> None:
+        """
+        Write the content to the cache file atomically. When a batch is open, then the file is
+        written at the end of the batch.
+        :param path: path of the cache file
+        :param content: new content of the file
+        :param on_commit: callback called after the file is written
+        :raises OSError: when the file cannot be written outside of a batch
+        """
+        self._change(path, content, on_commit)
+
+    def delete(self, path: str) -> None:
+        """
+        Delete the cache file. When a batch is open, then the file is deleted at the end of the batch.
+        """
+        self._change(path, None)
+
+    def _change(
+        self, path: str, content: Optional[str], on_commit: Optional[Callable[[], None]] = None
+    ) -> None:
+        with self._lock:
+            self._generations[path] = self._generations.get(path, 0) + 1
+            if self.batching:
+                # Files are written in the order of the latest change
+                self._pending.pop(path, None)
+                self._pending[path] = content
+                if on_commit is not None:
+                    self._callbacks.append(on_commit)
+                return
+            self._store({path: content})
+        if on_commit is not None:
+            on_commit()
+
+    def commit(self) -> None:
+        """
+        Write and delete all files waiting for the end of the batch. Errors are only logged,
+        because the batch is committed at the end of unrelated actions.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            callbacks, self._callbacks = self._callbacks, []
+            if pending:
+                try:
+                    self._store(pending)
+                except OSError as err:
+                    log.error("Unable to write cache: %s" % err)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as err:
+                log.exception(err)
+        if pending:
+            log.debug("Committed %d cache file(s)" % len(pending))
+
+    def _stored_generation(self, path: str) -> Optional[Tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _stored_exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def _stored_read(self, path: str) -> str:
+        with open(path) as f:
+            return f.read()
+
+    def _store(self, changes: Dict[str, Optional[str]]) -> None:
+        """
+        Write or delete files. All files are processed even when some of them fail.
+        :param changes: dictionary with paths and new content; None means deletion
+        :raises OSError: the first error, when any file could not be written or deleted
+        """
+        first_error: Optional[OSError] = None
+        directories: Set[str] = set()
+        for path, content in changes.items():
+            try:
+                if content is None:
+                    self._delete_file(path)
+                else:
+                    self._write_file(path, content)
+                    directories.add(os.path.dirname(path))
+            except OSError as err:
+                first_error = first_error or err
+        for directory in directories:
+            self._sync_directory(directory)
+        if first_error is not None:
+            raise first_error
+
+    @staticmethod
+    def _write_file(path: str, content: str) -> None:
+        directory: str = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            mode: int = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".%s." % os.path.basename(path))
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _delete_file(path: str) -> None:
+        if os.path.exists(path):
+            log.debug("Deleting cache: %s" % path)
+            os.remove(path)
+
+    @staticmethod
+    def _sync_directory(directory: str) -> None:
+        """
+        Make renames in the directory persistent
+        """
+        try:
+            fd: int = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+class SQLiteCacheStorage(CacheStorage):
+    """
+    Storage keeping all cache files of one directory in a single SQLite database. Every
+    cache is one row indexed by the path of the cache file, so reading one cache does
+    not require opening and parsing the other ones, and the whole batch is written in
+    one transaction. Files of other directories are stored as files.
+
+    Existing cache files are migrated to the database, when they are accessed for the
+    first time. The file is removed after its content is stored in the database.
+    """
+
+    DATABASE_NAME = "cache.db"
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        super().__init__()
+        self.directory: str = directory
+        self.database: str = os.path.join(directory, self.DATABASE_NAME)
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _manages(self, path: str) -> bool:
+        return os.path.dirname(path) == self.directory
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                # Access to the connection is serialized using the lock of the storage
+                connection = sqlite3.connect(self.database, timeout=30, check_same_thread=False)
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache "
+                    "(path TEXT PRIMARY KEY, content TEXT NOT NULL, generation INTEGER NOT NULL)"
+                )
+                connection.commit()
+            except (OSError, sqlite3.Error) as err:
+                raise OSError("Unable to open cache database %s: %s" % (self.database, err)) from err
+            self._connection = connection
+        return self._connection
+
+    def _select(self, path: str) -> Optional[Tuple[str, int]]:
+        """
+        Return content and generation of the cache. The cache file is migrated to
+        the database, when the database does not contain it yet.
+        """
+        with self._lock:
+            connection: sqlite3.Connection = self._connect()
+            try:
+                row = connection.execute(
+                    "SELECT content, generation FROM cache WHERE path = ?", (path,)
+                ).fetchone()
+                if row is not None or not os.path.exists(path):
+                    return row
+                content: str = super()._stored_read(path)
+                with connection:
+                    connection.execute(
+                        "INSERT OR IGNORE INTO cache (path, content, generation) VALUES (?, ?, 1)",
+                        (path, content),
+                    )
+            except sqlite3.Error as err:
+                raise OSError("Unable to read %s from cache database: %s" % (path, err)) from err
+            log.debug("Migrated cache %s to %s" % (path, self.database))
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            return content, 1
+
+    def is_file_backed(self, path: str) -> bool:
+        return not self._manages(path)
+
+    def _stored_generation(self, path: str) -> Optional[Tuple]:
+        if not self._manages(path):
+            return super()._stored_generation(path)
+        try:
+            row: Optional[Tuple[str, int]] = self._select(path)
+        except OSError:
+            return None
+        return None if row is None else (row[1],)
+
+    def _stored_exists(self, path: str) -> bool:
+        if not self._manages(path):
+            return super()._stored_exists(path)
+        try:
+            return self._select(path) is not None
+        except OSError:
+            return False
+
+    def _stored_read(self, path: str) -> str:
+        if not self._manages(path):
+            return super()._stored_read(path)
+        row: Optional[Tuple[str, int]] = self._select(path)
+        if row is None:
+            raise FileNotFoundError(path)
+        return row[0]
+
+    def _store(self, changes: Dict[str, Optional[str]]) -> None:
+        managed: Dict[str, Optional[str]] = {
+            path: content for path, content in changes.items() if self._manages(path)
+        }
+        first_error: Optional[OSError] = None
+        if managed:
+            with self._lock:
+                try:
+                    with self._connect() as connection:
+                        for path, content in managed.items():
+                            if content is None:
+                                connection.execute("DELETE FROM cache WHERE path = ?", (path,))
+                            else:
+                                connection.execute(
+                                    "INSERT INTO cache (path, content, generation) VALUES (?, ?, 1) "
+                                    "ON CONFLICT(path) DO UPDATE SET "
+                                    "content = excluded.content, generation = generation + 1",
+                                    (path, content),
+                                )
+                except sqlite3.Error as err:
+                    first_error = OSError("Unable to write cache database %s: %s" % (self.database, err))
+                except OSError as err:
+                    first_error = err
+            if first_error is None:
+                # Cache files, which were not migrated yet, must not be migrated after the change
+                for path in managed:
+                    with contextlib.suppress(OSError):
+                        self._delete_file(path)
+        files: Dict[str, Optional[str]] = {
+            path: content for path, content in changes.items() if not self._manages(path)
+        }
+        if files:
+            try:
+                super()._store(files)
+            except OSError as err:
+                first_error = first_error or err
+        if first_error is not None:
+            raise first_error
+
+
+def _create_cache_storage() -> CacheStorage:
+    """
+    Create the storage of caches configured using the cache_backend option
+    """
+    backend: str = conf["rhsm"].get("cache_backend") or "files"
+    if backend == "sqlite":
+        return SQLiteCacheStorage()
+    if backend != "files":
+        log.warning("Unknown cache_backend '%s', cache files are used" % backend)
+    return CacheStorage()
+
+
 class CacheManager:
     """
     Parent class used for common logic in a number of collections
@@ -67,6 +449,9 @@ class CacheManager:
     # Fields the subclass must override:
     CACHE_FILE: str = None
 
+    # Storage shared by all caches, so their writes can be committed together
+    storage: CacheStorage = _create_cache_storage()
+
     def to_dict(self) -> Dict:
         """
         Returns the data for this collection as a dict to be serialized
@@ -98,12 +483,10 @@ class CacheManager:
     @classmethod
     def delete_cache(cls) -> None:
         """Delete the cache for this collection from disk."""
-        if os.path.exists(cls.CACHE_FILE):
-            log.debug("Deleting cache: %s" % cls.CACHE_FILE)
-            os.remove(cls.CACHE_FILE)
+        cls.storage.delete(cls.CACHE_FILE)
 
     def _cache_exists(self) -> bool:
-        return os.path.exists(self.CACHE_FILE)
+        return self.storage.exists(self.CACHE_FILE)
 
     def exists(self) -> bool:
         return self._cache_exists()
@@ -118,13 +501,18 @@ class CacheManager:
         bundled up with the registration request, after which we need to
         manually write to disk.
         """
+        self._write_cache(debug)
+
+    def _write_cache(self, debug: bool = True, on_commit: Optional[Callable[[], None]] = None) -> None:
+        """
+        Write the current cache using the storage. When a batch of the storage is open,
+        then the file is written at the end of the batch.
+        :param debug: log the write
+        :param on_commit: callback called after the file is written
+        """
         # Logging in this method (when threaded) can cause a segfault, BZ 988861 and 988430
         try:
-            if not os.access(os.path.dirname(self.CACHE_FILE), os.R_OK):
-                os.makedirs(os.path.dirname(self.CACHE_FILE))
-            f: TextIO = open(self.CACHE_FILE, "w+")
-            json.dump(self.to_dict(), f, default=json.encode)
-            f.close()
+            self.storage.write(self.CACHE_FILE, json.dumps(self.to_dict(), default=json.encode), on_commit)
             if debug:
                 log.debug("Wrote cache: %s" % self.CACHE_FILE)
         except IOError as err:
@@ -138,9 +526,13 @@ class CacheManager:
         """
 
         try:
-            f = open(self.CACHE_FILE)
-            data: dict = self._load_data(f)
-            f.close()
+            generation: Optional[Tuple] = self.storage.generation(self.CACHE_FILE)
+            if generation is not None and generation == getattr(self, "_read_generation", None):
+                # The file was not changed since it was parsed the last time
+                return self._read_data
+            data: dict = self._load_data(io.StringIO(self.storage.read(self.CACHE_FILE)))
+            if data is not None:
+                self._read_generation, self._read_data = generation, data
             return data
         except IOError as err:
             log.error("Unable to read cache: %s" % self.CACHE_FILE)
@@ -214,9 +606,35 @@ class StatusCache(CacheManager):
     than sending it.
     """
 
+    # When the content of the cache file is the same as the response of the server,
+    # then the status can be loaded using conditional GET request (ETag, Last-Modified)
+    CONDITIONAL_REQUEST: bool = False
+
     def __init__(self):
         self.server_status: Optional[Dict] = None
         self.last_error: Optional[Exception] = None
+        # Request started by prefetch_status(): (uuid, on_date, future)
+        self._prefetch: Optional[Tuple[str, Optional[datetime.datetime], "Future"]] = None
+        # Validators of the latest response, which are written together with the cache
+        self._conditional: Optional[connection.ConditionalRequest] = None
+
+    @property
+    def validators_file(self) -> str:
+        """
+        Path of the file with validators of the cached response
+        """
+        return os.path.splitext(self.CACHE_FILE)[0] + ".validators.json"
+
+    def _pop_prefetch(self, uuid: str, on_date: Optional[datetime.datetime]) -> Optional["Future"]:
+        """
+        Return the future of the request started by prefetch_status(), when the request
+        was started with the same arguments. The prefetched status is used only once.
+        """
+        prefetch = getattr(self, "_prefetch", None)
+        self._prefetch = None
+        if prefetch is not None and prefetch[0] == uuid and prefetch[1] == on_date:
+            return prefetch[2]
+        return None
 
     def load_status(
         self, uep: connection.UEPConnection, uuid: Optional[str], on_date: Optional[datetime.datetime] = None
@@ -236,7 +654,13 @@ class StatusCache(CacheManager):
             # and None has to be returned
             if uuid is None:
                 return None
-            self._sync_with_server(uep, uuid, on_date)
+            prefetched = self._pop_prefetch(uuid, on_date)
+            if prefetched is not None:
+                log.debug("Using status prefetched from server for %s" % self.CACHE_FILE)
+                # Raises the exception of the request, when the request failed
+                prefetched.result()
+            else:
+                self._sync_with_server_conditionally(uep, uuid, on_date)
             self.write_cache()
             self.last_error = False
             return self.server_status
@@ -296,6 +720,28 @@ class StatusCache(CacheManager):
         """
         raise NotImplementedError
 
+    def _sync_with_server_conditionally(
+        self, uep: connection.UEPConnection, uuid: str, on_date: Optional[datetime.datetime] = None
+    ) -> None:
+        """
+        Sync the latest data from the server. When it is possible, then the request is
+        sent with validators of the cached response and the server does not have to send
+        the status again, when it has not been changed.
+        """
+        conn = getattr(uep, "conn", None)
+        if (
+            not self.CONDITIONAL_REQUEST
+            or not isinstance(conn, connection.BaseRestLib)
+            # Validators are stored next to the cache file
+            or not self.storage.is_file_backed(self.CACHE_FILE)
+        ):
+            self._sync_with_server(uep, uuid, on_date)
+            return
+        conditional = connection.ConditionalRequest(self.CACHE_FILE, self.validators_file, self.storage)
+        with conn.conditional_get(conditional):
+            self._sync_with_server(uep, uuid, on_date)
+        self._conditional = conditional
+
     def _read_cache(self) -> Optional[Dict]:
         """
         Prefer in memory cache to avoid io.  If it doesn't exist, save
@@ -346,19 +792,54 @@ class StatusCache(CacheManager):
         This is threaded because it should never block in runtime.
         Writing to disk means it will be read from memory for the rest of this run.
         """
+        conditional = getattr(self, "_conditional", None)
+        self._conditional = None
+        if self.storage.batching:
+            # The file is only kept in memory until the end of the batch
+            self._write_cache_and_validators(conditional)
+            return
         threading.Thread(
-            target=super(StatusCache, self).write_cache,
-            args=[True],
+            target=self._write_cache_and_validators,
+            args=[conditional],
             name="WriteCache%sThread" % self.__class__.__name__,
         ).start()
         log.debug("Started thread to write cache: %s" % self.CACHE_FILE)
 
+    def _write_cache_and_validators(self, conditional: Optional[connection.ConditionalRequest]) -> None:
+        # Validators have to be written after the cache, because they describe its content
+        self._write_cache(True, conditional.commit if conditional is not None else None)
+
     # we override a @classmethod with an instance method in the sub class?
     def delete_cache(self) -> None:
         super(StatusCache, self).delete_cache()
+        self.storage.delete(self.validators_file)
         self.server_status = None
 
 
+def prefetch_status(
+    uep: connection.UEPConnection,
+    uuid: Optional[str],
+    caches: List[StatusCache],
+    on_date: Optional[datetime.datetime] = None,
+) -> None:
+    """
+    Start loading status of several status caches from the server concurrently. The
+    requests are running in the background and the next call of load_status() of each
+    cache waits for its request instead of sending the same request once again. Thus,
+    the time of loading all statuses is close to the time of the slowest request.
+    """
+    if uuid is None or not caches:
+        return
+    futures: Dict[StatusCache, "Future"] = uep.gather_async(
+        {
+            cache: functools.partial(cache._sync_with_server_conditionally, uep, uuid, on_date)
+            for cache in caches
+        }
+    )
+    for cache, future in futures.items():
+        cache._prefetch = (uuid, on_date, future)
+
+
 class EntitlementStatusCache(StatusCache):
     """
     Manages the system cache of entitlement status from the server.
@@ -367,6 +848,7 @@ class EntitlementStatusCache(StatusCache):
     """
 
     CACHE_FILE = "/var/lib/rhsm/cache/entitlement_status.json"
+    CONDITIONAL_REQUEST = True
 
     def _sync_with_server(
         self, uep: connection.UEPConnection, consumer_uuid: str, on_date: Optional[datetime.datetime] = None
@@ -436,6 +918,7 @@ class OverrideStatusCache(StatusCache):
     """
 
     CACHE_FILE = "/var/lib/rhsm/cache/content_overrides.json"
+    CONDITIONAL_REQUEST = True
 
     def _sync_with_server(
         self, uep: connection.UEPConnection, consumer_uuid: str, _: Optional[datetime.datetime] = None
@@ -449,6 +932,7 @@ class ReleaseStatusCache(StatusCache):
     """
 
     CACHE_FILE = "/var/lib/rhsm/cache/releasever.json"
+    CONDITIONAL_REQUEST = True
 
     def _sync_with_server(
         self, uep: connection.UEPConnection, consumer_uuid: str, _: Optional[datetime.datetime] = None
@@ -476,6 +960,12 @@ class ProfileManager(CacheManager):
         # Could be None, we'll read the system's current profile later once
         # we're sure we actually need the data.
         self._current_profile = None
+        # Profile read from the cache by has_changed(). It is the last profile sent
+        # to the server and the delta of profile is computed against it.
+        self._cached_profile: Optional[Dict[str, List[Dict]]] = None
+        # Fingerprint of the sources of the current profile computed before the profile
+        # was collected. It is written together with the cache.
+        self._fingerprint: Optional[str] = None
         self.report_package_profile = self.profile_reporting_enabled()
         self.identity = inj.require(inj.IDENTITY)
 
@@ -511,6 +1001,33 @@ class ProfileManager(CacheManager):
     @current_profile.setter
     def current_profile(self, new_profile: Dict[str, List[Dict]]):
         self._current_profile = new_profile
+        # The fingerprint does not have to correspond to the profile set from outside
+        self._fingerprint = None
+
+    @property
+    def fingerprint_file(self) -> str:
+        """
+        Path of the file with the fingerprint of the cached profile
+        """
+        return os.path.splitext(self.CACHE_FILE)[0] + ".fingerprint.json"
+
+    def _read_fingerprint(self) -> Optional[str]:
+        try:
+            return json.loads(self.storage.read(self.fingerprint_file)).get("fingerprint")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def write_cache(self, debug: bool = True) -> None:
+        super(ProfileManager, self).write_cache(debug)
+        # The fingerprint is written after the cache, because it describes its content
+        if self._fingerprint is not None:
+            try:
+                self.storage.write(self.fingerprint_file, json.dumps({"fingerprint": self._fingerprint}))
+            except OSError as err:
+                log.error("Unable to write fingerprint of profile: %s" % err)
+        else:
+            # Remove fingerprint, which does not correspond to the cache
+            self.storage.delete(self.fingerprint_file)
 
     def to_dict(self) -> Dict[str, List[Dict]]:
         return self.current_profile
@@ -541,12 +1058,101 @@ class ProfileManager(CacheManager):
             return 0
 
     def has_changed(self) -> bool:
+        if self._current_profile is None:
+            # The fingerprint has to be computed before the profile is collected, because
+            # the system can be changed during the collecting of profile
+            self._fingerprint = get_profile_fingerprint()
+
         if not self._cache_exists():
             log.debug("Cache file %s does not exist" % self.CACHE_FILE)
             return True
 
-        cached_profile: Optional[str] = self._read_cache()
-        return not cached_profile == self.current_profile
+        if self._fingerprint is not None and self._fingerprint == self._read_fingerprint():
+            log.debug("Fingerprint of profile has not changed, skipping collecting of profile")
+            return False
+
+        cached_profile: Optional[Dict[str, List[Dict]]] = self._read_cache()
+        self._cached_profile = cached_profile
+        return not self._profiles_equal(cached_profile, self.current_profile)
+
+    @staticmethod
+    def _diff_rpm_profiles(cached: List[Dict], current: List[Dict]) -> PackageDiff:
+        return diff_packages(map(Package.from_dict, cached), map(Package.from_dict, current))
+
+    @classmethod
+    def _profiles_equal(
+        cls, cached_profile: Optional[Dict[str, List[Dict]]], current_profile: Dict[str, List[Dict]]
+    ) -> bool:
+        """
+        Compare cached profile with current profile. Lists of RPMs are compared as sets
+        of packages, so the order of packages does not matter.
+        """
+        if not isinstance(cached_profile, dict) or cached_profile.keys() != current_profile.keys():
+            return False
+        for content_type, profile in current_profile.items():
+            cached = cached_profile[content_type]
+            if content_type == "rpm" and isinstance(cached, list) and isinstance(profile, list):
+                if len(cached) != len(profile) or cls._diff_rpm_profiles(cached, profile):
+                    return False
+            elif cached != profile:
+                return False
+        return True
+
+    @classmethod
+    def _profile_delta(
+        cls, cached_profile: Dict[str, List[Dict]], current_profile: Dict[str, List[Dict]]
+    ) -> List[Dict]:
+        """
+        Compute delta of current profile against cached profile. Only added and removed
+        packages are included for the list of RPMs. Other parts of the profile are small
+        and they are included completely, when they were changed.
+        """
+        delta: List[Dict] = []
+        for content_type, profile in current_profile.items():
+            cached: Optional[List[Dict]] = cached_profile.get(content_type)
+            if cached == profile:
+                continue
+            if content_type == "rpm" and cached is not None:
+                diff: PackageDiff = cls._diff_rpm_profiles(cached, profile)
+                if not diff:
+                    continue
+                # Changed packages are sent as removed old version and added new version
+                added: Set[Package] = set(diff.added).union(new for _, new in diff.changed)
+                removed: Set[Package] = set(diff.removed).union(old for old, _ in diff.changed)
+                delta.append(
+                    {
+                        "content_type": content_type,
+                        "added": [pkg for pkg in profile if Package.from_dict(pkg) in added],
+                        "removed": [pkg for pkg in cached if Package.from_dict(pkg) in removed],
+                    }
+                )
+            else:
+                delta.append({"content_type": content_type, "profile": profile})
+        return delta
+
+    def _sync_delta_with_server(self, uep: connection.UEPConnection, consumer_uuid: str) -> bool:
+        """
+        Try to send only delta of the profile to the server. It is possible only in the
+        case, when the server supports it and the last profile sent to the server is cached.
+        :return: True, when the delta was sent; False, when whole profile has to be sent.
+        """
+        if self._cached_profile is None or not uep.has_capability(PROFILE_DELTA_CAPABILITY):
+            return False
+        delta: List[Dict] = self._profile_delta(self._cached_profile, self.current_profile)
+        if not delta:
+            return False
+        # When most of packages were changed, then delta is not smaller than whole profile
+        rpm_changes: int = sum(len(item.get("added", [])) + len(item.get("removed", [])) for item in delta)
+        if rpm_changes >= len(self.current_profile.get("rpm", [])):
+            return False
+        try:
+            uep.updateCombinedProfileDelta(consumer_uuid, delta)
+        except connection.RestlibException as err:
+            # The server could refuse delta, e.g. when its profile is not the cached one
+            log.warning(f"Unable to update delta of profile, updating whole profile: {err}")
+            return False
+        log.debug(f"Delta of profile updated ({rpm_changes} packages added or removed)")
+        return True
 
     def _sync_with_server(
         self, uep: connection.UEPConnection, consumer_uuid: str, _: Optional[datetime.datetime] = None
@@ -557,6 +1163,8 @@ class ProfileManager(CacheManager):
         """
         combined_profile: Dict = self.current_profile
         if uep.has_capability("combined_reporting"):
+            if self._sync_delta_with_server(uep, consumer_uuid):
+                return
             _combined_profile: List[Dict] = [
                 {
                     "content_type": key,
@@ -671,6 +1279,7 @@ class PoolStatusCache(StatusCache):
     """
 
     CACHE_FILE = "/var/lib/rhsm/cache/pool_status.json"
+    CONDITIONAL_REQUEST = True
 
     def _sync_with_server(
         self, uep: connection.UEPConnection, consumer_uuid: str, _: Optional[datetime.datetime] = None
@@ -825,6 +1434,32 @@ class WrittenOverrideCache(CacheManager):
             pass
 
 
+class CollectorFactsCache(CacheManager):
+    """
+    Cache of facts gathered by single fact collectors together with fingerprints
+    of their sources. It is used to skip collectors, whose sources did not change.
+    """
+
+    CACHE_FILE = "/var/lib/rhsm/cache/collector_facts.json"
+
+    def __init__(self, collectors: Optional[Dict] = None):
+        self.collectors = collectors or {}
+
+    def to_dict(self) -> Dict:
+        return self.collectors
+
+    def _load_data(self, open_file: TextIO) -> Optional[Dict]:
+        try:
+            self.collectors: Dict = json.loads(open_file.read()) or {}
+            return self.collectors
+        except IOError as err:
+            log.error("Unable to read cache: %s" % self.CACHE_FILE)
+            log.exception(err)
+        except ValueError:
+            # ignore json file parse errors, all facts are collected again
+            pass
+
+
 class ConsumerCache(CacheManager):
     """
     Base class for caching data that gets automatically obsoleted, when consumer uuid
@@ -13,11 +13,15 @@
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
 #
+import functools
+import hashlib
+import json
 import logging
 import os
+import tempfile
 from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
-from rhsm.certificate import Key, create_from_file
+from rhsm.certificate import CertificateException, Key, create_from_file, create_from_pem, dump_parsed
 from rhsm.config import get_config_parser
 from subscription_manager.injection import require, ENT_DIR
 
@@ -34,6 +38,10 @@ conf = config.Config(get_config_parser())
 
 DEFAULT_PRODUCT_CERT_DIR = "/etc/pki/product-default"
 
+ENTITLEMENT_CERT_CACHE = "/var/lib/rhsm/cache/entitlement_certificates.json"
+PRODUCT_CERT_CACHE = "/var/lib/rhsm/cache/product_certificates.json"
+DEFAULT_PRODUCT_CERT_CACHE = "/var/lib/rhsm/cache/product_default_certificates.json"
+
 
 class Directory:
     def __init__(self, path):
@@ -99,27 +107,262 @@ class Directory:
         return self.path
 
 
+def _directory_cache_file(cache_file: str, path: str) -> str:
+    """
+    Return path of the cache file for certificates in the given directory, so that
+    directories sharing one kind of cache (e.g. product certificates in a custom
+    directory) do not overwrite cached data of each other.
+    """
+    digest: str = hashlib.sha256(os.path.realpath(path).encode("utf-8")).hexdigest()[:16]
+    base, ext = os.path.splitext(cache_file)
+    return f"{base}-{digest}{ext}"
+
+
+class CertificateCache:
+    """
+    Persistent cache of data parsed from certificate files, so that the
+    products, order and content of certificates do not have to be decoded
+    again by every process. The data of a file is used only when its inode,
+    modification time, size and SHA-256 hash are the same as when the file
+    was parsed; other files are parsed again.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        self._entries: Optional[Dict[str, dict]] = None
+        self._changed = False
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (IOError, ValueError) as err:
+            log.debug("Unable to read certificate cache %s: %s" % (self.cache_file, err))
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        return data.get("certificates", {})
+
+    def load(self, path: str) -> "EntitlementCertificate":
+        """
+        Create certificate object from the file, using the cached data when
+        the file did not change.
+        """
+        try:
+            # stat before reading, so a file changed meanwhile is parsed again next time
+            stat = os.stat(path)
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            # let create_from_file() report the error as usual
+            return create_from_file(path)
+        file_info = {
+            "inode": stat.st_ino,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+
+        entry: Optional[dict] = self.entries.get(path)
+        if entry is not None and entry["file"] == file_info:
+            try:
+                return create_from_pem(content.decode("utf-8"), path=path, parsed=entry["certificate"])
+            except (CertificateException, UnicodeDecodeError, KeyError, TypeError, ValueError) as err:
+                log.debug("Unable to use cached data of certificate %s: %s" % (path, err))
+
+        cert = create_from_file(path)
+        parsed: Optional[dict] = dump_parsed(cert)
+        if parsed is not None:
+            self.entries[path] = {"file": file_info, "certificate": parsed}
+            self._changed = True
+        elif self.entries.pop(path, None) is not None:
+            self._changed = True
+        return cert
+
+    def prune(self, directory: str, paths: List[str]) -> None:
+        """
+        Forget cached data of certificates in the directory other than the given ones.
+        Certificates in other directories are kept.
+        """
+        # The directory can be configured with a trailing slash
+        directory = os.path.normpath(directory)
+        for path in set(self.entries) - set(paths):
+            if os.path.normpath(os.path.dirname(path)) == directory:
+                del self.entries[path]
+                self._changed = True
+
+    def write(self) -> None:
+        """
+        Write the cache to disk, if anything changed since it was read.
+        Failures are only logged, the cache is an optimization.
+        """
+        if not self._changed:
+            return
+        data = {"version": self.VERSION, "certificates": self.entries}
+        cache_dir = os.path.dirname(self.cache_file)
+        try:
+            if not os.access(cache_dir, os.R_OK):
+                os.makedirs(cache_dir)
+            # write to a temporary file first, so that readers never see a partial cache
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".certificates")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.cache_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError) as err:
+            log.debug("Unable to write certificate cache %s: %s" % (self.cache_file, err))
+            return
+        self._changed = False
+
+
+class CertificateIndex:
+    """
+    Lookup tables over a list of certificates. Every table is built on its
+    first use, so e.g. looking up a serial does not need the products of the
+    certificates. Lists in the tables keep the order of the certificates.
+    """
+
+    def __init__(self, certs: List["EntitlementCertificate"]):
+        self.certs = certs
+        self._excluding_type: Dict[str, List["EntitlementCertificate"]] = {}
+
+    @functools.cached_property
+    def by_serial(self) -> Dict[int, "EntitlementCertificate"]:
+        index = {}
+        for cert in self.certs:
+            index.setdefault(cert.serial, cert)
+        return index
+
+    @functools.cached_property
+    def by_product(self) -> Dict[str, List["EntitlementCertificate"]]:
+        index = {}
+        for cert in self.certs:
+            for product in cert.products:
+                index.setdefault(product.id, []).append(cert)
+        return index
+
+    @functools.cached_property
+    def by_pool(self) -> Dict[str, List["EntitlementCertificate"]]:
+        index = {}
+        for cert in self.certs:
+            if cert.pool is not None:
+                index.setdefault(str(cert.pool.id), []).append(cert)
+        return index
+
+    @functools.cached_property
+    def by_stacking_id(self) -> Dict[str, List["EntitlementCertificate"]]:
+        index = {}
+        for cert in self.certs:
+            if cert.order and cert.order.stacking_id:
+                index.setdefault(cert.order.stacking_id, []).append(cert)
+        return index
+
+    @functools.cached_property
+    def by_type(self) -> Dict[str, List["EntitlementCertificate"]]:
+        index = {}
+        for cert in self.certs:
+            index.setdefault(cert.entitlement_type, []).append(cert)
+        return index
+
+    def excluding_type(self, entitlement_type: str) -> List["EntitlementCertificate"]:
+        """
+        :return: certificates with other entitlement type than the given one
+        """
+        if entitlement_type not in self._excluding_type:
+            self._excluding_type[entitlement_type] = [
+                cert for cert in self.certs if cert.entitlement_type != entitlement_type
+            ]
+        return self._excluding_type[entitlement_type]
+
+
 class CertificateDirectory(Directory):
     KEY = "key.pem"
 
-    def __init__(self, path: str):
+    # lookup tables over the result of list()
+    _index: Optional[CertificateIndex] = None
+
+    def __init__(self, path: str, cache_file: Optional[str] = None):
+        """
+        :param path: path of the directory
+        :param cache_file: path of the file with cached data of parsed
+            certificates, or None to parse the certificates every time
+        """
         super(CertificateDirectory, self).__init__(path)
         self.create()
         self._listing: Optional[List["EntitlementCertificate"]] = None
+        # certificates of the last listing by file name, with the state of their files
+        self._files: Dict[str, Tuple[Optional[tuple], "EntitlementCertificate"]] = {}
+        self._cert_cache: Optional[CertificateCache] = CertificateCache(cache_file) if cache_file else None
 
     def refresh(self) -> None:
-        # simply clear the cache. the next list() will reload.
+        # simply clear the listing. the next list() will load only the
+        # certificates whose files were added or changed.
         self._listing = None
+        self._index = None
+
+    @staticmethod
+    def _file_state(path: str) -> Optional[tuple]:
+        """
+        Return values identifying the current version of the file, or None
+        when it cannot be determined.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size
+
+    def _get_index(self) -> CertificateIndex:
+        """
+        Return lookup tables over the certificates returned by list(). They
+        are built again only when list() returns another list, i.e. after
+        refresh().
+        """
+        certs = self.list()
+        if self._index is None or self._index.certs is not certs:
+            self._index = CertificateIndex(certs)
+        return self._index
 
     def list(self) -> List["EntitlementCertificate"]:
         if self._listing is not None:
             return self._listing
         listing = []
+        paths = []
+        files = {}
         for _p, fn in Directory.list(self):
             if not fn.endswith(".pem") or fn.endswith(self.KEY):
                 continue
             path = self.abspath(fn)
-            listing.append(create_from_file(path))
+            paths.append(path)
+            state = self._file_state(path)
+            previous = self._files.get(fn)
+            if state is not None and previous is not None and previous[0] == state:
+                # the file did not change since the last listing
+                cert = previous[1]
+            elif self._cert_cache is not None:
+                cert = self._cert_cache.load(path)
+            else:
+                cert = create_from_file(path)
+            files[fn] = (state, cert)
+            listing.append(cert)
+        if self._cert_cache is not None:
+            self._cert_cache.prune(self.path, paths)
+            self._cert_cache.write()
+        self._files = files
         self._listing = listing
         return listing
 
@@ -138,45 +381,22 @@ class CertificateDirectory(Directory):
         return expired
 
     def find(self, sn: str) -> Optional["EntitlementCertificate"]:
-        # TODO: could optimize to just load SERIAL.pem? Maybe not in all cases.
-        for c in self.list():
-            if c.serial == sn:
-                return c
-        return None
+        return self._get_index().by_serial.get(sn)
 
     def find_all_by_product(self, p_hash: str) -> List["EntitlementCertificate"]:
-        certs = set()
-        providing_stack_ids = set()
-        stack_id_map = {}
+        index = self._get_index()
+        certs = set(index.by_product.get(p_hash, []))
 
-        # Note this will override a product cert for id '71' with
-        # a different product cert for id '71' if it is later in self.list
-        for c in self.list():
-            for p in c.products:
-                if p.id == p_hash:
-                    certs.add(c)
-                    # Keep track of stacks that provide our product
-                    if c.order and c.order.stacking_id:
-                        providing_stack_ids.add(c.order.stacking_id)
-
-            # Keep track of stack ids in case we need them later.  avoids another loop
-            if c.order and c.order.stacking_id:
-                if c.order.stacking_id not in stack_id_map:
-                    stack_id_map[c.order.stacking_id] = set()
-                stack_id_map[c.order.stacking_id].add(c)
-
-        # Complete
+        # Complete with the certificates stacked with those providing our product
+        providing_stack_ids = set(c.order.stacking_id for c in certs if c.order and c.order.stacking_id)
         for stack_id in providing_stack_ids:
-            certs |= stack_id_map[stack_id]
+            certs.update(index.by_stacking_id[stack_id])
 
         return list(certs)
 
     def find_by_product(self, p_hash: str) -> Optional["EntitlementCertificate"]:
-        for c in self.list():
-            for p in c.products:
-                if p.id == p_hash:
-                    return c
-        return None
+        certs = self._get_index().by_product.get(p_hash)
+        return certs[0] if certs else None
 
     # Set up an alias for backwards compatibility
     findByProduct = find_by_product
@@ -218,11 +438,19 @@ class ProductCertificateDirectory(CertificateDirectory):
 
 
 class ProductDirectory(ProductCertificateDirectory):
+    _combined: Optional[Tuple[list, list, list]] = None
+
     def __init__(self, path: Optional[str] = None, default_path: Optional[str] = None):
         installed_prod_path: str = path or conf["rhsm"]["productCertDir"]
         default_prod_path: str = default_path or DEFAULT_PRODUCT_CERT_DIR
-        self.installed_prod_dir = ProductCertificateDirectory(path=installed_prod_path)
-        self.default_prod_dir = ProductCertificateDirectory(path=default_prod_path)
+        self.installed_prod_dir = ProductCertificateDirectory(
+            path=installed_prod_path,
+            cache_file=_directory_cache_file(PRODUCT_CERT_CACHE, installed_prod_path),
+        )
+        self.default_prod_dir = ProductCertificateDirectory(
+            path=default_prod_path,
+            cache_file=_directory_cache_file(DEFAULT_PRODUCT_CERT_CACHE, default_prod_path),
+        )
 
         # In productid.py, ProductDirectory.path is used as path to write new certs
         # to. Souse  the installed_prod_dir (/etc/pki/product) as that is
@@ -237,27 +465,42 @@ class ProductDirectory(ProductCertificateDirectory):
     def list(self) -> List["EntitlementCertificate"]:
         installed_prod_list: List[EntitlementCertificate] = self.installed_prod_dir.list()
         default_prod_list: List[EntitlementCertificate] = self.default_prod_dir.list()
+        # Reuse the combined list while both directories return the same lists,
+        # so that the lookup tables built over it stay valid.
+        if self._combined is not None:
+            installed, default, combined = self._combined
+            if installed is installed_prod_list and default is default_prod_list:
+                return combined
 
         # Product IDs in installed_prod dir.
         pids: Set[str] = set([cert.products[0].id for cert in installed_prod_list])
         # Everything from /etc/pki/product, only use product-default for pids that don't already exist
-        return installed_prod_list + [cert for cert in default_prod_list if cert.products[0].id not in pids]
+        combined = installed_prod_list + [
+            cert for cert in default_prod_list if cert.products[0].id not in pids
+        ]
+        self._combined = (installed_prod_list, default_prod_list, combined)
+        return combined
 
     def refresh(self) -> None:
         self.installed_prod_dir.refresh()
         self.default_prod_dir.refresh()
+        self._combined = None
+        self._index = None
 
 
 class EntitlementDirectory(CertificateDirectory):
     PATH = conf["rhsm"]["entitlementCertDir"]
     PRODUCT = "product"
 
+    # lookup tables over all certificates, including the SCA ones
+    _content_access_index: Optional[CertificateIndex] = None
+
     @classmethod
     def productpath(cls) -> str:
         return cls.PATH
 
     def __init__(self):
-        super(EntitlementDirectory, self).__init__(self.productpath())
+        super(EntitlementDirectory, self).__init__(self.productpath(), cache_file=ENTITLEMENT_CERT_CACHE)
 
     def _check_key(self, cert: "EntitlementCertificate") -> bool:
         """
@@ -291,13 +534,26 @@ class EntitlementDirectory(CertificateDirectory):
     def list_valid_with_content_access(self) -> List["EntitlementCertificate"]:
         return [x for x in self.list_with_content_access() if self._check_key(x) and x.is_valid()]
 
+    def refresh(self) -> None:
+        super(EntitlementDirectory, self).refresh()
+        self._content_access_index = None
+
+    def _get_content_access_index(self) -> CertificateIndex:
+        """
+        Return lookup tables over all entitlement certificates, including
+        the SCA ones.
+        """
+        certs = super(EntitlementDirectory, self).list()
+        if self._content_access_index is None or self._content_access_index.certs is not certs:
+            self._content_access_index = CertificateIndex(certs)
+        return self._content_access_index
+
     def list(self) -> List["EntitlementCertificate"]:
         """
         List entitlement certificates that do not have SCA type
         :return: list of entitlement certs
         """
-        certs = super(EntitlementDirectory, self).list()
-        return [cert for cert in certs if cert.entitlement_type != CONTENT_ACCESS_CERT_TYPE]
+        return self._get_content_access_index().excluding_type(CONTENT_ACCESS_CERT_TYPE)
 
     def list_with_content_access(self) -> List["EntitlementCertificate"]:
         """
@@ -311,30 +567,27 @@ class EntitlementDirectory(CertificateDirectory):
         List only entitlement certificates that do have SCA type
         :return:
         """
-        certs = super(EntitlementDirectory, self).list()
-        return [cert for cert in certs if cert.entitlement_type == CONTENT_ACCESS_CERT_TYPE]
+        return list(self._get_content_access_index().by_type.get(CONTENT_ACCESS_CERT_TYPE, []))
 
     def list_for_product(self, product_id: str) -> List["EntitlementCertificate"]:
         """
         Returns all entitlement certificates providing access to the given
         product ID.
         """
-        entitlements = []
-        for cert in self.list():
-            for cert_product in cert.products:
-                if product_id == cert_product.id:
-                    entitlements.append(cert)
-        return entitlements
+        return list(self._get_index().by_product.get(product_id, []))
 
     def list_for_pool_id(self, pool_id: str) -> List["EntitlementCertificate"]:
         """
         Returns all entitlement certificates provided by the given
         pool ID.
         """
-        entitlements = [
-            entitlement for entitlement in self.list() if str(entitlement.pool.id) == str(pool_id)
-        ]
-        return entitlements
+        return list(self._get_index().by_pool.get(str(pool_id), []))
+
+    def list_for_stacking_id(self, stacking_id: str) -> List["EntitlementCertificate"]:
+        """
+        Returns all entitlement certificates with the given stacking ID.
+        """
+        return list(self._get_index().by_stacking_id.get(stacking_id, []))
 
 
 class Path:
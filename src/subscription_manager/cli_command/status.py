@@ -25,6 +25,7 @@ from rhsmlib.services import entitlement
 from rhsmlib.services.refresh import Refresh
 
 from subscription_manager import syspurposelib
+from subscription_manager.cache import prefetch_status
 from subscription_manager.cli import system_exit
 from subscription_manager.cli_command.cli import CliCommand
 from subscription_manager.i18n import ugettext as _
@@ -128,9 +129,10 @@ class StatusCommand(CliCommand):
                 print("- {name}".format(name=format_name(message, 2, columns)))
             print("")
 
-    def _print_syspurpose_status(self, on_date):
+    @staticmethod
+    def _sync_syspurpose():
         """
-        Print syspurpose status
+        Synchronize syspurpose with the server
         :return: None
         """
         try:
@@ -140,6 +142,11 @@ class StatusCommand(CliCommand):
         except (OSError, ConnectionException) as ne:
             log.exception(ne)
 
+    def _print_syspurpose_status(self, on_date):
+        """
+        Print syspurpose status
+        :return: None
+        """
         syspurpose_cache = inj.require(inj.SYSTEMPURPOSE_COMPLIANCE_STATUS_CACHE)
         syspurpose_cache.load_status(self.cp, self.identity.uuid, on_date)
         print(_("System Purpose Status: {status}").format(status=syspurpose_cache.get_overall_status()))
@@ -160,6 +167,14 @@ class StatusCommand(CliCommand):
         # First get/check if provided date is valid
         on_date = self._get_date_cli_option()
 
+        # Entitlement status does not depend on system purpose. Load it from the server, while
+        # system purpose is synchronized, and then load system purpose status in the background
+        prefetch_status(self.cp, self.identity.uuid, [inj.require(inj.ENTITLEMENT_STATUS_CACHE)], on_date)
+        self._sync_syspurpose()
+        prefetch_status(
+            self.cp, self.identity.uuid, [inj.require(inj.SYSTEMPURPOSE_COMPLIANCE_STATUS_CACHE)], on_date
+        )
+
         service_status = entitlement.EntitlementService(cp=self.cp).get_status(on_date)
 
         self._print_status(service_status)
@@ -10,8 +10,10 @@
 # Red Hat trademarks are not licensed under GPLv2. No permission is
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
-from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from concurrent.futures import Future
+from typing import Dict, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
 
+import functools
 import logging
 import socket
 
@@ -43,6 +45,11 @@ log = logging.getLogger(__name__)
 
 CONTENT_ACCESS_CERT_CAPABILITY = "org_level_content_access"
 
+# Maximal number of serial numbers requested in one query of entitlement certificates
+SERIALS_CHUNK_SIZE = 100
+# Maximal number of chunks of entitlement certificates requested concurrently
+SERIALS_CHUNK_WORKERS = 4
+
 
 class EntCertActionInvoker(certlib.BaseActionInvoker):
     """Invoker for entitlement certificate updating actions."""
@@ -119,11 +126,13 @@ class EntCertUpdateAction:
             content_access_certs: List[EntitlementCertificate] = self._find_content_access_certs()
             if len(content_access_certs) > 0:
                 # This addresses BZs: 1448855, 1450862
+                installed: Set[int] = set(installed_serials)
+                expected_serials: Set[int] = set(expected)
                 obsolete_certs: List[EntitlementCertificate] = []
                 for cont_access_cert in content_access_certs:
-                    if cont_access_cert.serial in installed_serials:
+                    if cont_access_cert.serial in installed:
                         continue
-                    if cont_access_cert.serial not in expected:
+                    if cont_access_cert.serial not in expected_serials:
                         obsolete_certs.append(cont_access_cert)
                 if len(obsolete_certs) > 0:
                     log.info("Deleting obsolete content access certificate")
@@ -151,7 +160,7 @@ class EntCertUpdateAction:
     def install(self, missing_serials) -> List[int]:
         """Install any missing entitlement certificates."""
 
-        cert_bundles = self.get_certificates_by_serial_list(missing_serials)
+        cert_bundles = self.iter_certificates_by_serial_list(missing_serials)
 
         ent_cert_bundles_installer = EntitlementCertBundlesInstaller(self.report)
         return ent_cert_bundles_installer.install(cert_bundles)
@@ -197,14 +206,15 @@ class EntCertUpdateAction:
         self, local: Dict[int, "EntitlementCertificate"], expected: List[int]
     ) -> List[int]:
         """Find serials from the server we do not have locally."""
-        missing = [sn for sn in expected if sn not in local]
+        missing = [sn for sn in dict.fromkeys(expected) if sn not in local]
         return missing
 
     def _find_rogue_serials(
         self, local: Dict[int, "EntitlementCertificate"], expected: List[int]
     ) -> List["EntitlementCertificate"]:
         """Find serials we have locally but are not on the server."""
-        rogue = [local[sn] for sn in local if sn not in expected]
+        expected_serials: Set[int] = set(expected)
+        rogue = [local[sn] for sn in local if sn not in expected_serials]
         return rogue
 
     def syslog_results(self) -> None:
@@ -261,15 +271,53 @@ class EntCertUpdateAction:
 
     def get_certificates_by_serial_list(self, sn_list: List[int]) -> List[Dict]:
         """Fetch a list of entitlement certificates specified by a list of serial numbers."""
-        result: List[Dict] = []
-        if sn_list:
-            sn_list = [str(sn) for sn in sn_list]
-            # NOTE: use injected IDENTITY, need to validate this
-            # handles disconnected errors properly
-            reply: List[Dict] = self.uep.getCertificates(self.identity.uuid, serials=sn_list)
-            for cert in reply:
-                result.append(cert)
-        return result
+        return list(self.iter_certificates_by_serial_list(sn_list))
+
+    def iter_certificates_by_serial_list(self, sn_list: List[int]) -> Iterator[Dict]:
+        """
+        Yield entitlement certificate bundles specified by a list of serial numbers.
+
+        The serial numbers are requested in chunks of SERIALS_CHUNK_SIZE, so the query string
+        stays short even when all certificates were regenerated. When there is more than one
+        chunk, then the chunks are requested concurrently by SERIALS_CHUNK_WORKERS threads,
+        each using its own connection from the pool. Each thread reads the whole response of
+        its chunk before it requests the next one, so there are never more open connections
+        than threads. The bundles are yielded in the order of chunks.
+        """
+        chunks: List[List[str]] = [
+            [str(sn) for sn in sn_list[i : i + SERIALS_CHUNK_SIZE]]
+            for i in range(0, len(sn_list), SERIALS_CHUNK_SIZE)
+        ]
+        if not chunks:
+            return
+        # NOTE: use injected IDENTITY, need to validate this
+        # handles disconnected errors properly
+        uuid: str = self.identity.uuid
+        if len(chunks) == 1:
+            yield from self.uep.getCertificates(uuid, serials=chunks[0], stream=True)
+            return
+
+        futures: Dict[int, Future] = self.uep.gather_async(
+            {
+                index: functools.partial(self._get_certificates_chunk, uuid, chunk)
+                for index, chunk in enumerate(chunks)
+            },
+            max_workers=SERIALS_CHUNK_WORKERS,
+        )
+        try:
+            for index in range(len(chunks)):
+                yield from futures[index].result()
+        finally:
+            # Do not request remaining chunks, when the caller stopped reading bundles
+            for future in futures.values():
+                future.cancel()
+
+    def _get_certificates_chunk(self, uuid: str, serials: List[str]) -> List[Dict]:
+        """
+        Read all bundles of one chunk, so the connection is returned to the pool before
+        the next chunk is requested.
+        """
+        return list(self.uep.getCertificates(uuid, serials=serials, stream=True))
 
     def _get_expected_serials(self) -> List[int]:
         exp: List[int] = self.get_certificate_serials_list()
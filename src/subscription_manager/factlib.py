@@ -88,12 +88,26 @@ class FactsActionCommand:
         self.facts_client: Facts = inj.require(inj.FACTS)
 
     def perform(self) -> "FactsActionReport":
+        # The periodic check can use facts of collectors, whose sources did not change
+        previous: bool = self.facts.use_collector_cache
+        self.facts.use_collector_cache = True
+        try:
+            return self._perform()
+        finally:
+            self.facts.use_collector_cache = previous
+
+    def _perform(self) -> "FactsActionReport":
         # figure out the diff between latest facts and
         # report that as updates
 
         if self.facts.has_changed():
-            fact_updates = self.facts.get_facts()
-            self.report.fact_updates = fact_updates
+            # Report names of added, changed and removed facts; all facts are reported,
+            # when there were no facts to compare with
+            facts_diff = self.facts.facts_diff
+            if facts_diff is not None:
+                self.report.fact_updates = facts_diff.keys()
+            else:
+                self.report.fact_updates = list(self.facts.get_facts())
 
             consumer_identity = inj.require(inj.IDENTITY)
             if not consumer_identity.is_valid():
@@ -103,6 +117,7 @@ class FactsActionCommand:
             # is the self.facts.has_changed above redundant?
             self.facts.update_check(self.uep, consumer_identity.uuid)
             log.info("Facts have been updated.")
+            log.debug(f"Updated facts: {', '.join(self.report.fact_updates)}")
         else:
             log.debug("Facts have not changed, skipping upload.")
         return self.report
@@ -12,10 +12,11 @@
 from datetime import datetime
 import logging
 import os
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
 
 from subscription_manager.injection import PLUGIN_MANAGER, require
-from subscription_manager.cache import CacheManager
+from subscription_manager.cache import CacheManager, CollectorFactsCache
+from rhsm import connection
 from rhsm import ourjson as json
 
 from rhsmlib.facts.all import AllFactsCollector
@@ -26,6 +27,63 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+# Capability of the server accepting only changed facts
+FACTS_DELTA_CAPABILITY = "facts_delta"
+
+
+class FactsDiff:
+    """
+    Difference between two sets of facts, e.g. between facts sent to the server
+    the last time and the current facts.
+    """
+
+    def __init__(self, added: Dict, changed: Dict, removed: List[str]) -> None:
+        # Dictionaries of new values of added and changed facts
+        self.added: Dict = added
+        self.changed: Dict = changed
+        # List of names of removed facts
+        self.removed: List[str] = removed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def __str__(self) -> str:
+        return "<FactsDiff: %d added, %d changed, %d removed>" % (
+            len(self.added),
+            len(self.changed),
+            len(self.removed),
+        )
+
+    def keys(self) -> List[str]:
+        """
+        Return sorted list of names of all added, changed and removed facts
+        """
+        return sorted(set(self.added) | set(self.changed) | set(self.removed))
+
+    def is_significant(self, ignored: Iterable[str]) -> bool:
+        """
+        Check if any fact not listed in ignored facts was added, changed or removed
+        """
+        return bool(set(self.keys()) - set(ignored))
+
+
+def diff_facts(old_facts: Dict, new_facts: Dict) -> FactsDiff:
+    """
+    Compute difference between two dictionaries of facts
+    :param old_facts: e.g. facts from the cache
+    :param new_facts: e.g. currently collected facts
+    :return: Difference with added, changed and removed facts
+    """
+    added: Dict = {key: value for key, value in new_facts.items() if key not in old_facts}
+    changed: Dict = {
+        key: value for key, value in new_facts.items() if key in old_facts and old_facts[key] != value
+    }
+    removed: List[str] = sorted(key for key in old_facts if key not in new_facts)
+    return FactsDiff(added, changed, removed)
+
 
 class Facts(CacheManager):
     """
@@ -38,8 +96,19 @@ class Facts(CacheManager):
 
     CACHE_FILE = "/var/lib/rhsm/facts/facts.json"
 
+    # Difference of current facts against the cache computed by has_changed()
+    facts_diff: Optional[FactsDiff] = None
+
+    # Facts of collectors, whose sources did not change, are taken from the cache
+    # only, when this is enabled (by the periodic check of facts). Explicit updates
+    # collect all facts again and they refresh the cache.
+    use_collector_cache: bool = False
+
     def __init__(self):
         self.facts = {}
+        # Facts read from the cache by has_changed(). These are the facts sent to
+        # the server the last time and the difference is computed against them.
+        self._cached_facts: Optional[Dict] = None
 
         # see bz #627962
         # we would like to have this info, but for now, since it
@@ -62,23 +131,31 @@ class Facts(CacheManager):
         return a dict of any key/values that have changed
         including new keys or deleted keys
         """
+        self._cached_facts = None
+        self.facts_diff = None
         if not self._cache_exists():
             log.debug("Cache %s does not exit" % self.CACHE_FILE)
             return True
 
-        cached_facts: Dict = self.read_cache_only() or {}
+        self._cached_facts = self.read_cache_only()
         # In order to accurately check for changes, we must refresh local data
         self.facts = self.get_facts(True)
 
-        for key in (set(self.facts) | set(cached_facts)) - set(self.graylist):
-            if self.facts.get(key) != cached_facts.get(key):
-                return True
-        return False
+        self.facts_diff = diff_facts(self._cached_facts or {}, self.facts)
+        return self.facts_diff.is_significant(self.graylist)
 
     def get_facts(self, refresh: bool = False):
         if len(self.facts) == 0 or refresh:
-            collector = AllFactsCollector()
+            collector_cache = CollectorFactsCache()
+            if self.use_collector_cache:
+                # Collectors, whose sources did not change, return facts from the cache
+                collector_cache.collectors = collector_cache.read_cache_only() or {}
+            else:
+                # All collectors are run and the cache is replaced with their facts
+                collector_cache.collectors = {}
+            collector = AllFactsCollector(cache=collector_cache.collectors)
             facts = collector.get_all()
+            collector_cache.write_cache(debug=False)
             self.plugin_manager.run("post_facts_collection", facts=facts)
             self.facts = facts
         return self.facts
@@ -86,8 +163,35 @@ class Facts(CacheManager):
     def to_dict(self):
         return self.get_facts()
 
+    def _sync_delta_with_server(self, uep: connection.UEPConnection, consumer_uuid: str) -> bool:
+        """
+        Try to send only added, changed and removed facts to the server. It is possible
+        only in the case, when the server supports it and the last facts sent to the server
+        are cached.
+        :return: True, when the delta was sent; False, when all facts have to be sent.
+        """
+        if not self._cached_facts or not uep.has_capability(FACTS_DELTA_CAPABILITY):
+            return False
+        facts: Dict = self.get_facts()
+        delta: FactsDiff = diff_facts(self._cached_facts, facts)
+        # Forced update with no difference sends all facts to fix facts on the server
+        if not delta or len(delta) >= len(facts):
+            return False
+        try:
+            uep.updateConsumerFactsDelta(
+                consumer_uuid, facts={**delta.added, **delta.changed}, removed=delta.removed
+            )
+        except connection.RestlibException as err:
+            # The server could refuse delta, e.g. when its facts are not the cached ones
+            log.warning(f"Unable to update delta of facts, updating all facts: {err}")
+            return False
+        log.debug(f"Delta of facts updated: {', '.join(delta.keys())}")
+        return True
+
     def _sync_with_server(self, uep, consumer_uuid):
         log.debug("Updating facts on server")
+        if self._sync_delta_with_server(uep, consumer_uuid):
+            return
         uep.updateConsumer(consumer_uuid, facts=self.get_facts())
 
     def _load_data(self, open_file):
@@ -294,12 +294,15 @@ def list_pools(
     after_date: Optional[datetime.datetime] = None,
     page: int = 0,
     items_per_page: int = 0,
-):
+) -> Iterable[dict]:
     """
     Wrapper around the UEP call to fetch pools, which forces a facts update
     if anything has changed before making the request. This ensures the
     rule checks server side will have the most up to date info about the
     consumer possible.
+
+    The pools are decoded from the response one by one as they are iterated,
+    so the result can be iterated only once.
     """
 
     # client tells service 'look for facts again'
@@ -335,6 +338,7 @@ def list_pools(
         after_date=after_date,
         page=page,
         items_per_page=items_per_page,
+        stream=True,
     )
 
 
@@ -853,6 +857,7 @@ def clean_all_data(backup: bool = True) -> None:
     # for deleting persistent caches
     cache.ProfileManager.delete_cache()
     cache.InstalledProductsManager.delete_cache()
+    cache.CollectorFactsCache.delete_cache()
     if SyncedStore is not None:
         SyncedStore(None).update_cache({})
     # FIXME: implement as dbus client to facts service DeleteCache() once implemented
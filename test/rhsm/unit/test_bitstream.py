@@ -15,7 +15,7 @@ import os
 import unittest
 import zlib
 
-from rhsm.bitstream import GhettoBitStream
+from rhsm.bitstream import BitReader, GhettoBitStream
 
 DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "entitlement_data.bin")
 entitlement_data = open(DATA, "rb").read()
@@ -72,3 +72,37 @@ class TestGhettoBitStream(unittest.TestCase):
         self.assertEqual(self.bs.combine_bytes([1, 3]), 259)
         self.assertEqual(self.bs.combine_bytes([3]), 3)
         self.assertEqual(self.bs.combine_bytes([1, 1, 3]), 65795)
+
+
+class TestBitReader(unittest.TestCase):
+    def test_pop_byte(self):
+        reader = BitReader(tree_data)
+        self.assertEqual(reader.pop_byte(), 5)
+        self.assertEqual(reader.remaining, (len(tree_data) - 1) * 8)
+
+    def test_same_bits_as_ghetto_bit_stream(self):
+        reader = BitReader(tree_data)
+        bits = "".join(str(reader.read(1)) for x in range(reader.remaining))
+        self.assertEqual(bits, "".join(GhettoBitStream(tree_data)))
+
+    def test_read_across_bytes(self):
+        reader = BitReader(bytes([0b10110011, 0b01011100]))
+        self.assertEqual(reader.read(3), 0b101)
+        self.assertEqual(reader.read(9), 0b100110101)
+        self.assertEqual(reader.remaining, 4)
+
+    def test_peek_does_not_consume(self):
+        reader = BitReader(bytes([0b10110011]))
+        self.assertEqual(reader.peek(4), 0b1011)
+        self.assertEqual(reader.peek(4), 0b1011)
+        self.assertEqual(reader.remaining, 8)
+
+    def test_peek_pads_end_with_zeros(self):
+        reader = BitReader(bytes([0b10110011]))
+        reader.skip(6)
+        self.assertEqual(reader.peek(5), 0b11000)
+
+    def test_read_past_end(self):
+        reader = BitReader(bytes([1]))
+        reader.skip(4)
+        self.assertRaises(IndexError, reader.read, 5)
@@ -13,10 +13,11 @@
 #
 
 from datetime import datetime
+import json
 import unittest
 
 from test.rhsm.unit import certdata
-from rhsm.certificate import create_from_pem, CertificateException
+from rhsm.certificate import create_from_pem, dump_parsed, CertificateException
 from rhsm.certificate2 import (
     Content,
     EntitlementCertificate,
@@ -24,6 +25,7 @@ from rhsm.certificate2 import (
     Product,
     ProductCertificate,
     CertificateLoadingError,
+    _CertFactory,
 )
 
 from unittest.mock import patch
@@ -177,6 +179,36 @@ class V3CertTests(unittest.TestCase):
         self.assertTrue(cert.order is None)
         self.assertEqual(cert.products, [])
 
+    def test_payload_decoded_lazily(self):
+        expected_pool = self.ent_cert.pool
+        with patch(
+            "rhsm.certificate2._CertFactory._decompress_payload",
+            wraps=_CertFactory()._decompress_payload,
+        ) as mock_decompress:
+            cert = create_from_pem(certdata.ENTITLEMENT_CERT_V3_0)
+            self.assertEqual(self.ent_cert.serial, cert.serial)
+            self.assertTrue(cert.is_valid(on_date=datetime(2012, 12, 1)))
+            mock_decompress.assert_not_called()
+            self.assertEqual("Awesome OS for x86_64", cert.order.name)
+            self.assertEqual(4, len(cert.content))
+            self.assertEqual(1, len(cert.products))
+            self.assertEqual(expected_pool, cert.pool)
+            self.assertEqual(1, mock_decompress.call_count)
+
+    def test_lazy_field_assigned(self):
+        cert = create_from_pem(certdata.ENTITLEMENT_CERT_V3_0)
+        cert.content = []
+        self.assertEqual([], cert.content)
+        self.assertEqual("Awesome OS for x86_64", cert.order.name)
+
+    def test_corrupted_payload(self):
+        pem = certdata.ENTITLEMENT_CERT_V3_0.replace(
+            "-----BEGIN ENTITLEMENT DATA-----\n", "-----BEGIN ENTITLEMENT DATA-----\nAAAA"
+        )
+        cert = create_from_pem(pem)
+        self.assertEqual(self.ent_cert.serial, cert.serial)
+        self.assertRaises(CertificateException, getattr, cert, "products")
+
     def test_is_valid(self):
         self.assertTrue(self.ent_cert.is_valid(on_date=datetime(2012, 12, 1)))
         self.assertFalse(self.ent_cert.is_valid(on_date=datetime(2014, 12, 1)))
@@ -452,3 +484,47 @@ class ProductTests(unittest.TestCase):
     def test_brand_name_empty_string(self):
         p = Product(id="pid", name="pname", brand_name="")
         self.assertEqual(p.brand_name, "")
+
+
+class ParsedDataTests(unittest.TestCase):
+    def _round_trip(self, pem):
+        cert = create_from_pem(pem)
+        parsed = json.loads(json.dumps(dump_parsed(cert)))
+        with patch("rhsm.certificate2._CertFactory._decompress_payload") as mock_decompress:
+            cached = create_from_pem(pem, path="/tmp/cert.pem", parsed=parsed)
+            mock_decompress.assert_not_called()
+        self.assertEqual(type(cert), type(cached))
+        self.assertEqual("/tmp/cert.pem", cached.path)
+        self.assertEqual(cert.serial, cached.serial)
+        self.assertEqual(cert.pem, cached.pem)
+        self.assertEqual(cert.start, cached.start)
+        self.assertEqual(cert.end, cached.end)
+        self.assertEqual(type(cert.end.tzinfo), type(cached.end.tzinfo))
+        self.assertEqual([vars(p) for p in cert.products], [vars(p) for p in cached.products])
+        return cert, cached
+
+    def _assert_same_entitlement(self, cert, cached):
+        self.assertEqual(vars(cert.order), vars(cached.order))
+        self.assertEqual([vars(c) for c in cert.content], [vars(c) for c in cached.content])
+        self.assertEqual(cert.pool, cached.pool)
+        self.assertEqual(cert.extensions, cached.extensions)
+
+    def test_v1_product_cert(self):
+        self._round_trip(certdata.PRODUCT_CERT_V1_1)
+
+    def test_v1_entitlement_cert(self):
+        cert, cached = self._round_trip(certdata.ENTITLEMENT_CERT_V1_0)
+        self._assert_same_entitlement(cert, cached)
+
+    def test_v3_entitlement_cert(self):
+        cert, cached = self._round_trip(certdata.ENTITLEMENT_CERT_V3_2_WITH_CONTENT_ARCH)
+        self._assert_same_entitlement(cert, cached)
+        self.assertEqual(cert.provided_paths, cached.provided_paths)
+
+    def test_v3_content_not_dumped(self):
+        # content is decoded from the payload in the PEM when needed
+        parsed = dump_parsed(create_from_pem(certdata.ENTITLEMENT_CERT_V3_0))
+        self.assertNotIn("content", parsed)
+
+    def test_identity_cert(self):
+        self.assertIsNone(dump_parsed(create_from_pem(certdata.IDENTITY_CERT)))
@@ -12,16 +12,24 @@
 # in this software or its documentation.
 #
 import datetime
+import gzip
+import io
 import locale
 import unittest
 import os
 import ssl
 import tempfile
+import threading
+import time
+import zlib
 
 from rhsm import connection
 from rhsm.connection import (
     UEPConnection,
     BaseRestLib,
+    ConnectionPool,
+    ConditionalRequest,
+    SSLContextCache,
     ConnectionException,
     ConnectionSetupException,
     BadCertificateException,
@@ -603,6 +611,28 @@ class ConnectionTests(unittest.TestCase):
         self.cp.hypervisorHeartbeat("owner", options=options)
         self.cp.conn.request_put.assert_not_called()
 
+    def test_gather(self):
+        error = RestlibException(404, "Not found")
+        results = self.cp.gather(
+            {
+                "owner": lambda: {"key": "admin"},
+                "release": lambda: {"releaseVer": "8"},
+                "overrides": Mock(side_effect=error),
+            }
+        )
+        self.assertEqual({"key": "admin"}, results["owner"])
+        self.assertEqual({"releaseVer": "8"}, results["release"])
+        self.assertIs(error, results["overrides"])
+
+    def test_gather_runs_calls_concurrently(self):
+        barrier = threading.Barrier(3, timeout=2)
+        results = self.cp.gather({index: barrier.wait for index in range(3)})
+        # All calls have to run concurrently to pass the barrier
+        self.assertEqual({0, 1, 2}, set(results.values()))
+
+    def test_gather_empty(self):
+        self.assertEqual({}, self.cp.gather({}))
+
     def test_orgs_user_none_org(self):
         self.cp.conn = Mock()
         # observed return value when user has no org
@@ -899,6 +929,526 @@ class BaseRestLibTests(unittest.TestCase):
         self.assertTrue(isinstance(data["phoneNumbers"][0][0]["type"], type("")))
 
 
+class ConnectionPoolTests(unittest.TestCase):
+    """
+    Test case for pool of connections shared by instances of BaseRestLib
+    """
+
+    def setUp(self):
+        self.pool = ConnectionPool(max_size=2)
+
+    @staticmethod
+    def _mock_conn(last_request_time=None, keep_alive_timeout=50, requests_num=0, max_requests_num=None):
+        conn = Mock()
+        conn.last_request_time = last_request_time or time.time()
+        conn.keep_alive_timeout = keep_alive_timeout
+        conn.requests_num = requests_num
+        conn.max_requests_num = max_requests_num
+        return conn
+
+    def test_acquire_empty_pool(self):
+        self.assertIsNone(self.pool.acquire(("host", 443)))
+        self.assertEqual({"hits": 0, "misses": 1, "idle": 0}, self.pool.stats())
+
+    def test_release_and_acquire(self):
+        conn = self._mock_conn()
+        self.pool.release(("host", 443), conn)
+        self.assertIsNone(self.pool.acquire(("other_host", 443)))
+        self.assertIs(conn, self.pool.acquire(("host", 443)))
+        self.assertEqual({"hits": 1, "misses": 1, "idle": 0}, self.pool.stats())
+
+    def test_release_expired_connection(self):
+        conn = self._mock_conn(last_request_time=time.time() - 100)
+        self.pool.release(("host", 443), conn)
+        self.assertEqual(0, len(self.pool))
+        conn.close.assert_called_once()
+
+    def test_release_connection_max_requests(self):
+        conn = self._mock_conn(requests_num=10, max_requests_num=10)
+        self.pool.release(("host", 443), conn)
+        self.assertEqual(0, len(self.pool))
+        conn.close.assert_called_once()
+
+    def test_pool_is_bounded(self):
+        conns = [self._mock_conn() for _ in range(3)]
+        for index, conn in enumerate(conns):
+            self.pool.release(("host", index), conn)
+        self.assertEqual(2, len(self.pool))
+        # The least recently used connection was closed
+        conns[0].close.assert_called_once()
+        self.assertIsNone(self.pool.acquire(("host", 0)))
+
+    def test_reap_idle_connections(self):
+        conn = self._mock_conn()
+        self.pool.release(("host", 443), conn)
+        conn.last_request_time = time.time() - 100
+        self.assertIsNone(self.pool.acquire(("host", 443)))
+        conn.close.assert_called_once()
+
+    def test_discard(self):
+        conn1 = self._mock_conn()
+        conn2 = self._mock_conn()
+        self.pool.release(("host1", 443), conn1)
+        self.pool.release(("host2", 443), conn2)
+        self.pool.discard(lambda key: key[0] == "host1")
+        conn1.close.assert_called_once()
+        conn2.close.assert_not_called()
+        self.pool.discard()
+        conn2.close.assert_called_once()
+        self.assertEqual(0, len(self.pool))
+
+
+class BaseRestLibConnectionPoolTests(unittest.TestCase):
+    """
+    Test case for reusing connections from the pool of connections in BaseRestLib
+    """
+
+    def setUp(self):
+        self.pool_patcher = patch.object(BaseRestLib, "connection_pool", ConnectionPool())
+        self.pool = self.pool_patcher.start()
+        self.addCleanup(self.pool_patcher.stop)
+        # Do not try to perform TCP/TLS handshake during testing
+        self.conn_connect_patcher = patch("http.client.HTTPSConnection.connect")
+        self.conn_connect_patcher.start()
+        self.addCleanup(self.conn_connect_patcher.stop)
+        self.restlib = BaseRestLib("somehost", "123", "somehandler", insecure=True)
+
+    @staticmethod
+    def _fake_sock(conn):
+        conn.sock = Mock()
+
+    def test_connection_reused_from_pool(self):
+        conn = self.restlib._create_connection("cert.pem", "key.pem")
+        self._fake_sock(conn)
+        self.restlib._release_connection()
+        self.assertEqual(1, len(self.pool))
+        # Another instance connecting to the same server with the same cert can reuse connection
+        other_restlib = BaseRestLib("somehost", "123", "somehandler", insecure=True)
+        self.assertIs(conn, other_restlib._create_connection("cert.pem", "key.pem"))
+        self.assertEqual(1, self.pool.hits)
+
+    def test_connection_not_reused_with_different_cert(self):
+        conn = self.restlib._create_connection("cert1.pem", "key1.pem")
+        self._fake_sock(conn)
+        other_conn = self.restlib._create_connection("cert2.pem", "key2.pem")
+        self.assertIsNot(conn, other_conn)
+        # The first connection was returned to the pool
+        self.assertEqual(1, len(self.pool))
+        self._fake_sock(other_conn)
+        self.restlib._release_connection()
+        self.assertIs(conn, self.restlib._create_connection("cert1.pem", "key1.pem"))
+
+    def test_connection_not_reused_with_rewritten_cert(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cert_file = os.path.join(tmp_dir, "cert.pem")
+            key_file = os.path.join(tmp_dir, "key.pem")
+            for path in (cert_file, key_file):
+                with open(path, "w") as f:
+                    f.write("old")
+            with patch.object(self.restlib, "_get_ssl_context", return_value=Mock()):
+                conn = self.restlib._create_connection(cert_file, key_file)
+                self._fake_sock(conn)
+                self.restlib._release_connection()
+                self.assertEqual(1, len(self.pool))
+
+                # Consumer cert and key are rewritten in place (e.g. by register --force)
+                for path in (cert_file, key_file):
+                    with open(path, "w") as f:
+                        f.write("new")
+                    stat = os.stat(path)
+                    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+                other_conn = self.restlib._create_connection(cert_file, key_file)
+            self.assertIsNot(conn, other_conn)
+            self.assertEqual(0, self.pool.hits)
+
+    def test_close_connection_discards_idle_connections(self):
+        conn = self.restlib._create_connection("cert.pem", "key.pem")
+        self._fake_sock(conn)
+        self.restlib._release_connection()
+        self.restlib.close_connection()
+        self.assertEqual(0, len(self.pool))
+
+    @patch("rhsm.connection.REUSE_CONNECTION", False)
+    def test_connection_not_reused_when_forbidden(self):
+        conn = self.restlib._create_connection("cert.pem", "key.pem")
+        self._fake_sock(conn)
+        self.restlib._release_connection()
+        self.assertEqual(0, len(self.pool))
+
+
+class SSLContextCacheTests(unittest.TestCase):
+    """
+    Test case for cache of SSL contexts and TLS sessions
+    """
+
+    def setUp(self):
+        self.cache_patcher = patch.object(BaseRestLib, "ssl_context_cache", SSLContextCache())
+        self.cache = self.cache_patcher.start()
+        self.addCleanup(self.cache_patcher.stop)
+        self.ca_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.ca_dir.cleanup)
+        self.restlib = BaseRestLib("somehost", "123", "somehandler", ca_dir=self.ca_dir.name)
+
+    def test_ssl_context_is_cached(self):
+        with patch.object(self.restlib, "_load_ca_certificates") as load_mock:
+            context = self.restlib._get_ssl_context()
+            self.assertIs(context, self.restlib._get_ssl_context())
+            # Other instance with the same CA certificates uses the same context
+            other_restlib = BaseRestLib("otherhost", "123", "somehandler", ca_dir=self.ca_dir.name)
+            self.assertIs(context, other_restlib._get_ssl_context())
+        load_mock.assert_called_once()
+
+    def test_ssl_context_invalidated_by_new_ca_cert(self):
+        with patch.object(self.restlib, "_load_ca_certificates"):
+            context = self.restlib._get_ssl_context()
+            with open(os.path.join(self.ca_dir.name, "new-ca.pem"), "w") as ca_file:
+                ca_file.write("xxxxxx\n")
+            self.assertIsNot(context, self.restlib._get_ssl_context())
+
+    def test_ssl_context_cache_is_bounded(self):
+        cache = SSLContextCache(max_size=2)
+        contexts = [Mock() for _ in range(3)]
+        for index, context in enumerate(contexts):
+            cache.set_context(("key", index), context)
+        self.assertIsNone(cache.get_context(("key", 0)))
+        self.assertIs(contexts[2], cache.get_context(("key", 2)))
+
+    def test_tls_session_bound_to_context(self):
+        context = Mock()
+        session = Mock()
+        self.cache.set_session(("host", 443), context, session)
+        self.assertIs(session, self.cache.get_session(("host", 443), context))
+        self.assertIsNone(self.cache.get_session(("host", 443), Mock()))
+        self.assertIsNone(self.cache.get_session(("other_host", 443), context))
+
+    def test_session_resuming_context_passes_session(self):
+        context = Mock()
+        session = Mock()
+        sock = Mock()
+        wrapper = connection._SessionResumingContext(context, session)
+        wrapper.wrap_socket(sock, server_hostname="somehost")
+        context.wrap_socket.assert_called_once_with(sock, server_hostname="somehost", session=session)
+        # Other attributes are taken from wrapped context
+        self.assertIs(context.verify_mode, wrapper.verify_mode)
+
+
+class ConditionalRequestTests(unittest.TestCase):
+    """
+    Test case for conditional GET requests using validators of cached response
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache_file = os.path.join(self.tmp_dir.name, "status.json")
+        self.validators_file = os.path.join(self.tmp_dir.name, "status.validators.json")
+        self.restlib = BaseRestLib("somehost", "123", "/candlepin", insecure=True)
+        self.make_request_patcher = patch.object(self.restlib, "_make_request")
+        self.make_request = self.make_request_patcher.start()
+        self.addCleanup(self.make_request_patcher.stop)
+
+    def _mock_response(self, status, content="", headers=None):
+        headers = headers or {}
+        response = Mock()
+        response.getheader = lambda name, default=None: headers.get(name, default)
+        result = {"content": content, "status": status, "headers": headers}
+        self.make_request.return_value = (result, response)
+
+    def _sent_headers(self):
+        return self.make_request.call_args[0][2]
+
+    def _request(self, conditional, method="/status"):
+        with self.restlib.conditional_get(conditional):
+            return self.restlib.request_get(method)
+
+    def test_validators_stored_after_commit(self):
+        conditional = ConditionalRequest(self.cache_file, self.validators_file)
+        self._mock_response(200, '{"status": "valid"}', {"ETag": '"abc"'})
+        self.assertEqual({"status": "valid"}, self._request(conditional))
+        self.assertNotIn("If-None-Match", self._sent_headers())
+        self.assertFalse(os.path.exists(self.validators_file))
+        conditional.commit()
+        with open(self.validators_file) as f:
+            validators = json.load(f)
+        self.assertEqual('"abc"', validators["etag"])
+        self.assertEqual("/candlepin/status", validators["handler"])
+
+    def test_not_modified_response_uses_cache_file(self):
+        with open(self.cache_file, "w") as f:
+            f.write('{"status": "valid"}')
+        with open(self.validators_file, "w") as f:
+            json.dump(
+                {
+                    "handler": "/candlepin/status",
+                    "etag": '"abc"',
+                    "last_modified": "Thu, 01 Dec 2016 21:56:35 GMT",
+                },
+                f,
+            )
+        conditional = ConditionalRequest(self.cache_file, self.validators_file)
+        self._mock_response(304)
+        self.assertEqual({"status": "valid"}, self._request(conditional))
+        self.assertEqual('"abc"', self._sent_headers()["If-None-Match"])
+        self.assertEqual("Thu, 01 Dec 2016 21:56:35 GMT", self._sent_headers()["If-Modified-Since"])
+
+    def test_validators_of_other_request_not_used(self):
+        with open(self.cache_file, "w") as f:
+            f.write('{"status": "valid"}')
+        with open(self.validators_file, "w") as f:
+            json.dump({"handler": "/candlepin/status?on_date=2020", "etag": '"abc"'}, f)
+        conditional = ConditionalRequest(self.cache_file, self.validators_file)
+        self._mock_response(200, '{"status": "invalid"}')
+        self.assertEqual({"status": "invalid"}, self._request(conditional))
+        self.assertNotIn("If-None-Match", self._sent_headers())
+        # Server did not send any validator; old validators are removed
+        conditional.commit()
+        self.assertFalse(os.path.exists(self.validators_file))
+
+    def test_not_modified_response_without_cache_file(self):
+        with open(self.validators_file, "w") as f:
+            json.dump({"handler": "/candlepin/status", "etag": '"abc"'}, f)
+        conditional = ConditionalRequest(self.cache_file, self.validators_file)
+        # Validators are not sent, when the cache file does not exist
+        self.assertEqual({}, conditional.headers("/candlepin/status"))
+        # Server can respond with 304 anyway; the request is sent once again without validators
+        self._mock_response(304)
+        not_modified = self.make_request.return_value
+        self._mock_response(200, '{"status": "valid"}')
+        self.make_request.side_effect = [not_modified, self.make_request.return_value]
+        self.assertEqual({"status": "valid"}, self._request(conditional))
+        self.assertEqual(2, self.make_request.call_count)
+        self.assertFalse(os.path.exists(self.validators_file))
+
+    def test_only_get_requests_are_conditional(self):
+        with open(self.cache_file, "w") as f:
+            f.write('{"status": "valid"}')
+        with open(self.validators_file, "w") as f:
+            json.dump({"handler": "/candlepin/status", "etag": '"abc"'}, f)
+        conditional = ConditionalRequest(self.cache_file, self.validators_file)
+        self._mock_response(200, '{"status": "valid"}')
+        with self.restlib.conditional_get(conditional):
+            self.restlib.request_put("/status", {"status": "valid"})
+        self.assertNotIn("If-None-Match", self._sent_headers())
+
+    def test_interrupted_write_keeps_old_validators(self):
+        with open(self.validators_file, "w") as f:
+            json.dump({"handler": "/candlepin/status", "etag": '"abc"'}, f)
+        conditional = ConditionalRequest(self.cache_file, self.validators_file)
+        self._mock_response(200, '{"status": "valid"}', {"ETag": '"def"'})
+        self._request(conditional)
+        with patch("os.fsync", side_effect=OSError("disk full")):
+            conditional.commit()
+        with open(self.validators_file) as f:
+            self.assertEqual('"abc"', json.load(f)["etag"])
+        self.assertEqual(["status.validators.json"], os.listdir(self.tmp_dir.name))
+
+    def test_storage_used_for_cache_and_validators(self):
+        class MemoryStorage:
+            def __init__(self):
+                self.files = {}
+
+            def exists(self, path):
+                return path in self.files
+
+            def read(self, path):
+                if path not in self.files:
+                    raise FileNotFoundError(path)
+                return self.files[path]
+
+            def write(self, path, content):
+                self.files[path] = content
+
+            def delete(self, path):
+                self.files.pop(path, None)
+
+        storage = MemoryStorage()
+        # Content of cache file waiting for the end of batch is not on the disk yet
+        storage.files[self.cache_file] = '{"status": "valid"}'
+        conditional = ConditionalRequest(self.cache_file, self.validators_file, storage)
+        self._mock_response(200, '{"status": "valid"}', {"ETag": '"abc"'})
+        self._request(conditional)
+        conditional.commit()
+        self.assertFalse(os.path.exists(self.validators_file))
+
+        self._mock_response(304)
+        self.assertEqual({"status": "valid"}, self._request(conditional))
+        self.assertEqual('"abc"', self._sent_headers()["If-None-Match"])
+
+    def test_request_outside_of_context_not_conditional(self):
+        with open(self.cache_file, "w") as f:
+            f.write('{"status": "valid"}')
+        with open(self.validators_file, "w") as f:
+            json.dump({"handler": "/candlepin/status", "etag": '"abc"'}, f)
+        self._mock_response(200, '{"status": "valid"}')
+        self.restlib.request_get("/status")
+        self.assertNotIn("If-None-Match", self._sent_headers())
+
+
+class JSONStreamTests(unittest.TestCase):
+    """
+    Test case for incremental decoding of JSON documents
+    """
+
+    @staticmethod
+    def _chunks(data, size):
+        data = data.encode("utf-8")
+        return [data[i : i + size] for i in range(0, len(data), size)]
+
+    def test_array_items_in_chunks_of_any_size(self):
+        items = [{"id": "pool1", "name": "Pool žluťoučký"}, 123, "text", [1, 2], None, 4.5]
+        data = " [ %s ] \n" % ", ".join(json.dumps(item, ensure_ascii=False) for item in items)
+        for size in range(1, len(data) + 1):
+            self.assertEqual(items, list(connection._JSONStream(self._chunks(data, size)).items()))
+
+    def test_empty_array(self):
+        self.assertEqual([], list(connection._JSONStream([b"[", b" ]"]).items()))
+
+    def test_empty_document(self):
+        self.assertEqual([], list(connection._JSONStream([]).items()))
+
+    def test_not_array(self):
+        data = '{"releaseVer": "8"}'
+        self.assertEqual([{"releaseVer": "8"}], list(connection._JSONStream(self._chunks(data, 3)).items()))
+
+    def test_items_decoded_lazily(self):
+        chunks = iter([b'[{"id": 1},', b' {"id": 2}', b"]"])
+        items = connection._JSONStream(chunks).items()
+        self.assertEqual({"id": 1}, next(items))
+        # The second chunk has not been read yet
+        self.assertEqual(b' {"id": 2}', next(chunks))
+
+    def test_malformed_document(self):
+        with self.assertRaises(ValueError):
+            list(connection._JSONStream([b'[{"id": 1} {"id": 2}]']).items())
+        with self.assertRaises(ValueError):
+            list(connection._JSONStream([b'[{"id": 1}, {"id":']).items())
+
+
+class BaseRestLibStreamTests(unittest.TestCase):
+    """
+    Test case for streamed responses of BaseRestLib
+    """
+
+    def setUp(self):
+        self.pool_patcher = patch.object(BaseRestLib, "connection_pool", ConnectionPool())
+        self.pool = self.pool_patcher.start()
+        self.addCleanup(self.pool_patcher.stop)
+        self.restlib = BaseRestLib("somehost", "123", "/candlepin", insecure=True)
+
+    @staticmethod
+    def _response(data):
+        response = Mock()
+        body = io.BytesIO(data)
+        response.read = body.read
+        response.getheader = lambda name, default=None: default
+        return response
+
+    def test_request_get_stream(self):
+        response = self._response(b'[{"id": "pool1"}, {"id": "pool2"}]')
+        result = {"content": "", "status": 200, "headers": {}}
+        with patch.object(self.restlib, "_make_request", return_value=(result, response)) as make_request:
+            pools = self.restlib.request_get("/pools", stream=True)
+            self.assertTrue(make_request.call_args[0][6])
+            self.assertEqual([{"id": "pool1"}, {"id": "pool2"}], list(pools))
+
+    def test_request_get_stream_no_content(self):
+        result = {"content": "", "status": 204, "headers": {}}
+        with patch.object(self.restlib, "_make_request", return_value=(result, self._response(b""))):
+            self.assertEqual([], list(self.restlib.request_get("/pools", stream=True)))
+
+    def test_connection_returned_to_pool_after_stream(self):
+        conn = Mock()
+        conn.sock = Mock()
+        conn.pool_key = ("somehost", 123)
+        conn.keep_alive_timeout = 100
+        conn.last_request_time = time.time()
+        conn.requests_num = 1
+        conn.max_requests_num = None
+        stream = self.restlib._stream_response(self._response(b"[1, 2] "), conn)
+        self.assertEqual(0, len(self.pool))
+        self.assertEqual([1, 2], list(stream))
+        self.assertEqual(1, len(self.pool))
+
+    def test_connection_closed_after_unfinished_stream(self):
+        conn = Mock()
+        stream = self.restlib._stream_response(self._response(b"[1, 2]"), conn)
+        self.assertEqual(1, next(stream))
+        stream.close()
+        conn.close.assert_called_once()
+        self.assertEqual(0, len(self.pool))
+
+
+class BaseRestLibCompressionTests(unittest.TestCase):
+    """
+    Test case for compression of requests and responses
+    """
+
+    def setUp(self):
+        self.restlib = BaseRestLib("somehost", "123", "/candlepin", insecure=True)
+        self.data = json.dumps([{"id": "pool%d" % i, "name": "Pool"} for i in range(1000)]).encode("utf-8")
+
+    @staticmethod
+    def _response(data, content_encoding=None):
+        response = Mock()
+        response.read = io.BytesIO(data).read
+        headers = {"Content-Encoding": content_encoding} if content_encoding else {}
+        response.getheader = lambda name, default=None: headers.get(name, default)
+        return response
+
+    def test_accept_encoding_header(self):
+        self.assertEqual("gzip, deflate", self.restlib.headers["Accept-Encoding"])
+
+    def test_read_gzip_response(self):
+        response = self._response(gzip.compress(self.data), "gzip")
+        self.assertEqual(self.data, self.restlib._read_response_body(response))
+
+    def test_read_deflate_response(self):
+        response = self._response(zlib.compress(self.data), "deflate")
+        self.assertEqual(self.data, self.restlib._read_response_body(response))
+        # Raw deflate stream without zlib header
+        compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        raw = compressor.compress(self.data) + compressor.flush()
+        response = self._response(raw, "deflate")
+        self.assertEqual(self.data, self.restlib._read_response_body(response))
+
+    def test_read_uncompressed_response(self):
+        self.assertEqual(self.data, self.restlib._read_response_body(self._response(self.data)))
+
+    def test_stream_gzip_response(self):
+        response = self._response(gzip.compress(self.data), "gzip")
+        self.assertEqual(json.loads(self.data), list(self.restlib._stream_response(response, None)))
+
+    def test_request_body_compressed(self):
+        result = {"content": "", "status": 204, "headers": {}}
+        response = self._response(b"")
+        params = json.loads(self.data)
+        with patch.object(self.restlib, "_make_request", return_value=(result, response)) as make_request:
+            self.restlib.request_put("/consumers/123/profiles", params, compress=True)
+        headers, body = make_request.call_args[0][2:4]
+        self.assertEqual("gzip", headers["Content-Encoding"])
+        self.assertEqual(params, json.loads(gzip.decompress(body)))
+
+    def test_small_request_body_not_compressed(self):
+        result = {"content": "", "status": 204, "headers": {}}
+        with patch.object(
+            self.restlib, "_make_request", return_value=(result, self._response(b""))
+        ) as make_request:
+            self.restlib.request_put("/consumers/123", {"releaseVer": "8"}, compress=True)
+        headers, body = make_request.call_args[0][2:4]
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual({"releaseVer": "8"}, json.loads(body))
+
+    def test_profile_compressed_when_server_supports_it(self):
+        cp = UEPConnection(username="dummy", password="dummy", handler="/Test/", insecure=True)
+        cp.conn = Mock()
+        cp.capabilities = [connection.GZIP_REQUEST_CAPABILITY]
+        cp.updateCombinedProfile("123", [])
+        self.assertTrue(cp.conn.request_put.call_args[1]["compress"])
+        cp.capabilities = []
+        cp.updateCombinedProfile("123", [])
+        self.assertFalse(cp.conn.request_put.call_args[1]["compress"])
+
+
 # see #830767 and #842885 for examples of why this is
 # a useful test. Aka, sometimes we forget to make
 # str/repr work and that cases weirdness
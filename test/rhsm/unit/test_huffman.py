@@ -11,9 +11,11 @@
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
 
+import random
 import unittest
 
-from rhsm.huffman import HuffmanNode
+from rhsm.bitstream import BitReader
+from rhsm.huffman import HuffmanDecoder, HuffmanNode
 
 
 class TestHuffmanNode(unittest.TestCase):
@@ -74,3 +76,39 @@ class TestHuffmanNode(unittest.TestCase):
             leaves = [HuffmanNode(weight) for weight in range(1, n)]
             tree = HuffmanNode.build_tree(leaves)
             self.assertEqual(tree.weight, sum(leaf.weight for leaf in leaves))
+
+
+class TestHuffmanDecoder(unittest.TestCase):
+    def _encode(self, leaves, symbols):
+        bits = "".join(leaves[symbol].code for symbol in symbols)
+        bits += "0" * (-len(bits) % 8)
+        return bytes(int(bits[i : i + 8], 2) for i in range(0, len(bits), 8))
+
+    def _check_round_trip(self, count):
+        leaves = [HuffmanNode(weight, weight - 1) for weight in range(1, count + 1)]
+        decoder = HuffmanDecoder(HuffmanNode.build_tree(leaves))
+        symbols = [random.randrange(count) for x in range(500)]
+        reader = BitReader(self._encode(leaves, symbols))
+        self.assertEqual([decoder.decode(reader) for x in symbols], symbols)
+
+    def test_short_codes(self):
+        self._check_round_trip(6)
+
+    def test_codes_longer_than_table(self):
+        # linear weights over so many leaves produce codes of more than
+        # TABLE_BITS bits, which need nested tables
+        self._check_round_trip(2000)
+
+    def test_end_of_stream(self):
+        leaves = [HuffmanNode(weight, weight) for weight in range(1, 6)]
+        decoder = HuffmanDecoder(HuffmanNode.build_tree(leaves))
+        reader = BitReader(b"")
+        self.assertIsNone(decoder.decode(reader))
+
+    def test_single_leaf(self):
+        decoder = HuffmanDecoder(HuffmanNode.build_tree([HuffmanNode(1, "a")]))
+        # Every code of the only leaf has one bit, so the stream ends after 8 codes
+        reader = BitReader(b"\x00")
+        self.assertEqual(["a"] * 8, [decoder.decode(reader) for _ in range(8)])
+        self.assertIsNone(decoder.decode(reader))
+        self.assertIsNone(decoder.decode(BitReader(b"")))
@@ -11,11 +11,11 @@
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
 
-from collections import deque
 import os
 import unittest
+import zlib
 
-from rhsm.bitstream import GhettoBitStream
+from rhsm.bitstream import BitReader
 from rhsm.huffman import HuffmanNode
 from rhsm.pathtree import PathTree, PATH_END
 
@@ -23,32 +23,23 @@ DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "entitlement_dat
 
 
 class TestPathTree(unittest.TestCase):
-    def test_get_leaf_from_dict(self):
-        codes = {"1010": "abc"}
-        bitstream = "10101111110000"
-        ret = PathTree._get_leaf_from_dict(codes, bitstream)
-        self.assertEqual(ret, "abc")
-
     # see v3 entitlement cert format docs for explanation of how node count
     # is represented, which will explain the following tests
 
     def test_get_node_count_small(self):
-        bs = GhettoBitStream([])
-        bs.bytes = deque([6])
+        bs = BitReader(bytes([6]))
         ret = PathTree._get_node_count(bs)
         self.assertEqual(ret, 6)
 
     def test_get_node_count_medium(self):
-        bs = GhettoBitStream([])
         # count bigger than 127, only need 1 byte to represent it
-        bs.bytes = deque([129, 150])
+        bs = BitReader(bytes([129, 150]))
         ret = PathTree._get_node_count(bs)
         self.assertEqual(ret, 150)
 
     def test_get_node_count_big(self):
-        bs = GhettoBitStream([])
         # count bigger than 127, need next 2 bytes to represent it
-        bs.bytes = deque([130, 1, 17])
+        bs = BitReader(bytes([130, 1, 17]))
         ret = PathTree._get_node_count(bs)
         self.assertEqual(ret, 273)
 
@@ -66,12 +57,19 @@ class TestPathTree(unittest.TestCase):
     def test_generate_path_leaves(self):
         data = open(DATA, "rb").read()
         nodes, bits = PathTree._unpack_data(data)
-        ret = PathTree._generate_path_leaves(GhettoBitStream(bits))
+        ret = PathTree._generate_path_leaves(BitReader(bits))
 
         self.assertEqual(len(ret), 4)
         for node in ret:
             self.assertTrue(isinstance(node, HuffmanNode))
 
+    def test_single_word_and_node(self):
+        # Word list with one word and path tree with one node besides the root; the
+        # decoding ends with the end of the bit stream
+        data = zlib.compress(b"content") + bytes([2, 0])
+        tree = PathTree(data)
+        self.assertEqual(["content"], list(tree.path_tree))
+
     def test_generate_path_tree(self):
         data = open(DATA, "rb").read()
         pt = PathTree(data).path_tree
@@ -181,3 +179,41 @@ class TestPathTree(unittest.TestCase):
             self.assertTrue(pt.match_path("/foo/jarjar/binks"))
             self.assertTrue(pt.match_path("/foo/jarjar/bar"))
             self.assertFalse(pt.match_path("/foo/jarjar/notbinks"))
+
+    def test_match_path_prefix(self):
+        data = open(DATA, "rb").read()
+        pt = PathTree(data)
+        self.assertEqual(pt.match_path_prefix("/foo/path/bar/a/b/c"), (True, "/foo/path"))
+        self.assertEqual(pt.match_path_prefix("/foo/path/"), (True, "/foo/path"))
+        self.assertEqual(pt.match_path_prefix("/bar/path"), (False, None))
+        self.assertEqual(pt.match_path_prefix("/foo"), (False, None))
+        self.assertRaises(ValueError, pt.match_path_prefix, "foo/path")
+
+    def test_match_path_prefix_variable(self):
+        tree = {"foo": [{"$releasever": [{"bar": [{PATH_END: None}]}]}]}
+        data = open(DATA, "rb").read()
+        pt = PathTree(data)
+        pt.path_tree = tree
+        self.assertEqual(pt.match_path_prefix("/foo/8/bar/repodata"), (True, "/foo/8/bar"))
+        self.assertEqual(pt.match_path_prefix("/foo/8/listing"), (True, "/foo/8/listing"))
+
+    def test_match_path_after_tree_replaced(self):
+        data = open(DATA, "rb").read()
+        pt = PathTree(data)
+        self.assertTrue(pt.match_path("/foo/path"))
+        pt.path_tree = {"bar": [{PATH_END: None}]}
+        self.assertFalse(pt.match_path("/foo/path"))
+        self.assertTrue(pt.match_path("/bar"))
+
+    def test_match_shared_nodes(self):
+        # nodes can be referenced from more than one parent
+        end = {PATH_END: None}
+        shared = {"os": [end]}
+        tree = {"$releasever": [shared], "7Server": [shared, {"extras": [end]}]}
+        data = open(DATA, "rb").read()
+        pt = PathTree(data)
+        pt.path_tree = tree
+        self.assertTrue(pt.match_path("/7Server/os"))
+        self.assertTrue(pt.match_path("/7Server/extras"))
+        self.assertTrue(pt.match_path("/8/os"))
+        self.assertFalse(pt.match_path("/8/extras"))
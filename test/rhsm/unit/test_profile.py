@@ -10,6 +10,7 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 #
 
+import os
 import tempfile
 import unittest
 from unittest import mock
@@ -17,7 +18,14 @@ from unittest.mock import patch
 
 from cloud_what.providers import aws, azure, gcp
 
-from rhsm.profile import ModulesProfile, EnabledReposProfile
+from rhsm.profile import (
+    ModulesProfile,
+    EnabledReposProfile,
+    Package,
+    RPMProfile,
+    diff_packages,
+    get_profile_fingerprint,
+)
 
 
 class TestModulesProfile(unittest.TestCase):
@@ -225,3 +233,112 @@ class TestEnabledReposProfile(unittest.TestCase):
             self.assertEqual(
                 repo_list[0]["baseurl"], ["http://cdn.foo.com/content/dist/snakes/1.0/x86_64/os"]
             )
+
+
+class TestProfileFingerprint(unittest.TestCase):
+    """
+    Class for testing cheap fingerprint of the sources of profile
+    """
+
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.rpmdb_path = os.path.join(tmp_dir.name, "rpm")
+        os.mkdir(self.rpmdb_path)
+        self.rpmdb_file = os.path.join(self.rpmdb_path, "rpmdb.sqlite")
+        with open(self.rpmdb_file, "w") as f:
+            f.write("packages")
+        self.repo_file = os.path.join(tmp_dir.name, "redhat.repo")
+        with open(self.repo_file, "w") as f:
+            f.write("[repo1]\nenabled = 1\n")
+
+        patchers = [
+            patch("rhsm.profile._get_rpmdb_path", return_value=self.rpmdb_path),
+            patch("rhsm.profile.REPOSITORY_PATH", self.repo_file),
+            patch("rhsm.profile.MODULES_STATE_GLOBS", []),
+            patch.dict("rhsm.profile.PROFILE_MAP", {"rpm": mock.Mock(), "modulemd": mock.Mock()}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_fingerprint_not_changed(self) -> None:
+        self.assertEqual(get_profile_fingerprint(), get_profile_fingerprint())
+
+    def test_fingerprint_changed_by_rpmdb(self) -> None:
+        fingerprint = get_profile_fingerprint()
+        with open(self.rpmdb_file, "a") as f:
+            f.write("new package")
+        self.assertNotEqual(fingerprint, get_profile_fingerprint())
+
+    def test_fingerprint_changed_by_new_rpmdb_file(self) -> None:
+        fingerprint = get_profile_fingerprint()
+        with open(os.path.join(self.rpmdb_path, "rpmdb.sqlite-wal"), "w") as f:
+            f.write("new package")
+        self.assertNotEqual(fingerprint, get_profile_fingerprint())
+
+    def test_fingerprint_changed_by_repo_file(self) -> None:
+        fingerprint = get_profile_fingerprint()
+        with open(self.repo_file, "w") as f:
+            f.write("[repo1]\nenabled = 0\n")
+        self.assertNotEqual(fingerprint, get_profile_fingerprint())
+
+
+class TestPackageDiff(unittest.TestCase):
+    """
+    Class for testing set-based comparison of lists of packages
+    """
+
+    @staticmethod
+    def _package(name, version, arch="x86_64"):
+        return Package(name=name, version=version, release="1", arch=arch, vendor="Red Hat")
+
+    def test_package_hashable(self) -> None:
+        package = self._package("bash", "5.1")
+        self.assertEqual(hash(package), hash(self._package("bash", "5.1")))
+        self.assertEqual(1, len({package, self._package("bash", "5.1")}))
+        self.assertNotEqual(package, self._package("bash", "5.2"))
+        # Vendor is compared after normalization
+        self.assertEqual(package, Package("bash", "5.1", "1", "x86_64", vendor=b"Red Hat"))
+
+    def test_package_from_dict(self) -> None:
+        package = self._package("bash", "5.1")
+        self.assertEqual(package, Package.from_dict(package.to_dict()))
+
+    def test_no_difference(self) -> None:
+        packages = [self._package("bash", "5.1"), self._package("zsh", "5.8")]
+        diff = diff_packages(packages, reversed(packages))
+        self.assertFalse(diff)
+
+    def test_added_removed_changed(self) -> None:
+        old = [self._package("bash", "5.1"), self._package("zsh", "5.8"), self._package("vim", "9.0")]
+        new = [self._package("bash", "5.2"), self._package("vim", "9.0"), self._package("fish", "3.6")]
+        diff = diff_packages(old, new)
+        self.assertTrue(diff)
+        self.assertEqual([self._package("fish", "3.6")], diff.added)
+        self.assertEqual([self._package("zsh", "5.8")], diff.removed)
+        self.assertEqual([(self._package("bash", "5.1"), self._package("bash", "5.2"))], diff.changed)
+
+    def test_multiple_versions_not_paired(self) -> None:
+        old = [self._package("kernel", "5.14"), self._package("kernel", "5.15")]
+        new = [self._package("kernel", "5.16"), self._package("kernel", "5.17")]
+        diff = diff_packages(old, new)
+        self.assertEqual(new, diff.added)
+        self.assertEqual(old, diff.removed)
+        self.assertEqual([], diff.changed)
+
+    def test_other_arch_not_paired(self) -> None:
+        diff = diff_packages([self._package("glibc", "2.34", "i686")], [self._package("glibc", "2.35")])
+        self.assertEqual(1, len(diff.added))
+        self.assertEqual(1, len(diff.removed))
+        self.assertEqual([], diff.changed)
+
+    def test_rpm_profile_equality_ignores_order(self) -> None:
+        packages = [self._package("bash", "5.1"), self._package("zsh", "5.8")]
+        profile = RPMProfile.__new__(RPMProfile)
+        profile.packages = packages
+        other = RPMProfile.__new__(RPMProfile)
+        other.packages = list(reversed(packages))
+        self.assertEqual(profile, other)
+        other.packages = [self._package("bash", "5.1"), self._package("zsh", "5.9")]
+        self.assertNotEqual(profile, other)
@@ -19,6 +19,7 @@ import logging
 import unittest
 from unittest import mock
 
+from rhsmlib.dbus.util import result_cache
 from test.fixture import SubManFixture
 
 log = logging.getLogger(__name__)
@@ -62,6 +63,11 @@ class SubManDBusFixture(SubManFixture):
 
     LOCALE: str = "C.UTF-8"
 
+    def setUp(self) -> None:
+        super().setUp()
+        # Results of D-Bus methods must not be shared by tests
+        result_cache.clear()
+
     @classmethod
     def tearDownClass(cls) -> None:
         # Stop patching
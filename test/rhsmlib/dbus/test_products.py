@@ -12,8 +12,13 @@
 # in this software or its documentation.
 from unittest import mock
 import datetime
+import time
+
+import dbus
 
 from rhsmlib.dbus.objects.products import ProductsDBusImplementation
+from rhsmlib.dbus.util import RESULT_CACHE_TTL, dbus_clears_cached_results, result_cache
+from subscription_manager import i18n
 
 from test.rhsmlib.base import SubManDBusFixture
 
@@ -65,3 +70,66 @@ class TestProductsDBusObject(SubManDBusFixture):
 
         result = self.impl.list_installed_products("", {})
         self.assertEqual(expected, result)
+
+
+class TestProductsDBusResultCache(SubManDBusFixture):
+    def setUp(self) -> None:
+        super().setUp()
+        list_patch = mock.patch("rhsmlib.services.products.InstalledProducts.list", name="list")
+        self.mock_list = list_patch.start()
+        self.mock_list.return_value = [("Product", "69")]
+        self.impl = ProductsDBusImplementation()
+
+    def test_repeated_call_is_cached(self):
+        first = self.impl.list_installed_products("", {})
+        second = self.impl.list_installed_products("", {})
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.mock_list.call_count)
+
+        # Different arguments are not answered from cache
+        self.impl.list_installed_products("Red Hat", {})
+        self.assertEqual(2, self.mock_list.call_count)
+
+    def test_cache_cleared(self):
+        self.impl.list_installed_products("", {})
+
+        # Callback of DirectoryWatch
+        result_cache.clear()
+        self.mock_list.return_value = [("Other product", "70")]
+        self.assertEqual([("Other product", "70")], self.impl.list_installed_products("", {}))
+
+    def test_cache_cleared_by_state_change(self):
+        @dbus_clears_cached_results
+        def change_state(fail):
+            if fail:
+                raise RuntimeError("Partially changed")
+
+        for fail in (False, True):
+            self.impl.list_installed_products("", {})
+            self.mock_list.reset_mock()
+            if fail:
+                self.assertRaises(RuntimeError, change_state, fail)
+            else:
+                change_state(fail)
+            self.impl.list_installed_products("", {})
+            self.assertEqual(1, self.mock_list.call_count)
+
+    def test_cache_expired(self):
+        self.impl.list_installed_products("", {})
+        self.mock_list.return_value = [("Other product", "70")]
+
+        with mock.patch("time.monotonic", return_value=time.monotonic() + RESULT_CACHE_TTL):
+            self.assertEqual([("Other product", "70")], self.impl.list_installed_products("", {}))
+
+    def test_locale_is_part_of_key(self):
+        self.impl.list_installed_products("", {})
+        with mock.patch.object(i18n.LOCALE, "language", "de_DE.UTF-8"):
+            self.impl.list_installed_products("", {})
+        self.assertEqual(2, self.mock_list.call_count)
+
+    def test_error_not_cached(self):
+        self.mock_list.side_effect = RuntimeError("Unable to list products")
+        self.assertRaises(dbus.DBusException, self.impl.list_installed_products, "", {})
+
+        self.mock_list.side_effect = None
+        self.assertEqual([("Product", "69")], self.impl.list_installed_products("", {}))
@@ -0,0 +1,226 @@
+# Copyright (c) 2026 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import unittest
+
+from rhsmlib.facts import all
+from rhsmlib.facts import collector
+
+
+class FirstCollector(collector.FactsCollector):
+    def get_all(self):
+        return {"first.fact": "first", "shared.fact": "first"}
+
+
+class SecondCollector(collector.FactsCollector):
+    def get_all(self):
+        return {"second.fact": "second", "shared.fact": "second"}
+
+
+class DependentCollector(collector.FactsCollector):
+    def get_all(self):
+        return {"dependent.fact": dict(self._collected_hw_info)}
+
+
+class FailingCollector(collector.FactsCollector):
+    def get_all(self):
+        raise RuntimeError("collector failed")
+
+
+class FingerprintCollector(collector.FactsCollector):
+    fingerprint = "first"
+    calls = 0
+
+    def get_fingerprint(self):
+        return self.fingerprint
+
+    def get_all(self):
+        FingerprintCollector.calls += 1
+        return {"fingerprint.fact": FingerprintCollector.calls}
+
+
+class BlockingCollector(collector.FactsCollector):
+    released = threading.Event()
+
+    def get_all(self):
+        self.released.wait(5.0)
+        return {"blocking.fact": "blocking"}
+
+
+class BlockingFingerprintCollector(BlockingCollector):
+    def get_fingerprint(self):
+        return "blocking"
+
+
+class TestAllFactsCollector(unittest.TestCase):
+    def setUp(self):
+        self.all_collector = all.AllFactsCollector()
+        BlockingCollector.released.clear()
+        self.addCleanup(BlockingCollector.released.set)
+
+    def test_default_dependencies_are_collectors(self):
+        for fact_collector_cls, dependencies in self.all_collector.dependencies.items():
+            self.assertIn(fact_collector_cls, self.all_collector.collectors)
+            for dependency in dependencies:
+                index = self.all_collector.collectors.index(dependency)
+                self.assertLess(index, self.all_collector.collectors.index(fact_collector_cls))
+
+    def test_results_merged_in_order_of_collectors(self):
+        self.all_collector.collectors = [SecondCollector, FirstCollector]
+        self.all_collector.dependencies = {}
+        facts = self.all_collector.get_all()
+        self.assertEqual(facts["first.fact"], "first")
+        self.assertEqual(facts["second.fact"], "second")
+        self.assertEqual(facts["shared.fact"], "first")
+
+    def test_dependent_collector_gets_facts_of_dependencies(self):
+        self.all_collector.collectors = [FirstCollector, SecondCollector, DependentCollector]
+        self.all_collector.dependencies = {DependentCollector: [SecondCollector]}
+        facts = self.all_collector.get_all()
+        self.assertEqual(facts["dependent.fact"], {"second.fact": "second", "shared.fact": "second"})
+
+    def test_independent_collector_gets_no_facts(self):
+        self.all_collector.collectors = [FirstCollector, DependentCollector]
+        self.all_collector.dependencies = {}
+        facts = self.all_collector.get_all()
+        self.assertEqual(facts["dependent.fact"], {})
+
+    def test_collectors_run_concurrently(self):
+        # The first collector would block the whole timeout, when collectors run sequentially
+        class ReleasingCollector(collector.FactsCollector):
+            def get_all(self):
+                BlockingCollector.released.set()
+                return {"releasing.fact": "releasing"}
+
+        self.all_collector.collectors = [BlockingCollector, ReleasingCollector]
+        self.all_collector.dependencies = {}
+        self.all_collector.timeouts = {BlockingCollector: 2.0}
+        facts = self.all_collector.get_all()
+        self.assertEqual(facts["blocking.fact"], "blocking")
+        self.assertEqual(facts["releasing.fact"], "releasing")
+
+    def test_timed_out_collector_is_skipped(self):
+        self.all_collector.collectors = [FirstCollector, BlockingCollector, DependentCollector]
+        self.all_collector.dependencies = {DependentCollector: [FirstCollector, BlockingCollector]}
+        self.all_collector.timeouts = {BlockingCollector: 0.1}
+        with self.assertLogs(all.log, level="WARNING"):
+            facts = self.all_collector.get_all()
+        self.assertNotIn("blocking.fact", facts)
+        self.assertEqual(facts["first.fact"], "first")
+        self.assertEqual(facts["dependent.fact"], {"first.fact": "first", "shared.fact": "first"})
+
+    def test_timed_out_collector_does_not_block_exit(self):
+        script = textwrap.dedent(
+            """
+            import time
+            from rhsmlib.facts import all, collector
+
+            class SleepingCollector(collector.FactsCollector):
+                def get_all(self):
+                    time.sleep(10)
+                    return {}
+
+            all_collector = all.AllFactsCollector()
+            all_collector.collectors = [SleepingCollector]
+            all_collector.timeouts = {SleepingCollector: 0.1}
+            all_collector.get_all()
+            """
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        start = time.monotonic()
+        subprocess.run([sys.executable, "-c", script], env=env, check=True, stderr=subprocess.DEVNULL)
+        self.assertLess(time.monotonic() - start, 5.0)
+
+    def test_failing_collector_raises_exception(self):
+        self.all_collector.collectors = [FirstCollector, FailingCollector]
+        self.all_collector.dependencies = {}
+        self.assertRaises(RuntimeError, self.all_collector.get_all)
+
+    def test_circular_dependencies(self):
+        self.all_collector.collectors = [FirstCollector, SecondCollector]
+        self.all_collector.dependencies = {
+            FirstCollector: [SecondCollector],
+            SecondCollector: [FirstCollector],
+        }
+        self.assertRaises(ValueError, self.all_collector.get_all)
+
+
+class TestAllFactsCollectorCache(unittest.TestCase):
+    def setUp(self):
+        FingerprintCollector.fingerprint = "first"
+        FingerprintCollector.calls = 0
+        self.cache = {}
+
+    def _get_all(self, collectors, dependencies=None):
+        all_collector = all.AllFactsCollector(cache=self.cache)
+        all_collector.collectors = collectors
+        all_collector.dependencies = dependencies or {}
+        return all_collector.get_all()
+
+    def test_cached_facts_used_when_fingerprint_not_changed(self):
+        self.assertEqual(self._get_all([FingerprintCollector])["fingerprint.fact"], 1)
+        self.assertIn("FingerprintCollector", self.cache)
+        self.assertEqual(self._get_all([FingerprintCollector])["fingerprint.fact"], 1)
+        self.assertEqual(FingerprintCollector.calls, 1)
+
+    def test_facts_collected_when_fingerprint_changed(self):
+        self._get_all([FingerprintCollector])
+        FingerprintCollector.fingerprint = "second"
+        self.assertEqual(self._get_all([FingerprintCollector])["fingerprint.fact"], 2)
+
+    def test_facts_collected_when_facts_of_dependencies_changed(self):
+        dependencies = {FingerprintCollector: [FirstCollector]}
+        self._get_all([FirstCollector, FingerprintCollector], dependencies)
+        facts = self._get_all(
+            [SecondCollector, FingerprintCollector], {FingerprintCollector: [SecondCollector]}
+        )
+        self.assertEqual(facts["fingerprint.fact"], 2)
+
+    def test_facts_collected_when_cache_expired(self):
+        self._get_all([FingerprintCollector])
+        self.cache["FingerprintCollector"]["timestamp"] -= all.AllFactsCollector.CACHE_MAX_AGE
+        self.assertEqual(self._get_all([FingerprintCollector])["fingerprint.fact"], 2)
+
+    def test_collector_without_fingerprint_not_cached(self):
+        self._get_all([FirstCollector])
+        self.assertEqual(self.cache, {})
+
+    def test_timed_out_collector_not_cached(self):
+        BlockingCollector.released.clear()
+        self.addCleanup(BlockingCollector.released.set)
+        all_collector = all.AllFactsCollector(cache=self.cache)
+        all_collector.collectors = [BlockingFingerprintCollector]
+        all_collector.timeouts = {BlockingFingerprintCollector: 0.1}
+        with self.assertLogs(all.log, level="WARNING"):
+            all_collector.get_all()
+
+        # Collector finishes in its thread after it timed out
+        BlockingCollector.released.set()
+        for thread in threading.enumerate():
+            if thread.name == "FactsCollector-BlockingFingerprintCollector":
+                thread.join(5.0)
+        self.assertEqual(self.cache, {})
+
+    def test_facts_not_cached_without_cache(self):
+        all_collector = all.AllFactsCollector()
+        all_collector.collectors = [FingerprintCollector]
+        all_collector.dependencies = {}
+        all_collector.get_all()
+        all_collector.get_all()
+        self.assertEqual(FingerprintCollector.calls, 2)
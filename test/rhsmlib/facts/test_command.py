@@ -0,0 +1,146 @@
+# Copyright (c) 2026 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import os
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from rhsmlib.facts import command
+from rhsmlib.facts import network
+
+
+class TestCommandExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = command.CommandExecutor()
+        self.addCleanup(self.executor.shutdown)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.calls_file = os.path.join(self.tmp_dir.name, "calls")
+
+        probe_cache_patch = patch.object(command.CommandExecutor, "probe_cache", {})
+        probe_cache_patch.start()
+        self.addCleanup(probe_cache_patch.stop)
+
+    def _create_command(self, output: str, exit_code: int = 0) -> str:
+        """
+        Create executable script counting its calls
+        """
+        path = os.path.join(self.tmp_dir.name, "command")
+        with open(path, "w") as fd:
+            fd.write(f"#!/bin/sh\necho call >> {self.calls_file}\necho '{output}'\nexit {exit_code}\n")
+        os.chmod(path, 0o755)
+        return path
+
+    def _count_calls(self) -> int:
+        try:
+            with open(self.calls_file) as fd:
+                return len(fd.readlines())
+        except FileNotFoundError:
+            return 0
+
+    def test_check_output_memoized(self):
+        path = self._create_command("output")
+        self.assertEqual(self.executor.check_output([path, "arg"]), b"output\n")
+        self.assertEqual(self.executor.check_output([path, "arg"]), b"output\n")
+        self.assertEqual(self._count_calls(), 1)
+
+    def test_check_output_memoized_by_arguments_and_environment(self):
+        path = self._create_command("output")
+        self.executor.check_output([path, "arg"])
+        self.executor.check_output([path, "other"])
+        self.executor.check_output([path, "arg"], env={"LANGUAGE": "en_US.UTF-8"})
+        self.assertEqual(self._count_calls(), 3)
+
+    def test_check_output_exception_memoized(self):
+        path = self._create_command("error", exit_code=1)
+        self.assertRaises(subprocess.CalledProcessError, self.executor.check_output, path)
+        self.assertRaises(subprocess.CalledProcessError, self.executor.check_output, path)
+        self.assertEqual(self._count_calls(), 1)
+
+    def test_run_memoized(self):
+        path = self._create_command("output", exit_code=2)
+        result = self.executor.run([path])
+        self.assertEqual(result.returncode, 2)
+        self.assertEqual(result.stdout, b"output\n")
+        self.assertIs(self.executor.run([path]), result)
+        self.assertEqual(self._count_calls(), 1)
+
+    def test_started_command_not_run_again(self):
+        path = self._create_command("output")
+        self.executor.start([path])
+        self.assertEqual(self.executor.check_output([path]), b"output\n")
+        self.assertEqual(self._count_calls(), 1)
+
+    def test_command_killed_at_deadline(self):
+        start = time.monotonic()
+        with command.deadline_scope(start + 0.2):
+            self.assertRaises(subprocess.TimeoutExpired, self.executor.check_output, ["sleep", "5"])
+        self.assertLess(time.monotonic() - start, 2.0)
+
+    def test_started_command_has_deadline_of_caller(self):
+        start = time.monotonic()
+        with command.deadline_scope(start + 0.2):
+            self.executor.start(["sleep", "5"])
+        self.assertRaises(subprocess.TimeoutExpired, self.executor.check_output, ["sleep", "5"])
+        self.assertLess(time.monotonic() - start, 2.0)
+
+    def test_timeout_not_memoized(self):
+        path = os.path.join(self.tmp_dir.name, "slow")
+        with open(path, "w") as fd:
+            fd.write(f"#!/bin/sh\necho call >> {self.calls_file}\nsleep 0.5\necho output\n")
+        os.chmod(path, 0o755)
+        with command.deadline_scope(time.monotonic() + 0.1):
+            self.assertRaises(subprocess.TimeoutExpired, self.executor.check_output, [path])
+        # Another collector with its own deadline runs the command again
+        self.assertEqual(self.executor.check_output([path]), b"output\n")
+        self.assertEqual(self._count_calls(), 2)
+
+    @patch("subprocess.check_output")
+    def test_base_exception_not_memoized(self, mock_check_output):
+        mock_check_output.side_effect = [KeyboardInterrupt(), b"output\n"]
+        self.assertRaises(KeyboardInterrupt, self.executor.check_output, ["command"])
+        self.assertEqual(self.executor.check_output(["command"]), b"output\n")
+
+    def test_supports_option_cached_across_executors(self):
+        path = self._create_command("usage: command [--json]")
+        self.assertTrue(self.executor.supports_option(path, "--json"))
+        self.assertFalse(self.executor.supports_option(path, "--xml"))
+        self.assertTrue(command.CommandExecutor().supports_option(path, "--json"))
+        self.assertEqual(self._count_calls(), 1)
+
+    def test_supports_option_invalidated_by_changed_executable(self):
+        path = self._create_command("usage: command [--json]")
+        self.assertTrue(self.executor.supports_option(path, "--json"))
+        self._create_command("usage: command")
+        self.assertFalse(command.CommandExecutor().supports_option(path, "--json"))
+
+
+class TestCommandScope(unittest.TestCase):
+    def test_executor_shared_in_scope(self):
+        with command.command_scope() as executor:
+            self.assertIs(command.get_executor(), executor)
+            with command.command_scope() as nested_executor:
+                self.assertIs(nested_executor, executor)
+
+    def test_executor_not_shared_out_of_scope(self):
+        self.assertIsNot(command.get_executor(), command.get_executor())
+
+    @patch("rhsmlib.facts.netlink.query_addresses", side_effect=OSError)
+    @patch("subprocess.run")
+    def test_network_collector_runs_ip_once(self, mock_run, mock_query):
+        mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout=b"[]", stderr=b"")
+        network.NetworkCollector().get_all()
+        self.assertEqual(mock_run.call_count, 1)
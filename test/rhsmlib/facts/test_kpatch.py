@@ -55,3 +55,18 @@ class TestKPatchCollector(unittest.TestCase):
             installed_kpatches,
             ["3.10.0-1062.1.1.el7.x86_64", "3.10.0-1062.1.2.el7.x86_64", "3.10.0-1062.el7.x86_64"],
         )
+
+    @patch("shutil.which")
+    def test_fingerprint_changed_by_loaded_kpatch(self, which):
+        which.return_value = "/usr/sbin/kpatch"
+        collector = kpatch.KPatchCollector()
+        collector.DIR_WITH_INSTALLED_KPATCH_MODULES = self.DIR_WITH_INSTALLED_KPATCH_MODULES
+        collector.DIRS_WITH_LOADED_MODULE = self.DIRS_WITH_LOADED_MODULE
+        fingerprint = collector.get_fingerprint()
+        self.assertEqual(fingerprint, collector.get_fingerprint())
+
+        # mtime of directory is kept, like in sysfs
+        stat_result = os.stat(self.DIRS_WITH_LOADED_MODULE[1])
+        os.mkdir(os.path.join(self.DIRS_WITH_LOADED_MODULE[1], "3.10.0-1062.1.1.el7.x86_64"))
+        os.utime(self.DIRS_WITH_LOADED_MODULE[1], ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        self.assertNotEqual(fingerprint, collector.get_fingerprint())
@@ -0,0 +1,92 @@
+# Copyright (c) 2026 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import json
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from rhsmlib.facts import hwprobe
+from rhsmlib.facts import lscpu
+
+DATA_DIR = pathlib.Path(__file__).absolute().parent / "lscpu_data"
+
+"""Recorded trees of /sys/devices/system and /proc/cpuinfo with output of
+'lscpu -s <tree> --json' (util-linux 2.38).
+
+- kvm_guest.json: KVM guest with one CPU.
+- two_sockets_numa.json: Two sockets, two cores per socket, two threads per core,
+    one CPU offline, two NUMA nodes.
+- offline_threads.json: One socket, three cores, two threads per core, two threads offline.
+"""
+TREES = ["kvm_guest.json", "two_sockets_numa.json", "offline_threads.json"]
+
+
+class TestNativeLscpuParity(unittest.TestCase):
+    def _create_tree(self, name: str) -> dict:
+        with (DATA_DIR / name).open("r") as handle:
+            data = json.load(handle)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        for path, content in data["files"].items():
+            full_path = os.path.join(tmp_dir.name, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w") as handle:
+                handle.write(content)
+        data["prefix"] = tmp_dir.name
+        return data
+
+    def _lscpu_facts(self, data: dict) -> dict:
+        """Facts parsed from recorded output of lscpu command"""
+        collector = hwprobe.HardwareCollector(arch=data["arch"], prefix=data["prefix"], testing=True)
+        with patch("subprocess.check_output", return_value=json.dumps(data["lscpu"]).encode("utf-8")):
+            return collector._parse_lscpu_json_output({})
+
+    def test_parity_with_lscpu(self):
+        for name in TREES:
+            with self.subTest(tree=name):
+                data = self._create_tree(name)
+                native_facts = lscpu.NativeLscpu(data["arch"], prefix=data["prefix"]).get_info()
+                self.assertEqual(self._lscpu_facts(data), native_facts)
+
+    @patch("os.access", return_value=False)
+    def test_hardware_collector_without_lscpu(self, mock_access):
+        data = self._create_tree("two_sockets_numa.json")
+        collector = hwprobe.HardwareCollector(arch=data["arch"], prefix=data["prefix"], testing=True)
+        facts = collector.get_ls_cpu_info()
+        self.assertEqual(facts["lscpu.socket(s)"], "2")
+        self.assertEqual(facts["lscpu.off-line_cpu(s)_list"], "6")
+        self.assertEqual(facts, self._lscpu_facts(data))
+
+    def test_missing_tree(self):
+        with tempfile.TemporaryDirectory() as prefix:
+            facts = lscpu.NativeLscpu("x86_64", prefix=prefix).get_info()
+        self.assertEqual(facts["lscpu.architecture"], "x86_64")
+        self.assertNotIn("lscpu.cpu(s)", facts)
+
+
+class TestLscpuFormatting(unittest.TestCase):
+    def test_cpu_list(self):
+        self.assertEqual(lscpu.parse_cpu_list("0-3,8,10-11\n"), {0, 1, 2, 3, 8, 10, 11})
+        self.assertEqual(lscpu.format_cpu_list({0, 1, 2, 3, 8, 10, 11}), "0-3,8,10,11")
+        self.assertEqual(lscpu.parse_cpu_list(""), set())
+
+    def test_size(self):
+        self.assertEqual(lscpu.parse_size("48K"), 48 * 1024)
+        self.assertEqual(lscpu.format_size(48 * 1024), "48 KiB")
+        self.assertEqual(lscpu.format_size(1280 * 1024), "1.3 MiB")
+        self.assertEqual(lscpu.format_size(3840 * 1024), "3.8 MiB")
+        self.assertEqual(lscpu.format_size(2047 * 1024), "2 MiB")
+        self.assertEqual(lscpu.format_size(512), "512 B")
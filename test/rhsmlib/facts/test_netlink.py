@@ -0,0 +1,196 @@
+# Copyright (c) 2026 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import base64
+import copy
+import errno
+import json
+import pathlib
+import socket
+import subprocess
+import unittest
+from unittest.mock import patch
+
+from rhsmlib.facts import netlink
+from rhsmlib.facts import network
+
+DATA_DIR = pathlib.Path(__file__).absolute().parent / "network_data"
+
+"""Captures of 'ip --json a' (see test_network.py) and a recorded netlink dump.
+
+- netlink_container.json: RTM_GETLINK and RTM_GETADDR dumps of a container
+    together with 'ip --json address' captured at the same time.
+"""
+IP_CAPTURES = [
+    "laptop.json",
+    "vm_no_connection.json",
+    "vm_no_connection_ipv4.json",
+    "vm_no_connection_ipv6.json",
+    "vm_bond.json",
+    "vm_team.json",
+    "server_bond.json",
+]
+# server.json is not included, because it contains invalid IPv6 address "fe80:::6972"
+
+SCOPES = {name: scope for scope, name in netlink.ADDRESS_SCOPES.items()}
+
+
+def load_data_file(name: str):
+    with (DATA_DIR / name).open("r") as handle:
+        return json.load(handle)
+
+
+def encode_message(message_type: int, payload: bytes) -> bytes:
+    length = netlink.NLMSG_HEADER.size + len(payload)
+    header = netlink.NLMSG_HEADER.pack(length, message_type, 0x2, 1, 0)
+    return header + payload + b"\0" * (netlink._align(length) - length)
+
+
+def encode_attribute(attribute_type: int, value: bytes) -> bytes:
+    length = netlink.RTATTR.size + len(value)
+    return netlink.RTATTR.pack(length, attribute_type) + value + b"\0" * (netlink._align(length) - length)
+
+
+def encode_dump(data: list) -> tuple:
+    """Encode output of 'ip --json address' to netlink messages the kernel would send"""
+    link_data = b""
+    address_data = b""
+    for interface in data:
+        flags = sum(flag for flag, name in netlink.INTERFACE_FLAGS if name in interface["flags"])
+        if "NO-CARRIER" not in interface["flags"]:
+            flags |= 0x40
+        attributes = encode_attribute(netlink.IFLA_IFNAME, interface["ifname"].encode() + b"\0")
+        if "address" in interface:
+            attributes += encode_attribute(
+                netlink.IFLA_ADDRESS, bytes.fromhex(interface["address"].replace(":", ""))
+            )
+        if "permaddr" in interface:
+            attributes += encode_attribute(
+                netlink.IFLA_PERM_ADDRESS, bytes.fromhex(interface["permaddr"].replace(":", ""))
+            )
+        payload = netlink.IFINFOMSG.pack(socket.AF_UNSPEC, 1, interface["ifindex"], flags, 0) + attributes
+        link_data += encode_message(netlink.RTM_NEWLINK, payload)
+
+        for address in interface["addr_info"]:
+            family = socket.AF_INET if address["family"] == "inet" else socket.AF_INET6
+            attributes = encode_attribute(netlink.IFA_ADDRESS, socket.inet_pton(family, address["local"]))
+            if family == socket.AF_INET:
+                attributes += encode_attribute(netlink.IFA_LOCAL, socket.inet_pton(family, address["local"]))
+            if "broadcast" in address:
+                attributes += encode_attribute(
+                    netlink.IFA_BROADCAST, socket.inet_pton(family, address["broadcast"])
+                )
+            scope = SCOPES[address["scope"]]
+            payload = netlink.IFADDRMSG.pack(family, address["prefixlen"], 0, scope, interface["ifindex"])
+            address_data += encode_message(netlink.RTM_NEWADDR, payload + attributes)
+
+    done = encode_message(netlink.NLMSG_DONE, b"\0\0\0\0")
+    return link_data + done, address_data + done
+
+
+def canonicalize(data: list) -> list:
+    """Some captures were anonymized by hand; kernel always reports canonical addresses"""
+    data = copy.deepcopy(data)
+    for interface in data:
+        for address in interface["addr_info"]:
+            family = socket.AF_INET if address["family"] == "inet" else socket.AF_INET6
+            address["local"] = socket.inet_ntop(family, socket.inet_pton(family, address["local"]))
+    return data
+
+
+def get_facts(data: list) -> dict:
+    with patch.object(network.NetworkCollector, "_query_ip_command", return_value=data):
+        collector = network.NetworkCollector()
+        facts = collector.get_interfaces()
+        facts.update(collector.get_network())
+        return facts
+
+
+class TestNetlinkParity(unittest.TestCase):
+    def setUp(self):
+        self.maxDiff = None
+        # FQDN is not the subject of these tests
+        fqdn_patch = patch.object(network.NetworkCollector, "_get_fqdn", return_value="host.example.com")
+        fqdn_patch.start()
+        self.addCleanup(fqdn_patch.stop)
+
+    def test_parity_with_recorded_dump(self):
+        data = load_data_file("netlink_container.json")
+        links = netlink.parse_links(base64.b64decode(data["links"]))
+        addresses = netlink.parse_addresses(base64.b64decode(data["addresses"]))
+        native = netlink.build_address_data(links, addresses)
+        self.assertEqual(get_facts(data["ip"]), get_facts(native))
+        self.assertEqual([item["ifname"] for item in data["ip"]], [item["ifname"] for item in native])
+
+    def test_parity_with_ip_captures(self):
+        for name in IP_CAPTURES:
+            with self.subTest(capture=name):
+                data = canonicalize(load_data_file(name))
+                link_data, address_data = encode_dump(data)
+                native = netlink.build_address_data(
+                    netlink.parse_links(link_data), netlink.parse_addresses(address_data)
+                )
+                self.assertEqual(get_facts(data), get_facts(native))
+
+
+class TestNetlink(unittest.TestCase):
+    def test_error_message_raises_os_error(self):
+        payload = netlink.NLMSGERR.pack(-errno.EPERM) + b"\0" * 16
+        data = encode_message(netlink.NLMSG_ERROR, payload)
+        self.assertRaises(OSError, netlink.parse_links, data)
+
+    def test_truncated_message(self):
+        link_data, _ = encode_dump(load_data_file("laptop.json"))
+        self.assertRaises(ValueError, netlink.parse_links, link_data[:30])
+
+    def test_no_carrier_flag(self):
+        data = [
+            {
+                "ifindex": 2,
+                "ifname": "eth0",
+                "flags": ["NO-CARRIER", "BROADCAST", "MULTICAST", "UP"],
+                "address": "52:54:00:01:02:03",
+                "addr_info": [],
+            }
+        ]
+        link_data, _ = encode_dump(data)
+        self.assertEqual(netlink.parse_links(link_data)[2]["flags"], data[0]["flags"])
+
+    @patch("rhsmlib.facts.netlink.query_addresses", side_effect=PermissionError(errno.EACCES, "denied"))
+    @patch("subprocess.run")
+    def test_network_collector_falls_back_to_ip_command(self, mock_run, mock_query):
+        mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout=b"[]", stderr=b"")
+        self.assertEqual(network.NetworkCollector()._query_ip_command(), [])
+        mock_run.assert_called_once()
+
+    @patch("rhsmlib.facts.netlink.query_addresses", return_value=[])
+    @patch("subprocess.run")
+    def test_network_collector_does_not_run_ip_command(self, mock_run, mock_query):
+        network.NetworkCollector().get_all()
+        mock_run.assert_not_called()
+
+    @patch("rhsmlib.facts.netlink.query_addresses")
+    def test_fingerprint_uses_netlink(self, mock_query):
+        mock_query.return_value = load_data_file("vm_bond.json")
+        fingerprint = network.NetworkCollector().get_fingerprint()
+        self.assertEqual(load_data_file("vm_bond.json"), fingerprint["interfaces"])
+
+        data = load_data_file("vm_bond.json")
+        data[0]["addr_info"][0]["local"] = "127.0.0.2"
+        mock_query.return_value = data
+        self.assertNotEqual(fingerprint, network.NetworkCollector().get_fingerprint())
+
+    @patch("rhsmlib.facts.netlink.query_addresses", side_effect=OSError)
+    def test_fingerprint_without_netlink(self, mock_query):
+        # Facts cannot be cached, when addresses cannot be read cheaply
+        self.assertIsNone(network.NetworkCollector().get_fingerprint())
@@ -10,6 +10,7 @@
 # Red Hat trademarks are not licensed under GPLv2. No permission is
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
+import shutil
 import subprocess
 import tempfile
 import time
@@ -220,6 +221,85 @@ class TestFilesystemWatcher(fixture.SubManFixture):
         self.assertEqual(mock_notify.call_count, 0)
 
 
+@unittest.skipIf(not file_monitor.is_native_inotify_available(), "i-notify is not available")
+class TestNativeInotifyFilesystemWatcher(fixture.SubManFixture):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.mock_cb = Mock(return_value=None)
+        self.dir_watch = file_monitor.DirectoryWatch(self.tmp_dir, [self.mock_cb])
+        self.fsw = file_monitor.NativeInotifyFilesystemWatcher({"DW": self.dir_watch})
+
+    def _start(self):
+        thread = Thread(target=self.fsw.loop)
+        thread.start()
+        self.addCleanup(thread.join, 5.0)
+        self.addCleanup(self.fsw.stop)
+        # Wait for watches
+        for _ in range(100):
+            if self.fsw._watches:
+                break
+            time.sleep(0.01)
+        return thread
+
+    def test_create_fsw(self):
+        with patch("rhsmlib.file_monitor.is_inotify_config", return_value=True):
+            fsw = file_monitor.create_filesystem_watcher({"DW": self.dir_watch})
+        self.assertIsInstance(fsw, file_monitor.NativeInotifyFilesystemWatcher)
+
+    def test_stop_wakes_up_loop(self):
+        thread = self._start()
+        start = time.monotonic()
+        self.fsw.stop()
+        thread.join(5.0)
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.monotonic() - start, self.fsw.TIMEOUT / 1000.0)
+        self.assertEqual({}, self.fsw._watches)
+
+    def test_burst_of_events_notified_once(self):
+        self._start()
+        for i in range(50):
+            with open(os.path.join(self.tmp_dir, "%d.pem" % i), "w") as f:
+                f.write("cert")
+        for _ in range(100):
+            if self.mock_cb.call_count:
+                break
+            time.sleep(0.05)
+        # Wait for possible other notifications
+        time.sleep(self.fsw.DEBOUNCE_TIMEOUT * 2)
+        self.assertEqual(1, self.mock_cb.call_count)
+
+    def test_temporary_disabled_watch_ignores_events(self):
+        self.dir_watch.temporary_disable()
+        self._start()
+        with open(os.path.join(self.tmp_dir, "cert.pem"), "w") as f:
+            f.write("cert")
+        time.sleep(self.fsw.DEBOUNCE_TIMEOUT * 3)
+        self.mock_cb.assert_not_called()
+
+    def test_parse_events(self):
+        self.fsw._watches = {1: self.tmp_dir}
+        header = file_monitor.NativeInotifyFilesystemWatcher.EVENT_HEADER
+        data = (
+            header.pack(1, self.dir_watch.IN_MODIFY, 0, 16)
+            + b"cert.pem".ljust(16, b"\0")
+            + header.pack(2, self.dir_watch.IN_MODIFY, 0, 0)
+            + header.pack(-1, file_monitor.NativeInotifyFilesystemWatcher.IN_Q_OVERFLOW, 0, 0)
+        )
+        events = list(self.fsw.parse_events(data))
+        self.assertEqual(
+            [
+                file_monitor.InotifyEvent(
+                    self.tmp_dir, os.path.join(self.tmp_dir, "cert.pem"), self.dir_watch.IN_MODIFY
+                ),
+                # Unknown watch descriptor is skipped; overflow means change of all watches
+                file_monitor.InotifyEvent(self.dir_watch.path, self.dir_watch.path, self.dir_watch.mask),
+            ],
+            events,
+        )
+
+
 class TestDirectoryWatch(fixture.SubManFixture):
     def setUp(self):
         super(TestDirectoryWatch, self).setUp()
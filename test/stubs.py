@@ -13,6 +13,7 @@
 #
 
 from collections import defaultdict
+from concurrent.futures import Future
 import datetime
 import io
 from unittest import mock
@@ -496,6 +497,23 @@ class StubUEP:
     def has_capability(self, capability):
         return capability in self._capabilities
 
+    def gather_async(self, calls, max_workers=None):
+        # Calls are done synchronously in tests
+        futures = {}
+        for key, call in calls.items():
+            futures[key] = Future()
+            try:
+                futures[key].set_result(call())
+            except Exception as err:
+                futures[key].set_exception(err)
+        return futures
+
+    def gather(self, calls, max_workers=None):
+        results = {}
+        for key, future in self.gather_async(calls).items():
+            results[key] = future.exception() or future.result()
+        return results
+
     def supports_resource(self, resource):
         return False
 
@@ -570,10 +588,10 @@ class StubUEP:
     def setSyspurposeCompliance(self, status):
         self.syspurpose_compliance_status = status
 
-    def getEntitlementList(self, uuid):
+    def getEntitlementList(self, uuid, request_certs=False, stream=False):
         return [{"id": "ent1"}, {"id": "ent2"}]
 
-    def getPoolsList(self, uuid, listAll, active_on, owner):
+    def getPoolsList(self, uuid, listAll, active_on, owner, stream=False):
         return [{"id": "pool1"}, {"id": "pool2"}]
 
     def getContentOverrides(self, uuid):
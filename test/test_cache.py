@@ -53,6 +53,8 @@ from subscription_manager.cache import (
 from rhsm.profile import Package, RPMProfile, EnabledReposProfile, ModulesProfile
 
 from rhsm.connection import (
+    BaseRestLib,
+    ConditionalRequest,
     UEPConnection,
     RestlibException,
     UnauthorizedException,
@@ -130,6 +132,142 @@ ENABLED_MODULES = [
 ]
 
 
+class TestCacheStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.path = os.path.join(self.tmp_dir, "cache", "data.json")
+        self.storage = cache.CacheStorage()
+
+    def test_write_creates_directory(self):
+        self.storage.write(self.path, '{"a": 1}')
+        with open(self.path) as f:
+            self.assertEqual('{"a": 1}', f.read())
+        self.assertEqual(["data.json"], os.listdir(os.path.dirname(self.path)))
+
+    def test_failed_write_keeps_old_content(self):
+        self.storage.write(self.path, "old")
+        with patch("os.replace", side_effect=OSError("No space left on device")):
+            self.assertRaises(OSError, self.storage.write, self.path, "new")
+        self.assertEqual("old", self.storage.read(self.path))
+        # No temporary file is left behind
+        self.assertEqual(["data.json"], os.listdir(os.path.dirname(self.path)))
+
+    def test_batch_postpones_writes(self):
+        other_path = os.path.join(self.tmp_dir, "other.json")
+        committed = []
+        with self.storage.batch():
+            self.storage.write(self.path, "first")
+            self.storage.write(other_path, "other", on_commit=lambda: committed.append(other_path))
+            self.storage.write(self.path, "second")
+            self.assertFalse(os.path.exists(self.path))
+            self.assertTrue(self.storage.exists(self.path))
+            self.assertEqual("second", self.storage.read(self.path))
+            self.assertEqual([], committed)
+        self.assertEqual([other_path], committed)
+        with open(self.path) as f:
+            self.assertEqual("second", f.read())
+        with open(other_path) as f:
+            self.assertEqual("other", f.read())
+
+    def test_nested_batch_commits_at_the_end(self):
+        with self.storage.batch():
+            with self.storage.batch():
+                self.storage.write(self.path, "data")
+            self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_delete_in_batch(self):
+        self.storage.write(self.path, "data")
+        with self.storage.batch():
+            self.storage.delete(self.path)
+            self.assertFalse(self.storage.exists(self.path))
+            self.assertRaises(OSError, self.storage.read, self.path)
+            self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_generation(self):
+        self.assertIsNone(self.storage.generation(self.path))
+        self.storage.write(self.path, "first")
+        first = self.storage.generation(self.path)
+        self.assertEqual(first, self.storage.generation(self.path))
+        self.storage.write(self.path, "second")
+        self.assertNotEqual(first, self.storage.generation(self.path))
+
+    def test_unchanged_cache_is_not_parsed_again(self):
+        mgr = cache.WrittenOverrideCache()
+        mgr.CACHE_FILE = self.path
+        mgr.storage = self.storage
+        self.storage.write(self.path, json.dumps({"repo": {"enabled": "1"}}))
+
+        with patch.object(mgr, "_load_data", wraps=mgr._load_data) as load_data:
+            self.assertEqual({"repo": {"enabled": "1"}}, mgr.read_cache_only())
+            self.assertEqual({"repo": {"enabled": "1"}}, mgr.read_cache_only())
+            self.assertEqual(1, load_data.call_count)
+
+            mgr.overrides = {"repo": {"enabled": "0"}}
+            mgr.write_cache()
+            self.assertEqual({"repo": {"enabled": "0"}}, mgr.read_cache_only())
+            self.assertEqual(2, load_data.call_count)
+
+
+class TestSQLiteCacheStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.storage = cache.SQLiteCacheStorage(self.tmp_dir)
+        self.path = os.path.join(self.tmp_dir, "status.json")
+
+    def test_caches_are_stored_in_database(self):
+        self.storage.write(self.path, '{"a": 1}')
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(self.storage.exists(self.path))
+        self.assertEqual('{"a": 1}', self.storage.read(self.path))
+        self.assertFalse(self.storage.is_file_backed(self.path))
+
+        # Another process sees the content
+        other = cache.SQLiteCacheStorage(self.tmp_dir)
+        self.assertEqual('{"a": 1}', other.read(self.path))
+
+    def test_existing_file_is_migrated(self):
+        with open(self.path, "w") as f:
+            f.write('{"old": true}')
+        self.assertEqual('{"old": true}', self.storage.read(self.path))
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual('{"old": true}', self.storage.read(self.path))
+
+    def test_delete(self):
+        self.storage.write(self.path, "data")
+        self.storage.delete(self.path)
+        self.assertFalse(self.storage.exists(self.path))
+        self.assertRaises(OSError, self.storage.read, self.path)
+        self.assertIsNone(self.storage.generation(self.path))
+
+    def test_generation_changed_by_other_process(self):
+        self.storage.write(self.path, "first")
+        generation = self.storage.generation(self.path)
+        cache.SQLiteCacheStorage(self.tmp_dir).write(self.path, "second")
+        self.assertNotEqual(generation, self.storage.generation(self.path))
+        self.assertEqual("second", self.storage.read(self.path))
+
+    def test_batch_is_written_in_one_transaction(self):
+        other_path = os.path.join(self.tmp_dir, "other.json")
+        with self.storage.batch():
+            self.storage.write(self.path, "data")
+            self.storage.write(other_path, "other")
+            self.assertIsNone(cache.SQLiteCacheStorage(self.tmp_dir).generation(self.path))
+        reader = cache.SQLiteCacheStorage(self.tmp_dir)
+        self.assertEqual("data", reader.read(self.path))
+        self.assertEqual("other", reader.read(other_path))
+
+    def test_files_outside_directory(self):
+        path = os.path.join(self.tmp_dir, "facts", "facts.json")
+        self.storage.write(path, "facts")
+        self.assertTrue(self.storage.is_file_backed(path))
+        with open(path) as f:
+            self.assertEqual("facts", f.read())
+
+
 class TestCurrentOwnerCache(unittest.TestCase):
     """
     Test case for class CurrentOwnerCache
@@ -391,6 +529,136 @@ class TestProfileManager(SubManFixture):
         uep.updateCombinedProfile.assert_called_with(uuid, FACT_MATCHER)
         self.assertEqual(0, self.profile_mgr.write_cache.call_count)
 
+    def _delta_profiles(self):
+        packages = [
+            Package(name="package%d" % i, version="1.0.0", release=1, arch="x86_64").to_dict()
+            for i in range(10)
+        ]
+        cached_profile = {"rpm": packages, "enabled_repos": [{"repositoryid": "repo1"}], "modulemd": []}
+        updated = dict(packages[0], version="1.0.1")
+        new_package = Package(name="package10", version="1.0.0", release=1, arch="x86_64").to_dict()
+        current_profile = {
+            "rpm": [updated] + packages[2:] + [new_package],
+            "enabled_repos": [{"repositoryid": "repo1"}],
+            "modulemd": [{"name": "duck", "stream": 0}],
+        }
+        return cached_profile, current_profile
+
+    def test_profile_delta(self):
+        cached_profile, current_profile = self._delta_profiles()
+        delta = ProfileManager._profile_delta(cached_profile, current_profile)
+        self.assertEqual(2, len(delta))
+        rpm_delta, module_delta = delta
+        self.assertEqual("rpm", rpm_delta["content_type"])
+        self.assertEqual([current_profile["rpm"][0], current_profile["rpm"][-1]], rpm_delta["added"])
+        self.assertEqual(cached_profile["rpm"][0:2], rpm_delta["removed"])
+        self.assertEqual({"content_type": "modulemd", "profile": current_profile["modulemd"]}, module_delta)
+
+    @patch("subscription_manager.cache.get_supported_resources")
+    def test_update_check_sends_delta(self, mock_get_supported_resources):
+        mock_get_supported_resources.return_value = ["packages"]
+        cached_profile, current_profile = self._delta_profiles()
+        self.profile_mgr.current_profile = current_profile
+        self.profile_mgr._cache_exists = Mock(return_value=True)
+        self.profile_mgr._read_cache = Mock(return_value=cached_profile)
+        self.profile_mgr.write_cache = Mock()
+        uep = StubUEP()
+        uep._capabilities = ["combined_reporting", cache.PROFILE_DELTA_CAPABILITY]
+        uep.updateCombinedProfile = Mock()
+        uep.updateCombinedProfileDelta = Mock()
+
+        self.assertEqual(1, self.profile_mgr.update_check(uep, "FAKEUUID"))
+
+        uep.updateCombinedProfileDelta.assert_called_once_with(
+            "FAKEUUID", ProfileManager._profile_delta(cached_profile, current_profile)
+        )
+        uep.updateCombinedProfile.assert_not_called()
+        self.assertEqual(1, self.profile_mgr.write_cache.call_count)
+
+    @patch("subscription_manager.cache.get_supported_resources")
+    def test_update_check_delta_refused(self, mock_get_supported_resources):
+        mock_get_supported_resources.return_value = ["packages"]
+        cached_profile, current_profile = self._delta_profiles()
+        self.profile_mgr.current_profile = current_profile
+        self.profile_mgr._cache_exists = Mock(return_value=True)
+        self.profile_mgr._read_cache = Mock(return_value=cached_profile)
+        self.profile_mgr.write_cache = Mock()
+        uep = StubUEP()
+        uep._capabilities = ["combined_reporting", cache.PROFILE_DELTA_CAPABILITY]
+        uep.updateCombinedProfile = Mock()
+        uep.updateCombinedProfileDelta = Mock(side_effect=RestlibException(409, "Conflict"))
+
+        self.assertEqual(1, self.profile_mgr.update_check(uep, "FAKEUUID"))
+
+        uep.updateCombinedProfile.assert_called_once()
+        self.assertEqual(1, self.profile_mgr.write_cache.call_count)
+
+    @patch("subscription_manager.cache.get_supported_resources")
+    def test_update_check_delta_not_supported(self, mock_get_supported_resources):
+        mock_get_supported_resources.return_value = ["packages"]
+        cached_profile, current_profile = self._delta_profiles()
+        self.profile_mgr.current_profile = current_profile
+        self.profile_mgr._cache_exists = Mock(return_value=True)
+        self.profile_mgr._read_cache = Mock(return_value=cached_profile)
+        self.profile_mgr.write_cache = Mock()
+        uep = StubUEP()
+        uep._capabilities = ["combined_reporting"]
+        uep.updateCombinedProfile = Mock()
+        uep.updateCombinedProfileDelta = Mock()
+
+        self.profile_mgr.update_check(uep, "FAKEUUID")
+
+        uep.updateCombinedProfileDelta.assert_not_called()
+        uep.updateCombinedProfile.assert_called_once()
+
+    def _fingerprint_profile_mgr(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        profile_mgr = ProfileManager()
+        profile_mgr.CACHE_FILE = os.path.join(tmp_dir, "profile.json")
+        return profile_mgr
+
+    @patch("subscription_manager.cache.get_profile")
+    @patch("subscription_manager.cache.get_profile_fingerprint", return_value="abc")
+    def test_has_changed_fingerprint_not_changed(self, mock_fingerprint, mock_get_profile):
+        mock_get_profile.return_value.collect.return_value = []
+        profile_mgr = self._fingerprint_profile_mgr()
+        self.assertTrue(profile_mgr.has_changed())
+        profile_mgr.write_cache()
+        self.assertTrue(os.path.exists(profile_mgr.fingerprint_file))
+        mock_get_profile.reset_mock()
+
+        # Profile is not collected at all, when the fingerprint is the same
+        cache_file = profile_mgr.CACHE_FILE
+        profile_mgr = ProfileManager()
+        profile_mgr.CACHE_FILE = cache_file
+        self.assertFalse(profile_mgr.has_changed())
+        mock_get_profile.assert_not_called()
+
+    @patch("subscription_manager.cache.get_profile")
+    @patch("subscription_manager.cache.get_profile_fingerprint", return_value="abc")
+    def test_has_changed_fingerprint_changed(self, mock_fingerprint, mock_get_profile):
+        mock_get_profile.return_value.collect.return_value = []
+        profile_mgr = self._fingerprint_profile_mgr()
+        profile_mgr.has_changed()
+        profile_mgr.write_cache()
+
+        mock_fingerprint.return_value = "def"
+        cache_file = profile_mgr.CACHE_FILE
+        profile_mgr = ProfileManager()
+        profile_mgr.CACHE_FILE = cache_file
+        # The profile is collected and compared with the cache
+        self.assertFalse(profile_mgr.has_changed())
+        mock_get_profile.assert_called()
+
+    def test_fingerprint_removed_with_profile_set_from_outside(self):
+        profile_mgr = self._fingerprint_profile_mgr()
+        with open(profile_mgr.fingerprint_file, "w") as f:
+            json.dump({"fingerprint": "abc"}, f)
+        profile_mgr.current_profile = {"rpm": [], "enabled_repos": [], "modulemd": []}
+        profile_mgr.write_cache()
+        self.assertFalse(os.path.exists(profile_mgr.fingerprint_file))
+
     def test_has_changed_no_cache(self):
         self.profile_mgr._cache_exists = Mock(return_value=False)
         self.assertTrue(self.profile_mgr.has_changed())
@@ -413,6 +681,20 @@ class TestProfileManager(SubManFixture):
         self.assertFalse(self.profile_mgr.has_changed())
         self.profile_mgr._read_cache.assert_called_with()
 
+    def test_has_changed_ignores_order_of_packages(self):
+        packages = [
+            Package(name="package1", version="1.0.0", release=1, arch="x86_64").to_dict(),
+            Package(name="package2", version="2.0.0", release=2, arch="x86_64").to_dict(),
+        ]
+        cached_profile = {"rpm": packages, "enabled_repos": [], "modulemd": []}
+        self.profile_mgr.current_profile = {"rpm": packages[::-1], "enabled_repos": [], "modulemd": []}
+        self.profile_mgr._cache_exists = Mock(return_value=True)
+        self.profile_mgr._read_cache = Mock(return_value=cached_profile)
+        self.assertFalse(self.profile_mgr.has_changed())
+
+        self.profile_mgr.current_profile = {"rpm": packages[:1], "enabled_repos": [], "modulemd": []}
+        self.assertTrue(self.profile_mgr.has_changed())
+
     def test_has_changed(self):
         cached_pkgs = [
             Package(name="package1", version="1.0.0", release=1, arch="x86_64"),
@@ -919,6 +1201,89 @@ class TestEntitlementStatusCache(SubManFixture):
         uep.getCompliance = Mock(side_effect=UnauthorizedException(401, "GET"))
         self.assertEqual(None, self.status_cache.load_status(uep, "aaa"))
 
+    def test_load_prefetched_status(self):
+        uep = StubUEP()
+        dummy_status = {"a": "1"}
+        uep.getCompliance = Mock(return_value=dummy_status)
+        cache.prefetch_status(uep, "SOMEUUID", [self.status_cache])
+
+        self.assertEqual(dummy_status, self.status_cache.load_status(uep, "SOMEUUID"))
+        self.assertEqual(1, uep.getCompliance.call_count)
+        self.assertEqual(1, self.status_cache.write_cache.call_count)
+        # The prefetched status is used only once
+        self.status_cache.load_status(uep, "SOMEUUID")
+        self.assertEqual(2, uep.getCompliance.call_count)
+
+    def test_prefetched_status_different_arguments(self):
+        uep = StubUEP()
+        uep.getCompliance = Mock(return_value={"a": "1"})
+        cache.prefetch_status(uep, "SOMEUUID", [self.status_cache])
+
+        self.status_cache.load_status(uep, "SOMEUUID", on_date="2199-12-25")
+        self.assertEqual(2, uep.getCompliance.call_count)
+
+    def test_prefetched_status_network_error(self):
+        dummy_status = {"a": "1"}
+        uep = StubUEP()
+        uep.getCompliance = Mock(side_effect=socket.error("boom"))
+        self.status_cache._cache_exists = Mock(return_value=True)
+        self.status_cache._read_cache = Mock(return_value=dummy_status)
+        cache.prefetch_status(uep, "SOMEUUID", [self.status_cache])
+
+        self.assertEqual(dummy_status, self.status_cache.load_status(uep, "SOMEUUID"))
+        self.assertEqual(1, uep.getCompliance.call_count)
+
+    def test_load_status_with_conditional_request(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.status_cache.CACHE_FILE = os.path.join(tmp_dir, "entitlement_status.json")
+        uep = Mock()
+        uep.conn = BaseRestLib("somehost", "123", "/candlepin", insecure=True)
+        conditionals = []
+
+        def get_compliance(uuid, on_date=None):
+            conditionals.append(uep.conn._thread_state.conditional)
+            return {"a": "1"}
+
+        uep.getCompliance = Mock(side_effect=get_compliance)
+        self.status_cache.load_status(uep, "SOMEUUID")
+
+        self.assertIsInstance(conditionals[0], ConditionalRequest)
+        self.assertEqual(self.status_cache.CACHE_FILE, conditionals[0].cache_file)
+        self.assertEqual(
+            os.path.join(tmp_dir, "entitlement_status.validators.json"), conditionals[0].validators_file
+        )
+        # The request is not conditional outside of load_status()
+        self.assertIsNone(uep.conn._thread_state.conditional)
+        self.assertIs(conditionals[0], self.status_cache._conditional)
+        self.assertIs(self.status_cache.storage, conditionals[0].storage)
+
+    def test_validators_written_after_cache(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.status_cache.CACHE_FILE = os.path.join(tmp_dir, "entitlement_status.json")
+        self.status_cache.server_status = {"a": "1"}
+        conditional = Mock()
+        conditional.commit = Mock(
+            side_effect=lambda: self.assertTrue(os.path.exists(self.status_cache.CACHE_FILE))
+        )
+        self.status_cache._write_cache_and_validators(conditional)
+        conditional.commit.assert_called_once()
+
+    def test_delete_cache_removes_validators(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache_file_patcher = patch.object(
+            EntitlementStatusCache, "CACHE_FILE", os.path.join(tmp_dir, "entitlement_status.json")
+        )
+        cache_file_patcher.start()
+        self.addCleanup(cache_file_patcher.stop)
+        for path in (self.status_cache.CACHE_FILE, self.status_cache.validators_file):
+            with open(path, "w") as f:
+                f.write("{}")
+        self.status_cache.delete_cache()
+        self.assertEqual([], os.listdir(tmp_dir))
+
 
 class TestPoolStatusCache(SubManFixture):
     """
@@ -11,6 +11,7 @@
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
 #
+import json
 import unittest
 
 import tempfile
@@ -20,13 +21,18 @@ from unittest.mock import patch, MagicMock
 from shutil import rmtree
 
 from .stubs import StubProduct, StubEntitlementCertificate, StubProductCertificate
+from test.rhsm.unit import certdata
 from subscription_manager.certdirectory import (
+    CertificateCache,
+    CertificateDirectory,
     Path,
     EntitlementDirectory,
     ProductDirectory,
     ProductCertificateDirectory,
     Directory,
 )
+from rhsm.certificate import create_from_pem
+from rhsm.certificate2 import CONTENT_ACCESS_CERT_TYPE, Pool
 from subscription_manager.repolib import YumRepoFile
 from subscription_manager.productid import ProductDatabase
 
@@ -342,6 +348,27 @@ class ProductCertificateDirectoryWithCertsTest(DirectoryWithCertsTest):
         self.d.refresh()
         self.d.list()
 
+    def test_refresh_loads_only_changed_files(self):
+        self.d.list()
+        self.assertEqual(self.list_len, self.mock_cff.call_count)
+        self.mock_cff.reset_mock()
+
+        self.d.refresh()
+        self.d.list()
+        self.mock_cff.assert_not_called()
+
+        changed_path = self.d.abspath("1.pem")
+        with open(changed_path, "w") as f:
+            f.write("changed")
+        new_path = self.d.abspath("5.pem")
+        with open(new_path, "w"):
+            pass
+        os.unlink(self.d.abspath("2.pem"))
+        self.d.refresh()
+        listing = self.d.list()
+        self.assertCountEqual([changed_path, new_path], [c[0][0] for c in self.mock_cff.call_args_list])
+        self.assertEqual(self.list_len, len(listing))
+
     def test_clean(self):
         self.d.clean()
 
@@ -366,6 +393,170 @@ class ProductDirectoryTest(ProductCertificateDirectoryWithCertsTest):
         return self.klass(path=int_temp_dir, default_path=default_temp_dir)
 
 
+class EntitlementDirectoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp(prefix="subscription-manager-unit-tests-tmp")
+        self.addCleanup(rmtree, temp_dir)
+        with patch("subscription_manager.certdirectory.EntitlementDirectory.productpath") as mock_path:
+            mock_path.return_value = temp_dir
+            self.ent_dir = EntitlementDirectory()
+
+        self.cert1 = StubEntitlementCertificate("p1", provided_products=["p2"], pool=Pool("pool1"))
+        self.cert2 = StubEntitlementCertificate("p3", stacking_id="stack", pool=Pool("pool2"))
+        self.cert3 = StubEntitlementCertificate("p4", provided_products=["p2"], stacking_id="stack")
+        self.sca_cert = StubEntitlementCertificate("p5", entitlement_type=CONTENT_ACCESS_CERT_TYPE)
+        self._set_certs([self.cert1, self.sca_cert, self.cert2, self.cert3])
+
+    def _set_certs(self, certs):
+        self.ent_dir._listing = certs
+
+    def test_list(self):
+        self.assertEqual([self.cert1, self.cert2, self.cert3], self.ent_dir.list())
+        self.assertIs(self.ent_dir.list(), self.ent_dir.list())
+        self.assertEqual([self.sca_cert], self.ent_dir.list_with_sca_mode())
+        self.assertEqual(4, len(self.ent_dir.list_with_content_access()))
+
+    def test_find(self):
+        self.assertIs(self.cert2, self.ent_dir.find(self.cert2.serial))
+        self.assertIsNone(self.ent_dir.find(self.sca_cert.serial))
+        self.assertIsNone(self.ent_dir.find(12345))
+
+    def test_find_by_product(self):
+        self.assertIs(self.cert1, self.ent_dir.find_by_product("p2"))
+        self.assertIsNone(self.ent_dir.find_by_product("p5"))
+
+    def test_find_all_by_product(self):
+        self.assertCountEqual([self.cert2, self.cert3], self.ent_dir.find_all_by_product("p3"))
+        self.assertCountEqual([self.cert1, self.cert2, self.cert3], self.ent_dir.find_all_by_product("p2"))
+        self.assertEqual([], self.ent_dir.find_all_by_product("p6"))
+
+    def test_list_for_product(self):
+        self.assertEqual([self.cert1, self.cert3], self.ent_dir.list_for_product("p2"))
+        self.assertEqual([], self.ent_dir.list_for_product("p6"))
+
+    def test_list_for_pool_id(self):
+        self.assertEqual([self.cert2], self.ent_dir.list_for_pool_id("pool2"))
+        self.assertEqual([], self.ent_dir.list_for_pool_id("pool3"))
+
+    def test_list_for_stacking_id(self):
+        self.assertEqual([self.cert2, self.cert3], self.ent_dir.list_for_stacking_id("stack"))
+
+    def test_refresh_invalidates_indexes(self):
+        self.assertEqual([self.cert1, self.cert3], self.ent_dir.list_for_product("p2"))
+        self.ent_dir.refresh()
+        new_cert = StubEntitlementCertificate("p2")
+        self._set_certs([new_cert])
+        self.assertEqual([new_cert], self.ent_dir.list_for_product("p2"))
+        self.assertEqual([new_cert], self.ent_dir.list())
+        self.assertIs(new_cert, self.ent_dir.find(new_cert.serial))
+
+
+class CertificateCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="subscription-manager-unit-tests-tmp")
+        self.addCleanup(rmtree, self.temp_dir)
+        self.cert_dir = os.path.join(self.temp_dir, "certs")
+        os.mkdir(self.cert_dir)
+        self.cache_file = os.path.join(self.temp_dir, "cache", "certificates.json")
+        self.cert_path = self._write_cert("1.pem", certdata.ENTITLEMENT_CERT_V3_0)
+
+    def _write_cert(self, name, pem):
+        path = os.path.join(self.cert_dir, name)
+        with open(path, "w") as f:
+            f.write(pem)
+        return path
+
+    def _list(self):
+        return CertificateDirectory(self.cert_dir, cache_file=self.cache_file).list()
+
+    def test_writes_cache(self):
+        certs = self._list()
+        with open(self.cache_file) as f:
+            entries = json.load(f)["certificates"]
+        self.assertEqual([self.cert_path], list(entries))
+        self.assertEqual(certs[0].order.name, entries[self.cert_path]["certificate"]["order"][0])
+
+    def test_uses_cache(self):
+        certs = self._list()
+        with patch("subscription_manager.certdirectory.create_from_file") as mock_create:
+            cached = self._list()
+            mock_create.assert_not_called()
+        self.assertEqual(certs[0].serial, cached[0].serial)
+        self.assertEqual(certs[0].order.name, cached[0].order.name)
+        self.assertEqual(self.cert_path, cached[0].path)
+
+    def test_changed_file_parsed_again(self):
+        self._list()
+        self._write_cert("1.pem", certdata.ENTITLEMENT_CERT_V3_2)
+        certs = self._list()
+        self.assertEqual(str(create_from_pem(certdata.ENTITLEMENT_CERT_V3_2).serial), str(certs[0].serial))
+
+    def test_removed_file_pruned(self):
+        second_path = self._write_cert("2.pem", certdata.ENTITLEMENT_CERT_V3_2)
+        self._list()
+        os.unlink(second_path)
+        self._list()
+        with open(self.cache_file) as f:
+            self.assertEqual([self.cert_path], list(json.load(f)["certificates"]))
+
+    def test_removed_file_pruned_with_trailing_slash(self):
+        second_path = self._write_cert("2.pem", certdata.ENTITLEMENT_CERT_V3_2)
+        CertificateDirectory(self.cert_dir + "/", cache_file=self.cache_file).list()
+        os.unlink(second_path)
+        CertificateDirectory(self.cert_dir + "/", cache_file=self.cache_file).list()
+        with open(self.cache_file) as f:
+            entries = json.load(f)["certificates"]
+        self.assertEqual(1, len(entries))
+        self.assertEqual([self.cert_path], [os.path.normpath(path) for path in entries])
+
+    def test_other_directory_not_pruned(self):
+        other_dir = os.path.join(self.temp_dir, "other")
+        os.mkdir(other_dir)
+        other_path = os.path.join(other_dir, "2.pem")
+        with open(other_path, "w") as f:
+            f.write(certdata.ENTITLEMENT_CERT_V3_2)
+        CertificateDirectory(other_dir, cache_file=self.cache_file).list()
+        self._list()
+        with open(self.cache_file) as f:
+            self.assertEqual(sorted([self.cert_path, other_path]), sorted(json.load(f)["certificates"]))
+
+    def test_product_directories_use_own_cache_files(self):
+        other_dir = os.path.join(self.temp_dir, "other")
+        with patch("subscription_manager.certdirectory.PRODUCT_CERT_CACHE", self.cache_file):
+            first = ProductDirectory(path=self.cert_dir, default_path=other_dir)
+            second = ProductDirectory(path=other_dir, default_path=self.cert_dir)
+            third = ProductDirectory(path=self.cert_dir, default_path=other_dir)
+        first_cache = first.installed_prod_dir._cert_cache.cache_file
+        self.assertNotEqual(first_cache, second.installed_prod_dir._cert_cache.cache_file)
+        self.assertEqual(first_cache, third.installed_prod_dir._cert_cache.cache_file)
+        self.assertEqual(os.path.dirname(self.cache_file), os.path.dirname(first_cache))
+
+    def test_corrupted_cache(self):
+        os.mkdir(os.path.dirname(self.cache_file))
+        with open(self.cache_file, "w") as f:
+            f.write("{not json")
+        certs = self._list()
+        self.assertEqual(1, len(certs))
+        with open(self.cache_file) as f:
+            self.assertEqual([self.cert_path], list(json.load(f)["certificates"]))
+
+    def test_unusable_entry_parsed_again(self):
+        self._list()
+        cache = CertificateCache(self.cache_file)
+        cache.entries[self.cert_path]["certificate"]["products"] = None
+        cache._changed = True
+        cache.write()
+        certs = self._list()
+        self.assertEqual(1, len(certs))
+        self.assertTrue(certs[0].products is not None)
+
+    def test_unwritable_cache(self):
+        cache_dir = os.path.dirname(self.cache_file)
+        with open(cache_dir, "w"):
+            pass
+        self.assertEqual(1, len(self._list()))
+
+
 class AlsoProductDirectoryTest(unittest.TestCase):
     @patch("os.path.exists")
     def test_get_installed_products(self, MockExists):
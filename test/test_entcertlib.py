@@ -12,10 +12,12 @@
 # in this software or its documentation.
 #
 
+import threading
+import time
 from unittest.mock import Mock, patch
 from datetime import timedelta, datetime
 
-from .stubs import StubEntitlementCertificate, StubProduct, StubEntitlementDirectory
+from .stubs import StubEntitlementCertificate, StubProduct, StubEntitlementDirectory, StubUEP
 
 from . import fixture
 
@@ -123,3 +125,79 @@ class UpdateActionTests(fixture.SubManFixture):
 
         exceptions = update_action.report.exceptions()
         self.assertEqual([], exceptions)
+
+    def _chunked_uep(self):
+        uep = StubUEP()
+
+        def get_certificates(uuid, serials=None, jwt=None, stream=False):
+            return iter([{"key": "key-%s" % sn, "cert": "cert-%s" % sn} for sn in serials])
+
+        uep.getCertificates = Mock(side_effect=get_certificates)
+        self.set_consumer_auth_cp(uep)
+        inj.provide(inj.ENT_DIR, StubEntitlementDirectory([]))
+        return uep
+
+    @patch.object(entcertlib, "SERIALS_CHUNK_SIZE", 3)
+    def test_certificates_requested_in_chunks(self):
+        uep = self._chunked_uep()
+        update_action = TestingUpdateAction()
+
+        bundles = update_action.get_certificates_by_serial_list(list(range(1, 8)))
+
+        self.assertEqual(["cert-%s" % sn for sn in range(1, 8)], [bundle["cert"] for bundle in bundles])
+        requested = [call.kwargs["serials"] for call in uep.getCertificates.call_args_list]
+        self.assertEqual([["1", "2", "3"], ["4", "5", "6"], ["7"]], requested)
+        for call in uep.getCertificates.call_args_list:
+            self.assertTrue(call.kwargs["stream"])
+
+    @patch.object(entcertlib, "SERIALS_CHUNK_WORKERS", 2)
+    @patch.object(entcertlib, "SERIALS_CHUNK_SIZE", 1)
+    def test_open_connections_limited_by_workers(self):
+        uep = self._chunked_uep()
+        lock = threading.Lock()
+        counts = {"open": 0, "max": 0}
+
+        def read_body(serials):
+            yield {"key": "key-%s" % serials[0], "cert": "cert-%s" % serials[0]}
+            with lock:
+                counts["open"] -= 1
+
+        def get_certificates(uuid, serials=None, jwt=None, stream=False):
+            # Connection stays open after the headers are read, until the whole body is read
+            with lock:
+                counts["open"] += 1
+                counts["max"] = max(counts["max"], counts["open"])
+            time.sleep(0.01)
+            return read_body(serials)
+
+        uep.getCertificates.side_effect = get_certificates
+        update_action = TestingUpdateAction()
+
+        bundles = update_action.get_certificates_by_serial_list(list(range(1, 11)))
+
+        self.assertEqual(["cert-%s" % sn for sn in range(1, 11)], [bundle["cert"] for bundle in bundles])
+        self.assertEqual(0, counts["open"])
+        self.assertLessEqual(counts["max"], 2)
+
+    @patch.object(entcertlib, "SERIALS_CHUNK_SIZE", 3)
+    def test_failed_chunk_raises(self):
+        uep = self._chunked_uep()
+        uep.getCertificates.side_effect = [iter([]), OSError("Connection reset")]
+        update_action = TestingUpdateAction()
+
+        self.assertRaises(OSError, update_action.get_certificates_by_serial_list, list(range(1, 5)))
+
+    def test_no_certificates_requested_without_serials(self):
+        uep = self._chunked_uep()
+        update_action = TestingUpdateAction()
+
+        self.assertEqual([], update_action.get_certificates_by_serial_list([]))
+        uep.getCertificates.assert_not_called()
+
+    def test_rogue_serials(self):
+        self._chunked_uep()
+        update_action = TestingUpdateAction()
+        local = {1: "one", 2: "two", 3: "three"}
+
+        self.assertEqual(["two"], update_action._find_rogue_serials(local, [1, 3, 4]))
+        self.assertEqual([4], update_action._find_missing_serials(local, [1, 3, 4, 4]))
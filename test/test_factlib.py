@@ -15,6 +15,7 @@ from . import stubs
 from . import fixture
 
 from subscription_manager import factlib
+from subscription_manager import facts as fact_module
 from subscription_manager import injection as inj
 
 
@@ -51,3 +52,25 @@ class TestFactlib(fixture.SubManFixture):
         self.assertEqual(len(self.expected_facts), count)
         self.assertEqual(self.expected_facts, self.facts_passed_to_server)
         self.assertEqual(invalid_consumer.uuid, self.consumer_uuid_passed_to_server)
+
+    def test_factlib_reports_changed_facts(self):
+        self._inject_mock_valid_consumer()
+        facts = stubs.StubFacts({"a": "1", "b": "2"})
+        facts.facts_diff = fact_module.diff_facts({"a": "1", "b": "1", "c": "3"}, facts.facts)
+        inj.provide(inj.FACTS, facts)
+        self.set_consumer_auth_cp(stubs.StubUEP())
+
+        update_report = factlib.FactsActionInvoker().update()
+        self.assertEqual(["b", "c"], update_report.fact_updates)
+        self.assertEqual(2, update_report.updates())
+
+    def test_factlib_uses_collector_cache(self):
+        self._inject_mock_invalid_consumer()
+        facts = stubs.StubFacts(self.expected_facts)
+        used_cache = []
+        facts.has_changed = lambda: used_cache.append(facts.use_collector_cache) or True
+        inj.provide(inj.FACTS, facts)
+
+        factlib.FactsActionInvoker().update()
+        self.assertEqual([True], used_cache)
+        self.assertFalse(facts.use_collector_cache)
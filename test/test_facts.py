@@ -1,10 +1,12 @@
 import tempfile
 import shutil
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from . import fixture
+from .stubs import StubUEP
 from subscription_manager import facts
 from rhsm import ourjson as json
+from rhsm.connection import RestlibException
 
 facts_buf = """
 {
@@ -190,6 +192,79 @@ class TestFacts(fixture.SubManFixture):
         changed = self.f.has_changed()
         self.assertTrue(changed)
 
+    @patch("subscription_manager.facts.Facts.get_facts")
+    def test_facts_has_changed_graylisted_only(self, mock_collect):
+        test_facts = json.loads(facts_buf)
+        test_facts["cpu.cpu_mhz"] = "1200"
+        mock_collect.return_value = test_facts
+
+        self.assertFalse(self.f.has_changed())
+        self.assertEqual(["cpu.cpu_mhz"], self.f.facts_diff.keys())
+
+    def test_diff_facts(self):
+        old_facts = {"a": "1", "b": "2", "c": "3"}
+        new_facts = {"a": "1", "b": "20", "d": "4"}
+        diff = facts.diff_facts(old_facts, new_facts)
+        self.assertEqual({"d": "4"}, diff.added)
+        self.assertEqual({"b": "20"}, diff.changed)
+        self.assertEqual(["c"], diff.removed)
+        self.assertEqual(["b", "c", "d"], diff.keys())
+        self.assertFalse(facts.diff_facts(old_facts, dict(old_facts)))
+
+    def _delta_uep(self, capabilities):
+        test_facts = json.loads(facts_buf)
+        test_facts["cpu.cpu_socket(s)"] = "16"
+        test_facts["net.interface.eth0.ipv4_address"] = "10.0.0.2"
+        del test_facts["test.attr"]
+        self.f.facts = test_facts
+        self.f.get_facts = Mock(return_value=test_facts)
+        self.f.write_cache = Mock()
+        uep = StubUEP()
+        uep._capabilities = capabilities
+        uep.updateConsumer = Mock()
+        uep.updateConsumerFactsDelta = Mock()
+        return uep
+
+    def test_update_check_sends_delta(self):
+        uep = self._delta_uep([facts.FACTS_DELTA_CAPABILITY])
+
+        self.assertEqual(1, self.f.update_check(uep, "FAKEUUID"))
+
+        uep.updateConsumerFactsDelta.assert_called_once_with(
+            "FAKEUUID",
+            facts={"cpu.cpu_socket(s)": "16", "net.interface.eth0.ipv4_address": "10.0.0.2"},
+            removed=["test.attr"],
+        )
+        uep.updateConsumer.assert_not_called()
+        self.assertEqual(
+            ["cpu.cpu_socket(s)", "net.interface.eth0.ipv4_address", "test.attr"], self.f.facts_diff.keys()
+        )
+
+    def test_update_check_delta_not_supported(self):
+        uep = self._delta_uep([])
+
+        self.assertEqual(1, self.f.update_check(uep, "FAKEUUID"))
+
+        uep.updateConsumerFactsDelta.assert_not_called()
+        uep.updateConsumer.assert_called_once_with("FAKEUUID", facts=self.f.facts)
+
+    def test_update_check_delta_refused(self):
+        uep = self._delta_uep([facts.FACTS_DELTA_CAPABILITY])
+        uep.updateConsumerFactsDelta.side_effect = RestlibException(409, "Conflict")
+
+        self.assertEqual(1, self.f.update_check(uep, "FAKEUUID"))
+
+        uep.updateConsumer.assert_called_once_with("FAKEUUID", facts=self.f.facts)
+
+    def test_update_check_forced_without_change_sends_all_facts(self):
+        uep = self._delta_uep([facts.FACTS_DELTA_CAPABILITY])
+        self.f.get_facts.return_value = json.loads(facts_buf)
+
+        self.assertEqual(1, self.f.update_check(uep, "FAKEUUID", force=True))
+
+        uep.updateConsumerFactsDelta.assert_not_called()
+        uep.updateConsumer.assert_called_once()
+
     @patch("subscription_manager.facts.Facts.get_facts")
     def test_get_facts(self, mock_collect):
         mock_collect.return_value = {"net.interface.lo.ipv4_address": "127.0.0.1"}
@@ -198,3 +273,44 @@ class TestFacts(fixture.SubManFixture):
 
         self.assertTrue(isinstance(f, dict))
         self.assertEqual(f["net.interface.lo.ipv4_address"], "127.0.0.1")
+
+    @patch("subscription_manager.facts.AllFactsCollector")
+    def test_get_facts_uses_collector_cache(self, mock_collector_cls):
+        collector_cache_file = self.fact_cache_dir + "/collector_facts.json"
+        with open(collector_cache_file, "w") as fd:
+            json.dump({"HostCollector": {"fingerprint": "abc", "timestamp": 1, "facts": {}}}, fd)
+
+        def collect(cache):
+            cache["HardwareCollector"] = {"fingerprint": "def", "timestamp": 2, "facts": {"a": "b"}}
+            mock_collector = mock_collector_cls.return_value
+            mock_collector.get_all.return_value = {"a": "b"}
+            return mock_collector
+
+        mock_collector_cls.side_effect = collect
+        self.f.use_collector_cache = True
+        with patch("subscription_manager.cache.CollectorFactsCache.CACHE_FILE", collector_cache_file):
+            self.assertEqual(self.f.get_facts(True), {"a": "b"})
+
+        self.assertIn("HostCollector", mock_collector_cls.call_args[1]["cache"])
+        with open(collector_cache_file) as fd:
+            self.assertEqual(sorted(json.load(fd)), ["HardwareCollector", "HostCollector"])
+
+    @patch("subscription_manager.facts.AllFactsCollector")
+    def test_get_facts_refreshes_collector_cache(self, mock_collector_cls):
+        collector_cache_file = self.fact_cache_dir + "/collector_facts.json"
+        with open(collector_cache_file, "w") as fd:
+            json.dump({"HostCollector": {"fingerprint": "abc", "timestamp": 1, "facts": {}}}, fd)
+
+        def collect(cache):
+            cache["HostCollector"] = {"fingerprint": "def", "timestamp": 2, "facts": {"a": "b"}}
+            mock_collector = mock_collector_cls.return_value
+            mock_collector.get_all.return_value = {"a": "b"}
+            return mock_collector
+
+        mock_collector_cls.side_effect = collect
+        # Explicit update (e.g. 'subscription-manager facts --update') does not use cached facts
+        with patch("subscription_manager.cache.CollectorFactsCache.CACHE_FILE", collector_cache_file):
+            self.assertEqual(self.f.get_facts(True), {"a": "b"})
+
+        with open(collector_cache_file) as fd:
+            self.assertEqual("def", json.load(fd)["HostCollector"]["fingerprint"])
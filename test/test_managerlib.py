@@ -946,6 +946,7 @@ class TestGetAvailableEntitlements(SubManFixture):
             future=None,
             page=0,
             items_per_page=0,
+            stream=False,
         ):
             if listAll:
                 return [self.build_pool_dict("1234"), self.build_pool_dict("4321")]
@@ -973,6 +974,7 @@ class TestGetAvailableEntitlements(SubManFixture):
             future=None,
             page=0,
             items_per_page=0,
+            stream=False,
         ):
             if listAll:
                 return [